@@ -0,0 +1,92 @@
+"""Benchmark Storage.save_day throughput under each durability mode.
+
+Usage:
+    uv run python benchmarks/bench_durability.py [--events N] [--days D]
+
+Each mode performs the same sequence of switch-like saves against a fresh
+temporary data file, pre-populated with D days of history so rewrites carry a
+realistic amount of data.
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from time_surfer.models import Day, Span
+from time_surfer.storage import Durability, Storage
+
+MODES = [
+    ("strict", dict(durability=Durability.STRICT)),
+    ("relaxed (write-through)", dict(durability=Durability.RELAXED)),
+    ("relaxed (group 32 / 250ms)", dict(
+        durability=Durability.RELAXED, commit_max_events=32, commit_interval_ms=250
+    )),
+    ("memory", dict(durability=Durability.MEMORY)),
+]
+
+
+def _history(days: int) -> list[Day]:
+    """Build closed days with a handful of spans each."""
+    base = datetime(2025, 1, 1, 9, 0, 0)
+    history = []
+    for offset in range(days):
+        start = base + timedelta(days=offset)
+        spans = [
+            Span(
+                task=f"task-{i % 5}",
+                start=start + timedelta(minutes=30 * i),
+                end=start + timedelta(minutes=30 * (i + 1)),
+            )
+            for i in range(16)
+        ]
+        history.append(
+            Day(
+                date=start.strftime("%Y-%m-%d"),
+                start_time=start,
+                end_time=spans[-1].end,
+                spans=spans,
+            )
+        )
+    return history
+
+
+def run(name: str, options: dict, events: int, history: list[Day]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "data.json"
+        Storage(data_file).replace_all_days(history)
+
+        storage = Storage(data_file, **options)
+        if storage.durability is Durability.MEMORY:
+            storage.replace_all_days(history)
+
+        now = datetime(2026, 1, 30, 9, 0, 0)
+        day = Day(date="2026-01-30", start_time=now)
+
+        begin = time.perf_counter()
+        for i in range(events):
+            stamp = now + timedelta(seconds=i)
+            if day.spans:
+                day.spans[-1].end = stamp
+            day.spans.append(Span(task=f"task-{i % 7}", start=stamp))
+            storage.save_day(day)
+        storage.close()
+        elapsed = time.perf_counter() - begin
+
+    print(f"{name:<28} {events / elapsed:>10.0f} saves/s  {elapsed * 1000 / events:>8.3f} ms/save")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--days", type=int, default=250)
+    args = parser.parse_args()
+
+    history = _history(args.days)
+    for name, options in MODES:
+        run(name, options, args.events, history)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Load test for the HTTP JSON API server.
+
+Usage:
+    uv run python benchmarks/bench_server.py [--clients N] [--seconds S]
+
+Starts a TrackerServer on an ephemeral port against a temporary data file and
+drives it from N keep-alive clients, each alternating switch-to and show
+requests, then reports sustained requests per second and latency percentiles.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from time_surfer.server import TrackerServer
+from time_surfer.storage import Durability
+from time_surfer.threadsafe import CachingStorage, ThreadSafeTracker
+
+
+def client(address: tuple[str, int], client_id: int, deadline: float, latencies: list) -> None:
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    headers = {"Content-Type": "application/json"}
+    i = 0
+    while time.perf_counter() < deadline:
+        if i % 2 == 0:
+            body = json.dumps({"task": f"task-{client_id}-{i % 10}"})
+            request = ("POST", "/switch-to", body)
+        else:
+            request = ("GET", "/show", None)
+        begin = time.perf_counter()
+        conn.request(*request, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - begin)
+        i += 1
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--durability", choices=[d.value for d in Durability], default=Durability.RELAXED.value
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = CachingStorage(Path(tmp) / "data.json", durability=args.durability)
+        server = TrackerServer(("127.0.0.1", 0), ThreadSafeTracker(storage))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        deadline = time.perf_counter() + args.seconds
+        per_client: list[list[float]] = [[] for _ in range(args.clients)]
+        threads = [
+            threading.Thread(target=client, args=(server.server_address, i, deadline, per_client[i]))
+            for i in range(args.clients)
+        ]
+        begin = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - begin
+
+        server.shutdown()
+        server.server_close()
+        storage.close()
+
+    latencies = sorted(latency for client_latencies in per_client for latency in client_latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.1f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(
+        f"latency ms: p50={quantiles[49] * 1000:.2f} "
+        f"p95={quantiles[94] * 1000:.2f} p99={quantiles[98] * 1000:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Asyncio-native counterparts to Tracker and Storage.
+
+File access is offloaded to worker threads so the event loop is never blocked.
+AsyncTracker runs Tracker's locked load-change-save transactions there;
+AsyncStorage also lets concurrent loads of the same day share a single read,
+which AsyncTracker's reads go through.
+"""
+
+import asyncio
+import copy
+from collections.abc import Callable
+from datetime import datetime
+
+from time_surfer.models import Day, TrackerResult
+from time_surfer.storage import Storage
+from time_surfer.tracker import Tracker
+
+
+class AsyncStorage:
+    """Non-blocking wrapper around a Storage."""
+
+    def __init__(self, storage: Storage | None = None):
+        self.storage = storage or Storage()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def load_day(self, date: str) -> Day | None:
+        """Load a day's data from storage. Returns None if not found.
+
+        Concurrent calls for the same date await one shared read; each caller
+        receives its own copy of the result.
+        """
+        future = self._inflight.get(date)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(self.storage.load_day, date))
+            self._inflight[date] = future
+            future.add_done_callback(lambda done: self._forget(date, done))
+        day = await asyncio.shield(future)
+        return copy.deepcopy(day)
+
+    async def save_day(self, day: Day) -> None:
+        """Save a day's data to storage."""
+        self.invalidate(day.date)
+        await asyncio.to_thread(self.storage.save_day, day)
+
+    def invalidate(self, date: str) -> None:
+        """Stop sharing loads of ``date`` already in flight, which may predate a write."""
+        self._inflight.pop(date, None)
+
+    async def save_status(self, day: Day) -> None:
+        """Record the running task for prompt segments."""
+        await asyncio.to_thread(self.storage.save_status, day)
+
+    async def record_task_use(self, task: str, when: datetime) -> None:
+        """Count a switch to ``task`` in the completion index."""
+        await asyncio.to_thread(self.storage.record_task_use, task, when)
+
+    async def flush(self) -> None:
+        """Commit any group-committed writes to disk."""
+        await asyncio.to_thread(self.storage.flush)
+
+    async def aclose(self) -> None:
+        """Flush pending writes and release background resources."""
+        await asyncio.to_thread(self.storage.close)
+
+    def _forget(self, date: str, done: asyncio.Future) -> None:
+        """Drop a completed load from the in-flight table."""
+        if self._inflight.get(date) is done:
+            del self._inflight[date]
+
+
+class AsyncTracker:
+    """Handles time tracking operations without blocking the event loop.
+
+    Each change runs the corresponding Tracker method in a worker thread, so
+    it holds ``Storage.lock`` from load to save and always reads the day
+    afresh: writes from other processes are neither overwritten nor missed.
+    Concurrent changes are applied in the order they were made. Reads load
+    through ``AsyncStorage``, so concurrent reads of a day share one load.
+    """
+
+    def __init__(
+        self, storage: AsyncStorage | None = None, clock: Callable[[], datetime] | None = None
+    ):
+        self.storage = storage or AsyncStorage()
+        self._tracker = Tracker(self.storage.storage, clock=clock)
+        self._write_lock = asyncio.Lock()
+
+    async def start(self) -> TrackerResult:
+        """Start tracking for the current day."""
+        return await self._change(self._tracker.start)
+
+    async def stop(self) -> TrackerResult:
+        """Stop tracking for the current day."""
+        return await self._change(self._tracker.stop)
+
+    async def switch_to(self, task: str, at: datetime | None = None) -> TrackerResult:
+        """Switch to a new task, implicitly starting the day if needed."""
+        return await self._change(self._tracker.switch_to, task, at)
+
+    async def pause(self, at: datetime | None = None) -> TrackerResult:
+        """Close the open span without stopping the day."""
+        return await self._change(self._tracker.pause, at)
+
+    async def get_current_day(self) -> Day | None:
+        """Get the current active day, if any."""
+        day, _ = await self._load_today()
+        return self._tracker._current_day(day)
+
+    async def get_report_data(self) -> TrackerResult:
+        """Get report data for the current day."""
+        day, now = await self._load_today()
+        return self._tracker._check_budgets(self._tracker._report(day, now))
+
+    async def get_status(self) -> TrackerResult:
+        """Get the current status: active task and task times so far."""
+        day, now = await self._load_today()
+        return self._tracker._check_budgets(self._tracker._status(day, now))
+
+    async def _change(self, operation, *args) -> TrackerResult:
+        async with self._write_lock:
+            result = await asyncio.to_thread(operation, *args)
+        if result.day is not None:
+            self.storage.invalidate(result.day.date)
+        return result
+
+    async def _load_today(self) -> tuple[Day | None, datetime]:
+        now = self._tracker._now()
+        return await self.storage.load_day(now.strftime("%Y-%m-%d")), now
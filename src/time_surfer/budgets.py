@@ -0,0 +1,174 @@
+"""Daily and weekly time budgets, checked against incrementally kept totals.
+
+``BudgetLedger`` keeps closed-span totals per task for each day of the current
+week and their running weekly sum, persisted in ``budgets.json`` next to the
+data file. Every save through the tracker applies only the difference made by
+the saved day, so checking a budget costs a lookup per budget rather than a
+pass over the week's spans. The ledger records the data file fingerprint it
+corresponds to; if the file was changed by anything else (compaction, imports,
+another tool) the week is re-aggregated once from storage.
+"""
+
+import json
+from datetime import date as date_type
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from time_surfer.cache import closed_task_totals
+from time_surfer.config import Budget, Config
+from time_surfer.formatting import format_duration
+from time_surfer.models import Day
+from time_surfer.storage import Durability, Storage, atomic_write
+
+LEDGER_FILENAME = "budgets.json"
+
+
+def week_start(date: str) -> str:
+    """Return the Monday of the ISO week containing ``date`` (YYYY-MM-DD)."""
+    day = date_type.fromisoformat(date)
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class BudgetLedger:
+    """Running per-task totals of closed spans for the current week."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.week: str | None = None
+        self.fingerprint: list | None = None
+        self.days: dict[str, dict[str, float]] = {}
+        self.week_totals: dict[str, float] = {}
+        self._load()
+
+    def day_totals(self, date: str) -> dict[str, float]:
+        """Closed seconds per task on ``date`` (which must be in the current week)."""
+        return self.days.get(date, {})
+
+    def record_day(self, day: Day, fingerprint: tuple | None) -> None:
+        """Apply a saved day's closed totals to the running sums."""
+        new = closed_task_totals(day)
+        old = self.days.get(day.date, {})
+        for task in new.keys() | old.keys():
+            delta = new.get(task, 0.0) - old.get(task, 0.0)
+            if delta:
+                self.week_totals[task] = self.week_totals.get(task, 0.0) + delta
+        self.days[day.date] = new
+        self.fingerprint = list(fingerprint) if fingerprint is not None else None
+        self._save()
+
+    def is_current(self, date: str, fingerprint: tuple | None) -> bool:
+        """Whether the ledger covers ``date``'s week for this version of the data file.
+
+        An unknown fingerprint (pending or in-memory writes) is trusted.
+        """
+        if self.week != week_start(date):
+            return False
+        return fingerprint is None or self.fingerprint == list(fingerprint)
+
+    def rebuild(self, storage: Storage, date: str) -> None:
+        """Re-aggregate the week containing ``date`` from storage."""
+        self.week = week_start(date)
+        end = (date_type.fromisoformat(self.week) + timedelta(days=6)).isoformat()
+        self.days = {}
+        self.week_totals = {}
+        with storage.snapshot() as snapshot:
+            for day in snapshot.iter_days(self.week, end):
+                self.days[day.date] = closed_task_totals(day)
+                for task, seconds in self.days[day.date].items():
+                    self.week_totals[task] = self.week_totals.get(task, 0.0) + seconds
+            fingerprint = snapshot.fingerprint()
+        self.fingerprint = list(fingerprint) if fingerprint is not None else None
+        self._save()
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            self.week = state["week"]
+            self.fingerprint = state["fingerprint"]
+            self.days = state["days"]
+            self.week_totals = state["week_totals"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.week = None
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        state = {
+            "week": self.week,
+            "fingerprint": self.fingerprint,
+            "days": self.days,
+            "week_totals": self.week_totals,
+        }
+        atomic_write(self.path, lambda f: json.dump(state, f, separators=(",", ":")))
+
+
+class BudgetChecker:
+    """Checks configured budgets for a storage's data."""
+
+    def __init__(self, config: Config, storage: Storage, ledger: BudgetLedger | None = None):
+        self.config = config
+        self.storage = storage
+        if ledger is None:
+            persistent = storage.durability is not Durability.MEMORY
+            ledger = BudgetLedger(storage.data_file.with_name(LEDGER_FILENAME) if persistent else None)
+        self.ledger = ledger
+        self._tags: dict[str, list[str]] = {}
+
+    def record(self, day: Day, before: tuple | None) -> None:
+        """Update the ledger after ``day`` was saved over a file with fingerprint ``before``."""
+        if not self.config.budgets:
+            return
+        if not self.ledger.is_current(day.date, before):
+            self.ledger.rebuild(self.storage, day.date)
+            return
+        self.ledger.record_day(day, self.storage.fingerprint())
+
+    def check(self, day: Day | None, now: datetime) -> list[str]:
+        """Return a warning for each budget exceeded as of ``now``.
+
+        ``day`` is today's stored day; its open span counts up to ``now``.
+        """
+        if not self.config.budgets:
+            return []
+        date = now.strftime("%Y-%m-%d")
+        if not self.ledger.is_current(date, self.storage.fingerprint()):
+            self.ledger.rebuild(self.storage, date)
+
+        open_task, open_seconds = None, 0.0
+        span = day.open_span if day is not None and day.date == date and day.is_active else None
+        if span is not None:
+            open_task, open_seconds = span.task, max(0.0, (now - span.start).total_seconds())
+
+        warnings = []
+        periods = (
+            ("daily", "today", self.ledger.day_totals(date)),
+            ("weekly", "this week", self.ledger.week_totals),
+        )
+        for budget in self.config.budgets:
+            for period, when, totals in periods:
+                limit = getattr(budget, period)
+                if limit is None:
+                    continue
+                if budget.is_tag:
+                    used = sum(s for task, s in totals.items() if self._matches(budget, task))
+                else:
+                    used = totals.get(budget.name, 0.0)
+                if open_task is not None and self._matches(budget, open_task):
+                    used += open_seconds
+                if used > limit:
+                    warnings.append(
+                        f"Budget exceeded for {budget.label}: "
+                        f"{format_duration(used)} of {format_duration(limit)} {when}"
+                    )
+        return warnings
+
+    def _matches(self, budget: Budget, task: str) -> bool:
+        if not budget.is_tag:
+            return task == budget.name
+        tags = self._tags.get(task)
+        if tags is None:
+            tags = self._tags[task] = self.config.tags_for(task)
+        return budget.name in tags
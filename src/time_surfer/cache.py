@@ -0,0 +1,287 @@
+"""Persistent cache of report results and per-day rollups.
+
+Two small LRU-capped JSON files live in ``~/.cache/time-surfer`` (or
+``$XDG_CACHE_HOME/time-surfer``):
+
+``reports.json``
+    The day record and aggregated totals behind ``Tracker.get_report_data``,
+    keyed by data file and date. An entry is valid while the data file's
+    (inode, size, mtime) fingerprint is unchanged, so repeated reports with no
+    writes in between only ``stat`` the data file: no read, no JSON parsing of
+    the data and no aggregation. When the fingerprint changes, the day's raw
+    line is re-read and hashed; if its content is unchanged the entry is kept.
+
+``rollups.json``
+    Closed-span task totals for one day record, keyed by a hash of the record's
+    content, so unchanged days never need to be parsed or aggregated again.
+
+``heatmaps.json``
+    Per-task weekday × 15-minute bins of one closed day record, keyed by the
+    same content hash (see time_surfer.heatmap).
+
+Entries are small; the caps bound the files to a few megabytes. The cache is
+advisory: a missing or corrupt file is simply rebuilt, and failures to write
+it are ignored.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from pathlib import Path
+
+from time_surfer.heatmap import DayBins, Heatmap, day_bins
+from time_surfer.models import Day, TrackerResult
+from time_surfer.storage import Storage, StorageSnapshot, atomic_write, decode_record
+
+DEFAULT_MAX_REPORTS = 64
+DEFAULT_MAX_ROLLUPS = 16384
+REPORT_MESSAGE = "Report data retrieved"
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, honouring ``XDG_CACHE_HOME``."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "time-surfer"
+
+
+def content_hash(line: str) -> str:
+    """Hash of one encoded day record."""
+    return hashlib.blake2b(line.encode(), digest_size=12).hexdigest()
+
+
+def closed_task_totals(day: Day, include_open: bool = False) -> dict[str, float]:
+    """Seconds per task over a day's closed spans, in order of first appearance.
+
+    With ``include_open``, tasks that so far only have an open span are listed
+    with zero seconds, keeping the order a full report would have.
+    """
+    totals: dict[str, float] = {}
+    for span in day.spans:
+        if span.end is not None:
+            totals[span.task] = totals.get(span.task, 0.0) + (span.end - span.start).total_seconds()
+        elif include_open:
+            totals.setdefault(span.task, 0.0)
+    return totals
+
+
+class _LRUFile:
+    """A JSON object on disk whose key order is least- to most-recently used."""
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+
+    def load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def update(self, changes: dict, touched: Iterable[str] = ()) -> None:
+        """Merge ``changes`` (and move ``touched`` keys to most recent) under a file lock.
+
+        The file is re-read while locked so concurrent processes do not drop
+        each other's entries. Failures to write are ignored.
+        """
+        with contextlib.suppress(OSError):
+            self._update(changes, touched)
+
+    def _update(self, changes: dict, touched: Iterable[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self.load()
+            for key in touched:
+                if key in entries:
+                    entries[key] = entries.pop(key)
+            for key, value in changes.items():
+                entries.pop(key, None)
+                entries[key] = value
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+            atomic_write(self.path, lambda f: json.dump(entries, f, separators=(",", ":")))
+
+
+class ReportCache:
+    """Caches report results and closed-day totals across processes."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_reports: int = DEFAULT_MAX_REPORTS,
+        max_rollups: int = DEFAULT_MAX_ROLLUPS,
+    ):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._reports = _LRUFile(self.cache_dir / "reports.json", max_reports)
+        self._rollups = _LRUFile(self.cache_dir / "rollups.json", max_rollups)
+        self._heatmaps = _LRUFile(self.cache_dir / "heatmaps.json", max_rollups)
+
+    def get_report(
+        self,
+        storage: Storage,
+        date: str,
+        now: datetime,
+        build: Callable[[Day | None, datetime], TrackerResult],
+    ) -> TrackerResult:
+        """Return the report for ``date`` as of ``now``, from cache when valid.
+
+        Args:
+            storage: Storage holding the day
+            date: Date to report on (YYYY-MM-DD)
+            now: Time at which open spans end
+            build: Builds a report from a loaded day (``Tracker._report``)
+
+        Returns:
+            TrackerResult equal to ``build(storage.load_day(date), now)``
+        """
+        # Read the fingerprint and the day from one snapshot so a concurrent
+        # save cannot get its content cached under the previous fingerprint.
+        with storage.snapshot() as snapshot:
+            return self._get_report(snapshot, date, now, build)
+
+    def _get_report(
+        self,
+        storage: StorageSnapshot,
+        date: str,
+        now: datetime,
+        build: Callable[[Day | None, datetime], TrackerResult],
+    ) -> TrackerResult:
+        fingerprint = storage.fingerprint()
+        if fingerprint is None:
+            return build(storage.load_day(date), now)
+
+        key = f"{os.path.abspath(storage.data_file)}|{date}"
+        entries = self._reports.load()
+        entry = entries.get(key)
+        if entry is not None and entry.get("fingerprint") == list(fingerprint):
+            if next(reversed(entries)) != key:
+                self._reports.update({}, touched=[key])
+            return self._cached_result(storage, entry, now, build)
+
+        line = next((line for _, line in storage.iter_lines(date, date)), None)
+        digest = content_hash(line) if line is not None else None
+        if entry is not None and entry.get("hash") == digest:
+            entry["fingerprint"] = list(fingerprint)
+            self._reports.update({key: entry})
+            return self._cached_result(storage, entry, now, build)
+
+        record = decode_record(line) if line is not None else None
+        day = storage._dict_to_day(record) if record is not None else None
+        entry = {"fingerprint": list(fingerprint), "hash": digest, "record": record}
+        if day is not None:
+            entry["closed"] = closed_task_totals(day, include_open=True)
+            entry["open"] = [[s.task, s.start.isoformat()] for s in day.spans if s.end is None]
+        self._reports.update({key: entry})
+        return build(day, now)
+
+    def _cached_result(
+        self,
+        storage: StorageSnapshot,
+        entry: dict,
+        now: datetime,
+        build: Callable[[Day | None, datetime], TrackerResult],
+    ) -> TrackerResult:
+        record = entry["record"]
+        day = storage._dict_to_day(record) if record is not None else None
+        if day is None or day.start_time is None:
+            return build(day, now)
+
+        task_totals = dict(entry["closed"])
+        for task, start in entry["open"]:
+            task_totals[task] += (now - datetime.fromisoformat(start)).total_seconds()
+        return TrackerResult(
+            success=True, message=REPORT_MESSAGE, day=day, task_totals=task_totals
+        )
+
+    def closed_totals(
+        self, storage: Storage, start_date: str | None = None, end_date: str | None = None
+    ) -> dict[str, float]:
+        """Total closed-span seconds per task over a date range, using rollups.
+
+        Only days whose content changed since they were last rolled up are
+        parsed and aggregated.
+        """
+        totals: dict[str, float] = {}
+        for day_totals in self.daily_totals(storage, start_date, end_date).values():
+            for task, seconds in day_totals.items():
+                totals[task] = totals.get(task, 0.0) + seconds
+        return totals
+
+    def daily_totals(
+        self, storage: Storage, start_date: str | None = None, end_date: str | None = None
+    ) -> dict[str, dict[str, float]]:
+        """Closed-span seconds per task for each stored day in a range, from rollups.
+
+        Returns a dict of date to task totals, in date order. Days are only
+        parsed if their content changed since they were last rolled up.
+        """
+        rollups = self._rollups.load()
+        daily: dict[str, dict[str, float]] = {}
+        new: dict[str, dict[str, float]] = {}
+        touched: list[str] = []
+        with storage.snapshot() as snapshot:
+            for date, line in snapshot.iter_lines(start_date, end_date):
+                digest = content_hash(line)
+                day_totals = rollups.get(digest)
+                if day_totals is None:
+                    day = snapshot._dict_to_day(decode_record(line))
+                    day_totals = new[digest] = closed_task_totals(day)
+                else:
+                    touched.append(digest)
+                daily[date] = day_totals
+
+        if new or (touched and touched[-1] != next(reversed(rollups), None)):
+            self._rollups.update(new, touched=touched)
+        return daily
+
+    def heatmap(
+        self,
+        storage: Storage,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        now: datetime | None = None,
+    ) -> Heatmap:
+        """Weekday × time-of-day heatmap over a date range, from cached day bins.
+
+        Days with an open span are binned up to ``now`` and not cached.
+        """
+        now = now or datetime.now()
+        cached = self._heatmaps.load()
+        heatmap = Heatmap()
+        new: dict[str, dict] = {}
+        touched: list[str] = []
+        with storage.snapshot() as snapshot:
+            for _, line in snapshot.iter_lines(start_date, end_date):
+                digest = content_hash(line)
+                entry = cached.get(digest)
+                if entry is not None:
+                    touched.append(digest)
+                    heatmap.add(_decode_bins(entry))
+                    continue
+                day = snapshot._parse_line(line)
+                if any(span.end is None for span in day.spans):
+                    heatmap.add(day_bins(day, now))
+                    continue
+                bins = day_bins(day)
+                new[digest] = _encode_bins(bins)
+                heatmap.add(bins)
+
+        if new or (touched and touched[-1] != next(reversed(cached), None)):
+            self._heatmaps.update(new, touched=touched)
+        return heatmap
+
+
+def _encode_bins(bins: DayBins) -> dict[str, list[list[float]]]:
+    return {
+        task: [[slot, seconds] for slot, seconds in slots.items()] for task, slots in bins.items()
+    }
+
+
+def _decode_bins(entry: dict) -> DayBins:
+    return {task: {int(slot): seconds for slot, seconds in pairs} for task, pairs in entry.items()}
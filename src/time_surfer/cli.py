@@ -1,28 +1,219 @@
 """CLI commands for time-surfer."""
 
+import contextlib
+import sys
+import time
+from collections.abc import Iterator
 from datetime import datetime
+from pathlib import Path
 
 import typer
 from rich.console import Console
 
-from time_surfer.formatting import create_task_table, format_duration
-from time_surfer.storage import Storage
+from time_surfer.budgets import BudgetChecker, week_start
+from time_surfer.cache import ReportCache, default_cache_dir
+from time_surfer.compaction import DEFAULT_MIN_SPAN_SECONDS, compact_storage
+from time_surfer.compare import DEFAULT_TREND_PERIODS, CompareError, date_span
+from time_surfer.compare import compare as compare_periods
+from time_surfer.compare import resolve as resolve_comparison
+from time_surfer.completion import complete as complete_tasks
+from time_surfer.completion import load_index
+from time_surfer.config import Config, ConfigError, load_config
+from time_surfer.formatting import (
+    create_compare_table,
+    create_hour_distribution_table,
+    create_session_stats_table,
+    create_task_table,
+    create_user_breakdown_table,
+    format_duration,
+    format_heatmap,
+    parse_duration,
+)
+from time_surfer.fsck import check_file, check_tail
+from time_surfer.fsck import repair as repair_data
+from time_surfer.heatmap import BIN_MINUTES, BINS_PER_DAY, WEEKDAY_NAMES
+from time_surfer.hooks import (
+    DEFAULT_SETTLE_SECONDS,
+    CheckoutDebouncer,
+    HookInstallError,
+    install_git_hook,
+    uninstall_git_hook,
+)
+from time_surfer.ics import (
+    DEFAULT_TASK_PREFIX,
+    CalendarError,
+    import_events,
+    iter_events,
+    write_calendar,
+)
+from time_surfer.idle import IdleDaemon, ProcInterruptsSource, TerminalActivitySource
+from time_surfer.metrics import (
+    METRICS,
+    STATE_FILENAME,
+    load_state,
+    merge_state,
+    persist,
+    record,
+    render,
+)
+from time_surfer.migrate import migrate_file
+from time_surfer.models import Day, Span, TrackerResult
+from time_surfer.notes import (
+    NoteStore,
+    describe,
+    find_span,
+    parse_metadata,
+    span_id,
+    span_label,
+)
+from time_surfer.prompt import render as render_prompt
+from time_surfer.query import QueryError, compile_query
+from time_surfer.server import DEFAULT_HOST, DEFAULT_PORT
+from time_surfer.server import serve as run_server
+from time_surfer.stats import compute_stats
+from time_surfer.storage import (
+    SCHEMA_VERSION,
+    CorruptDataError,
+    Storage,
+    UnsupportedSchemaError,
+)
+from time_surfer.sync import SyncError, peer_data_file
+from time_surfer.sync import sync as run_sync
+from time_surfer.team import build_team_report
+from time_surfer.timeline import day_timeline
 from time_surfer.tracker import Tracker
 
 app = typer.Typer(help="A command-line time tracking tool.")
+hook_app = typer.Typer(help="Switch tasks automatically from other tools.")
+app.add_typer(hook_app, name="hook")
+calendar_app = typer.Typer(help="Import and export calendar (ICS) files.")
+app.add_typer(calendar_app, name="calendar")
 console = Console()
+err_console = Console(stderr=True)
+# Run on every shell prompt: recording metrics would add I/O to each one.
+_UNRECORDED_COMMANDS = {"prompt"}
+_FSCK_HINT = "Run 'time-surfer fsck --repair' to restore it from the last good copy."
+
+
+@app.callback()
+def main(ctx: typer.Context):
+    """A command-line time tracking tool."""
+    start = time.perf_counter()
+    if ctx.invoked_subcommand not in _UNRECORDED_COMMANDS and not ctx.resilient_parsing:
+        ctx.call_on_close(lambda: _record_command(ctx.invoked_subcommand, start))
+    if ctx.invoked_subcommand != "fsck":
+        _check_hot_segment()
+
+
+def _check_hot_segment() -> None:
+    """Verify the most recent records and repair them from the backup if damaged.
+
+    The repair is the one ``fsck --repair`` makes, and only runs when the backup
+    itself passes every check; otherwise the file is left for fsck to report.
+    """
+    storage = Storage()
+    problems = check_tail(storage.data_file)
+    if not problems:
+        return
+    for problem in problems:
+        err_console.print(
+            f"[yellow]Warning: damaged record in {storage.data_file} at {problem}[/yellow]"
+        )
+    if not storage.backup_file.exists() or not check_file(storage.backup_file, max_workers=1).ok:
+        err_console.print(f"[yellow]{_FSCK_HINT}[/yellow]")
+        return
+    result = repair_data(storage)
+    if result.restored:
+        err_console.print(
+            f"[yellow]Restored {', '.join(result.restored)} from {storage.backup_file}[/yellow]"
+        )
+    if result.lost:
+        err_console.print(
+            f"[red]Could not restore {len(result.lost)} damaged records; "
+            f"they were moved to {result.quarantine_file}[/red]"
+        )
+
+
+@contextlib.contextmanager
+def _exit_on_corrupt_data() -> Iterator[None]:
+    """Report a damaged data file as a one-line error rather than a traceback."""
+    try:
+        yield
+    except CorruptDataError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        if "fsck" not in str(e):
+            console.print(_FSCK_HINT)
+        raise typer.Exit(code=1)
+
+
+def _record_command(command: str | None, start: float) -> None:
+    """Record a finished command's latency and this process's metrics.
+
+    Samples are appended to the pending metrics with one write; they are only
+    merged into the state file every few hundred commands, or on every command
+    when a textfile-collector file must be kept current.
+    """
+    if command is None:
+        return
+    try:
+        config = load_config()
+    except ConfigError:
+        return
+    if not config.metrics_enabled:
+        METRICS.drain()
+        return
+    METRICS.observe(
+        "time_surfer_command_duration_seconds",
+        time.perf_counter() - start,
+        command=command,
+        interface="cli",
+    )
+    METRICS.set("time_surfer_storage_bytes", Storage().file_size())
+    path = default_cache_dir() / STATE_FILENAME
+    if config.metrics_textfile is not None:
+        persist(path, textfile=config.metrics_textfile)
+    else:
+        record(path)
+
+
+def _load_config() -> Config:
+    try:
+        return load_config()
+    except ConfigError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+
+def get_storage(config: Config | None = None) -> Storage:
+    """Create the default storage with the configured durability, for commands that write."""
+    config = config or _load_config()
+    return Storage(
+        durability=config.durability,
+        commit_interval_ms=config.commit_interval_ms,
+        commit_max_events=config.commit_max_events,
+    )
 
 
 def get_tracker() -> Tracker:
-    """Create a tracker with default storage."""
-    return Tracker(Storage())
+    """Create a tracker with default storage, the report cache and configured budgets."""
+    config = _load_config()
+    storage = get_storage(config)
+    budgets = BudgetChecker(config, storage) if config.budgets else None
+    return Tracker(storage, cache=ReportCache(), budgets=budgets)
+
+
+def print_warnings(result: TrackerResult) -> None:
+    """Print any warnings (such as exceeded budgets) attached to a result."""
+    for warning in result.warnings:
+        console.print(f"[yellow]Warning: {warning}[/yellow]")
 
 
 @app.command()
 def start():
     """Start tracking time for the day."""
     tracker = get_tracker()
-    result = tracker.start()
+    with _exit_on_corrupt_data():
+        result = tracker.start()
 
     if result.success:
         console.print(f"[green]{result.message}[/green]")
@@ -35,7 +226,8 @@ def start():
 def stop():
     """Stop tracking time and show daily summary."""
     tracker = get_tracker()
-    result = tracker.stop()
+    with _exit_on_corrupt_data():
+        result = tracker.stop()
 
     if not result.success:
         console.print(f"[red]Error: {result.message}[/red]")
@@ -44,7 +236,6 @@ def stop():
     console.print(f"[green]{result.message}[/green]")
 
     # Calculate total time tracked
-    total_seconds = None
     if result.day and result.day.start_time and result.day.end_time:
         total_seconds = (result.day.end_time - result.day.start_time).total_seconds()
         console.print(f"Total time tracked: {format_duration(total_seconds)}")
@@ -53,28 +244,170 @@ def stop():
         console.print("No tasks recorded. Use 'switch-to' to track tasks.")
         return
 
-    table = create_task_table(result.task_totals, total_duration=total_seconds)
-    console.print(table)
+    _print_day_table(result.task_totals, result.day, datetime.now())
+
+
+def _complete_task(incomplete: str) -> list[str]:
+    """Complete task names from the index kept by switch_to."""
+    return complete_tasks(load_index(str(Storage().task_index_file)), incomplete)
+
+
+def _parse_metadata_option(items: list[str] | None) -> dict[str, str]:
+    try:
+        return parse_metadata(items or [])
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--meta")
 
 
 @app.command("switch-to")
-def switch_to(task: str = typer.Argument(..., help="Name of the task to switch to")):
+def switch_to(
+    task: str = typer.Argument(
+        ..., help="Name of the task to switch to", autocompletion=_complete_task
+    ),
+    note: str | None = typer.Option(None, "--note", help="Attach a note to the new span"),
+    ticket: str | None = typer.Option(None, "--ticket", help="Attach a ticket ID"),
+    meta: list[str] | None = typer.Option(None, "--meta", help="Attach KEY=VALUE (repeatable)"),
+):
     """Switch to a new task (starts day if needed)."""
+    metadata = _parse_metadata_option(meta)
     tracker = get_tracker()
-    result = tracker.switch_to(task)
+    with _exit_on_corrupt_data():
+        result = tracker.switch_to(task)
 
-    if result.success:
-        console.print(f"[green]{result.message}[/green]")
-    else:
+    if not result.success:
         console.print(f"[red]Error: {result.message}[/red]")
         raise typer.Exit(code=1)
 
+    console.print(f"[green]{result.message}[/green]")
+    span = result.day.open_span if result.day else None
+    if span is not None and (note or ticket or metadata):
+        NoteStore(tracker.storage.notes_file).add(span, note, ticket, metadata)
+    print_warnings(result)
+
+
+@app.command()
+def annotate(
+    span: str | None = typer.Argument(
+        None, help="Span id (or a unique prefix); default: the current or last span"
+    ),
+    note: str | None = typer.Option(None, "--note", help="Add a note"),
+    ticket: str | None = typer.Option(None, "--ticket", help="Add a ticket ID"),
+    meta: list[str] | None = typer.Option(None, "--meta", help="Set KEY=VALUE (repeatable)"),
+    clear: bool = typer.Option(False, "--clear", help="Remove everything attached so far"),
+    date: str | None = typer.Option(
+        None, "--date", help="Day of the span (YYYY-MM-DD), default today"
+    ),
+):
+    """Attach notes, tickets and metadata to a span, or list a day's annotations."""
+    metadata = _parse_metadata_option(meta)
+    storage = Storage()
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    with _exit_on_corrupt_data():
+        day = storage.load_day(date)
+    spans = day.spans if day else []
+    store = NoteStore(storage.notes_file)
+
+    if not (note or ticket or metadata or clear):
+        if span is not None:
+            spans = [_find_span(spans, span, date)]
+        annotations = store.load(date)
+        for item in spans:
+            found = annotations.get(span_id(item))
+            text = f"  {describe(found)}" if found else ""
+            typer.echo(f"{span_id(item)}  {span_label(item)}  {item.task}{text}")
+        if not spans:
+            console.print(f"No spans on {date}.")
+        return
+
+    if span is not None:
+        target = _find_span(spans, span, date)
+    elif spans:
+        target = day.open_span or spans[-1]
+    else:
+        console.print(f"[red]Error: No spans on {date}[/red]")
+        raise typer.Exit(code=1)
+
+    store.add(target, note, ticket, metadata, clear=clear)
+    console.print(f"[green]Annotated '{target.task}' ({span_label(target)})[/green]")
+
+
+def _find_span(spans: list[Span], prefix: str, date: str) -> Span:
+    try:
+        found = find_span(spans, prefix)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+    if found is None:
+        console.print(f"[red]Error: No span {prefix} on {date}[/red]")
+        raise typer.Exit(code=1)
+    return found
+
 
 @app.command()
-def report():
-    """Show time report for the current day."""
+def show():
+    """Show current status: active task, elapsed time and total today."""
     tracker = get_tracker()
-    result = tracker.get_report_data()
+    with _exit_on_corrupt_data():
+        result = tracker.get_status()
+
+    if not result.success:
+        console.print(f"[red]Error: {result.message}[/red]")
+        raise typer.Exit(code=1)
+
+    console.print(f"[green]{result.message}[/green]")
+
+    day = result.day
+    now = datetime.now()
+    if day.open_span is not None:
+        elapsed = (now - day.open_span.start).total_seconds()
+        console.print(f"Time on current task: {format_duration(elapsed)}")
+    end = day.end_time or now
+    console.print(f"Total time today: {format_duration((end - day.start_time).total_seconds())}")
+    print_warnings(result)
+
+
+@app.command()
+def report(
+    where: str | None = typer.Option(
+        None,
+        "--where",
+        help="Filter spans across all history, e.g. 'task ~ review and duration > 10m'",
+    ),
+    heatmap: bool = typer.Option(
+        False, "--heatmap", help="Show tracked time by weekday and 15-minute slot"
+    ),
+    from_date: str | None = typer.Option(
+        None, "--from", help="First date for --heatmap (YYYY-MM-DD), default Monday this week"
+    ),
+    to_date: str | None = typer.Option(None, "--to", help="Last date for --heatmap (YYYY-MM-DD)"),
+    task: str | None = typer.Option(None, "--task", help="Limit --heatmap to one task"),
+    compare: str | None = typer.Option(
+        None,
+        "--compare",
+        help="Compare a period with the one before: today, yesterday, this-week, last-week, "
+        "this-month, last-month or YYYY-MM-DD..YYYY-MM-DD",
+    ),
+    against: str | None = typer.Option(
+        None, "--against", help="Baseline range for --compare (YYYY-MM-DD..YYYY-MM-DD)"
+    ),
+    periods: int = typer.Option(
+        DEFAULT_TREND_PERIODS, "--periods", min=1, help="Periods in the --compare trend"
+    ),
+):
+    """Show time report for the current day, for spans matching --where, or a heatmap."""
+    with _exit_on_corrupt_data():
+        if where is not None:
+            _report_where(where)
+            return
+        if compare is not None:
+            _report_compare(compare, against, periods)
+            return
+        if heatmap:
+            _report_heatmap(from_date, to_date, task)
+            return
+
+        tracker = get_tracker()
+        result = tracker.get_report_data()
 
     if not result.success:
         console.print(f"[red]Error: {result.message}[/red]")
@@ -84,14 +417,447 @@ def report():
         console.print("No tasks recorded. Use 'switch-to' to track tasks.")
         return
 
-    # Calculate total duration (active day uses now, stopped day uses end_time)
-    total_seconds = None
-    if result.day and result.day.start_time:
-        end = result.day.end_time or datetime.now()
-        total_seconds = (end - result.day.start_time).total_seconds()
+    _print_day_table(result.task_totals, result.day, datetime.now())
+    print_warnings(result)
+
+
+def _print_day_table(task_totals: dict[str, float], day: Day | None, now: datetime) -> None:
+    """Print a day's task table with exact untracked and overlapping time.
 
-    table = create_task_table(result.task_totals, total_duration=total_seconds)
+    The day runs from its start to its end_time (or now while active).
+    """
+    timeline = day_timeline(day, now) if day else None
+    if timeline is None:
+        console.print(create_task_table(task_totals))
+        return
+
+    table = create_task_table(
+        task_totals,
+        total_duration=timeline.window_seconds,
+        untracked=timeline.untracked_seconds,
+        attributed=timeline.attributed,
+    )
     console.print(table)
+    if timeline.overlapped_seconds >= 0.5:
+        console.print(
+            f"Overlapping spans: {format_duration(timeline.overlapped_seconds)} "
+            "(shared equally between concurrent tasks in %)"
+        )
+
+
+def _report_where(where: str) -> None:
+    """Report task totals over every stored span matching a filter expression."""
+    try:
+        query = compile_query(where)
+    except QueryError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    with Storage().snapshot() as snapshot:
+        days = snapshot.iter_days(query.start_date, query.end_date)
+        task_totals = query.task_totals(days, datetime.now())
+    if not task_totals:
+        console.print("No spans match the filter.")
+        return
+
+    console.print(create_task_table(task_totals))
+
+
+def _report_compare(spec: str, against: str | None, periods: int) -> None:
+    """Print per-task changes between two periods, with trends, from cached rollups."""
+    try:
+        comparison = resolve_comparison(spec, datetime.now().date(), against)
+    except CompareError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    daily = ReportCache().daily_totals(Storage(), *date_span(comparison, periods))
+    deltas = compare_periods(daily, comparison, periods)
+    if not deltas:
+        console.print("No time recorded in these periods.")
+        return
+
+    console.print(
+        f"Current {comparison.current.label}, baseline {comparison.baseline.label}; "
+        f"trend over {periods} periods"
+    )
+    console.print(create_compare_table(deltas))
+
+
+def _report_heatmap(from_date: str | None, to_date: str | None, task: str | None) -> None:
+    """Print a weekday × time-of-day heatmap built from cached per-day bins."""
+    now = datetime.now()
+    start = from_date or week_start(now.strftime("%Y-%m-%d"))
+    result = ReportCache().heatmap(Storage(), start, to_date, now)
+    if task is not None and task not in result.tasks:
+        console.print(f"No time recorded for '{task}' in range.")
+        return
+    grid = result.grid(task)
+    if not any(grid):
+        console.print("No time recorded in range.")
+        return
+
+    title = f"'{task}'" if task is not None else "All tasks"
+    console.print(f"{title}, {start} to {to_date or 'today'} ({result.days} days)")
+    typer.echo(format_heatmap(grid))
+    peak = max(range(len(grid)), key=grid.__getitem__)
+    weekday, slot = divmod(peak, BINS_PER_DAY)
+    minutes = slot * BIN_MINUTES
+    console.print(
+        f"Busiest slot: {WEEKDAY_NAMES[weekday]} {minutes // 60:02d}:{minutes % 60:02d} "
+        f"({format_duration(grid[peak])})"
+    )
+
+
+@app.command()
+def prompt():
+    """Print the current task and elapsed time for a shell prompt.
+
+    For prompts that run on every command, prefer the lightweight
+    `time-surfer-prompt` executable, which skips loading this CLI.
+    """
+    segment = render_prompt(str(Storage().status_file))
+    if segment:
+        typer.echo(segment)
+
+
+@app.command("metrics")
+def print_metrics():
+    """Print command latencies and storage metrics in the Prometheus text format."""
+    state = merge_state(load_state(default_cache_dir() / STATE_FILENAME), METRICS.snapshot())
+    typer.echo(render(state), nl=False)
+
+
+@app.command()
+def compact(
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Report what would be saved without rewriting storage"
+    ),
+    min_span: float = typer.Option(
+        DEFAULT_MIN_SPAN_SECONDS, "--min-span", help="Drop closed spans shorter than this (seconds)"
+    ),
+):
+    """Merge adjacent spans, drop micro-spans and rewrite storage compactly."""
+    report = compact_storage(get_storage(), min_span_seconds=min_span, dry_run=dry_run)
+
+    if report.days == 0:
+        console.print("Nothing to compact.")
+        return
+
+    verb = "Would save" if report.dry_run else "Saved"
+    console.print(
+        f"{verb} {report.spans_saved} spans ({report.spans_before} -> {report.spans_after}) "
+        f"and {report.bytes_saved} bytes ({report.bytes_before} -> {report.bytes_after}) "
+        f"across {report.days} days"
+    )
+
+
+@app.command()
+def stats(
+    from_date: str | None = typer.Option(None, "--from", help="First date (YYYY-MM-DD)"),
+    to_date: str | None = typer.Option(None, "--to", help="Last date (YYYY-MM-DD)"),
+):
+    """Show session lengths, context switches and time-of-day patterns."""
+    with _exit_on_corrupt_data(), Storage().snapshot() as snapshot:
+        result = compute_stats(snapshot.iter_days(from_date, to_date))
+
+    if not result.tasks:
+        console.print("No completed spans in range.")
+        return
+
+    console.print(create_session_stats_table(result.tasks))
+    console.print(
+        f"Context switches: {result.context_switches} "
+        f"({result.switches_per_hour:.1f} per tracked hour over {result.days} days)"
+    )
+    focus = result.longest_focus
+    console.print(
+        f"Longest focus block: {format_duration(focus.seconds)} on '{focus.task}' "
+        f"({focus.start.strftime('%Y-%m-%d %H:%M')})"
+    )
+    console.print(create_hour_distribution_table(result.hour_of_day))
+
+
+@app.command()
+def migrate(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report without rewriting storage"),
+    backup: bool = typer.Option(True, "--backup/--no-backup", help="Keep the original file"),
+):
+    """Upgrade the data file to the current schema version."""
+    storage = Storage()
+    try:
+        result = migrate_file(storage.data_file, backup=backup, dry_run=dry_run)
+    except (UnsupportedSchemaError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    if result.from_version is None:
+        console.print("No data to migrate.")
+    elif not result.migrated:
+        console.print(f"Data is already at schema version {result.to_version}.")
+    elif dry_run:
+        console.print(
+            f"Would migrate {result.days} days from schema version "
+            f"{result.from_version} to {result.to_version}."
+        )
+    else:
+        console.print(
+            f"[green]Migrated {result.days} days from schema version "
+            f"{result.from_version} to {result.to_version}.[/green]"
+        )
+        if result.backup_file:
+            console.print(f"Original kept at {result.backup_file}")
+
+
+@app.command()
+def fsck(
+    repair: bool = typer.Option(
+        False, "--repair", help="Restore damaged records from the last good copy"
+    ),
+    workers: int | None = typer.Option(
+        None, "--workers", min=1, help="Processes verifying segments (default: one per CPU)"
+    ),
+):
+    """Verify every record's checksum and order, in parallel across cores."""
+    storage = get_storage()
+    start = time.perf_counter()
+    try:
+        result = check_file(storage.data_file, max_workers=workers)
+    except UnsupportedSchemaError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+    elapsed = time.perf_counter() - start
+
+    if result.schema_version is None:
+        console.print("No data to check.")
+        return
+    console.print(
+        f"Checked {result.records} days ({result.size:,} bytes) in {result.segments} "
+        f"segments in {elapsed:.2f}s"
+    )
+    if result.schema_version < SCHEMA_VERSION:
+        console.print(
+            f"[yellow]Schema version {result.schema_version} has no checksums; "
+            "run 'time-surfer migrate' to add them.[/yellow]"
+        )
+    if result.ok:
+        console.print("[green]No problems found.[/green]")
+        return
+    for problem in result.problems:
+        typer.echo(f"{storage.data_file}: {problem}")
+    if not repair:
+        console.print(
+            f"[red]{len(result.problems)} problems found; "
+            "run 'time-surfer fsck --repair' to fix them.[/red]"
+        )
+        raise typer.Exit(code=1)
+
+    fixed = repair_data(storage)
+    console.print(
+        f"Kept {fixed.kept} days, restored {len(fixed.restored)} from {storage.backup_file}"
+    )
+    if fixed.quarantine_file:
+        console.print(f"Damaged records moved to {fixed.quarantine_file}")
+    if fixed.lost:
+        console.print(f"[red]{len(fixed.lost)} damaged records could not be restored.[/red]")
+        raise typer.Exit(code=1)
+    console.print("[green]Repaired.[/green]")
+
+
+@app.command("sync")
+def sync_command(
+    other: Path = typer.Argument(
+        ..., exists=True, help="The other machine's data directory (or data file), e.g. a mount"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report without writing either side"),
+):
+    """Two-way sync with another data directory, copying only days that differ."""
+    try:
+        result = run_sync(get_storage(), Storage(peer_data_file(other)), dry_run=dry_run)
+    except (SyncError, UnsupportedSchemaError, CorruptDataError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    verb = "Would sync" if dry_run else "Synced"
+    console.print(
+        f"{verb} {result.days} days: {result.pulled} pulled, {result.pushed} pushed, "
+        f"{result.merged} merged, {result.unchanged} unchanged"
+    )
+
+
+@calendar_app.command("import")
+def calendar_import(
+    ics_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="ICS file to import"),
+    prefix: str = typer.Option(
+        DEFAULT_TASK_PREFIX, "--prefix", help="Prefix for task names created from event titles"
+    ),
+    from_date: str | None = typer.Option(None, "--from", help="First date (YYYY-MM-DD)"),
+    to_date: str | None = typer.Option(None, "--to", help="Last date (YYYY-MM-DD)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report without writing"),
+):
+    """Add calendar events as spans, in one batched write."""
+    try:
+        with open(ics_file, encoding="utf-8", newline="") as f:
+            result = import_events(
+                get_storage(), iter_events(f), prefix, from_date, to_date, dry_run=dry_run
+            )
+    except (CalendarError, UnicodeDecodeError, UnsupportedSchemaError, CorruptDataError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    verb = "Would import" if dry_run else "Imported"
+    console.print(
+        f"{verb} {result.events} events, changing {result.days} days "
+        f"({result.skipped} skipped: all-day, cancelled, unfinished or incomplete)"
+    )
+
+
+@calendar_app.command("export")
+def calendar_export(
+    from_date: str | None = typer.Option(None, "--from", help="First date (YYYY-MM-DD)"),
+    to_date: str | None = typer.Option(None, "--to", help="Last date (YYYY-MM-DD)"),
+    output: Path | None = typer.Option(
+        None, "--output", "-o", help="File to write (default stdout)"
+    ),
+):
+    """Export tracked spans as an ICS calendar."""
+    with Storage().snapshot() as snapshot:
+        days = snapshot.iter_days(from_date, to_date)
+        if output is None:
+            write_calendar(days, sys.stdout)
+            return
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            count = write_calendar(days, f)
+    console.print(f"Exported {count} spans to {output}")
+
+
+@app.command("team-report")
+def team_report(
+    data_dir: Path = typer.Option(
+        ..., "--data-dir", exists=True, file_okay=False, help="Directory of per-user data files"
+    ),
+    from_date: str | None = typer.Option(None, "--from", help="First date (YYYY-MM-DD), default today"),
+    to_date: str | None = typer.Option(None, "--to", help="Last date (YYYY-MM-DD), default --from"),
+    workers: int | None = typer.Option(None, "--workers", help="Worker processes (default: CPU count)"),
+    by_user: bool = typer.Option(True, "--by-user/--no-by-user", help="Show per-user breakdown"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached per-day rollups"),
+):
+    """Aggregate many users' data files into one team report."""
+    start_date = from_date or datetime.now().strftime("%Y-%m-%d")
+    end_date = to_date or start_date
+
+    report = build_team_report(
+        data_dir,
+        start_date,
+        end_date,
+        max_workers=workers,
+        cache_dir=default_cache_dir() if cache else None,
+    )
+
+    for user, error in report.failed_users.items():
+        err_console.print(f"[yellow]Warning: skipped {user}: {error}[/yellow]")
+    if not report.user_totals:
+        if not report.failed_users:
+            console.print(f"[red]Error: No data files found in {data_dir}[/red]")
+        raise typer.Exit(code=1)
+
+    task_totals = report.task_totals
+    if not task_totals:
+        console.print(f"No tasks recorded between {start_date} and {end_date}.")
+        return
+
+    console.print(f"Team report for {len(report.user_totals)} users, {start_date} to {end_date}")
+    console.print(create_task_table(task_totals))
+    if by_user:
+        console.print(create_user_breakdown_table(report.user_totals))
+
+
+@app.command()
+def serve(
+    port: int = typer.Option(DEFAULT_PORT, "--port", help="Port to listen on"),
+    host: str = typer.Option(DEFAULT_HOST, "--host", help="Interface to bind"),
+    verbose: bool = typer.Option(False, "--verbose", help="Log each request"),
+    allow_origin: list[str] | None = typer.Option(
+        None, "--allow-origin", help="Also accept browser requests from this origin (repeatable)"
+    ),
+):
+    """Serve start/switch-to/stop/show/report as a local JSON API."""
+    console.print(f"Serving time-surfer API on http://{host}:{port} (Ctrl+C to stop)")
+    run_server(host=host, port=port, verbose=verbose, allowed_origins=allow_origin or ())
+
+
+def _parse_duration_option(value: str) -> float:
+    """Typer callback converting a duration option to seconds."""
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+
+@app.command("idle-daemon")
+def idle_daemon(
+    threshold: str = typer.Option(
+        "5m", "--threshold", callback=_parse_duration_option, help="Idle time before pausing (e.g. 5m)"
+    ),
+    idle_task: str | None = typer.Option(
+        None, "--idle-task", help="Switch to this task when idle instead of pausing"
+    ),
+    proc: bool = typer.Option(True, "--proc/--no-proc", help="Watch input interrupts in /proc"),
+    tty: bool = typer.Option(True, "--tty/--no-tty", help="Watch terminal activity"),
+):
+    """Pause the current task while the machine is idle, resume on activity."""
+    sources = []
+    if proc:
+        sources.append(ProcInterruptsSource())
+    if tty:
+        sources.append(TerminalActivitySource())
+    if not sources:
+        console.print("[red]Error: Enable at least one activity source[/red]")
+        raise typer.Exit(code=1)
+
+    daemon = IdleDaemon(get_tracker(), sources, threshold=threshold, idle_task=idle_task)
+    console.print(f"Watching for idle periods longer than {format_duration(threshold)}")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+@hook_app.command("git")
+def hook_git(
+    repo: Path = typer.Argument(Path("."), help="Repository to install the hook into"),
+    uninstall: bool = typer.Option(False, "--uninstall", help="Remove the hook instead"),
+):
+    """Switch to a task named after the branch on every git checkout."""
+    try:
+        if uninstall:
+            hook = uninstall_git_hook(repo)
+        else:
+            hook = install_git_hook(repo)
+    except HookInstallError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(code=1)
+
+    if uninstall:
+        console.print(f"[green]Removed hook from {hook}[/green]" if hook else "Hook not installed")
+    else:
+        console.print(f"[green]Installed post-checkout hook at {hook}[/green]")
+
+
+@hook_app.command("git-checkout", hidden=True)
+def hook_git_checkout(
+    branch: str = typer.Argument(..., help="Branch that was checked out"),
+    settle: float = typer.Option(
+        DEFAULT_SETTLE_SECONDS, "--settle", help="Seconds to wait for further checkouts"
+    ),
+):
+    """Run by the post-checkout hook: switch once a burst of checkouts settles."""
+    with _exit_on_corrupt_data():
+        result = CheckoutDebouncer(get_tracker(), settle_seconds=settle).checkout(branch)
+    if result is not None:
+        console.print(result.message)
 
 
 if __name__ == "__main__":
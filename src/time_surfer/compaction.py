@@ -0,0 +1,116 @@
+"""Storage compaction: merge, prune and dedupe spans."""
+
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage
+
+DEFAULT_MIN_SPAN_SECONDS = 1.0
+
+
+@dataclass
+class CompactionReport:
+    """Summary of what a compaction pass changed (or would change)."""
+
+    days: int
+    spans_before: int
+    spans_after: int
+    bytes_before: int
+    bytes_after: int
+    dry_run: bool = False
+
+    @property
+    def spans_saved(self) -> int:
+        """Number of spans removed by compaction."""
+        return self.spans_before - self.spans_after
+
+    @property
+    def bytes_saved(self) -> int:
+        """Number of bytes removed from the data file by compaction."""
+        return self.bytes_before - self.bytes_after
+
+
+def compact_spans(
+    spans: list[Span], min_span_seconds: float = DEFAULT_MIN_SPAN_SECONDS
+) -> list[Span]:
+    """Return a compacted copy of a day's spans.
+
+    Exact duplicates are dropped, closed spans shorter than ``min_span_seconds``
+    are pruned, and consecutive spans of the same task separated by no more than
+    ``min_span_seconds`` are merged into one. Open spans are never pruned.
+
+    Args:
+        spans: Spans to compact (left unmodified)
+        min_span_seconds: Spans shorter than this are treated as noise
+
+    Returns:
+        New list of spans ordered by start time
+    """
+    seen: set[tuple] = set()
+    kept: list[Span] = []
+    for span in sorted(spans, key=lambda s: s.start):
+        key = (span.task, span.start, span.end)
+        if key in seen:
+            continue
+        seen.add(key)
+        if span.end is not None and (span.end - span.start).total_seconds() < min_span_seconds:
+            continue
+        kept.append(span)
+
+    tolerance = timedelta(seconds=min_span_seconds)
+    merged: list[Span] = []
+    for span in kept:
+        prev = merged[-1] if merged else None
+        if (
+            prev is not None
+            and prev.task == span.task
+            and prev.end is not None
+            and span.start - prev.end <= tolerance
+        ):
+            prev.end = None if span.end is None else max(prev.end, span.end)
+            continue
+        merged.append(replace(span))
+    return merged
+
+
+def compact_day(day: Day, min_span_seconds: float = DEFAULT_MIN_SPAN_SECONDS) -> Day:
+    """Return a copy of the day with its spans compacted."""
+    return replace(day, spans=compact_spans(day.spans, min_span_seconds))
+
+
+def compact_storage(
+    storage: Storage,
+    min_span_seconds: float = DEFAULT_MIN_SPAN_SECONDS,
+    dry_run: bool = False,
+) -> CompactionReport:
+    """Compact every stored day and rewrite storage in its optimal layout.
+
+    Args:
+        storage: Storage to compact
+        min_span_seconds: Spans shorter than this are pruned
+        dry_run: If True, only report what would be saved
+
+    Returns:
+        CompactionReport describing spans and bytes saved
+    """
+    # Held from load to replace, so a concurrent switch-to is not overwritten.
+    with storage.lock():
+        days = storage.load_all_days()
+        compacted = [compact_day(day, min_span_seconds) for day in days]
+
+        report = CompactionReport(
+            days=len(days),
+            spans_before=sum(len(day.spans) for day in days),
+            spans_after=sum(len(day.spans) for day in compacted),
+            bytes_before=storage.file_size(),
+            bytes_after=len(storage.dumps(compacted).encode()) if days else 0,
+            dry_run=dry_run,
+        )
+
+        if not dry_run and days:
+            storage.replace_all_days(compacted)
+            NoteStore(storage.notes_file).carry_over(zip(days, compacted))
+
+    return report
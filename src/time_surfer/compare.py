@@ -0,0 +1,201 @@
+"""Period-over-period comparison of task totals.
+
+A comparison pairs a current period with a baseline and, for trends, the
+periods before the current one. Every period is summed from per-day task
+totals (``ReportCache.daily_totals``), which come from the cached rollups, so
+a 12-week trend costs one scan of the data file's lines and no aggregation
+of spans in days that have not changed since they were last rolled up.
+
+Periods are named after the current one and compared with the one before::
+
+    today, yesterday            a day
+    this-week, last-week        a Monday-to-Sunday week
+    this-month, last-month      a calendar month
+    2026-01-05..2026-01-18      any range, stepping back by its length
+
+Only closed spans count, as in all rollup-based reports.
+"""
+
+import calendar
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+DEFAULT_TREND_PERIODS = 12
+
+_NAMED = {
+    "today": ("day", 0),
+    "yesterday": ("day", 1),
+    "this-week": ("week", 0),
+    "last-week": ("week", 1),
+    "this-month": ("month", 0),
+    "last-month": ("month", 1),
+}
+
+
+class CompareError(ValueError):
+    """Raised for a period that cannot be understood."""
+
+
+@dataclass(frozen=True)
+class Period:
+    """An inclusive range of dates."""
+
+    start: date
+    end: date
+
+    @property
+    def label(self) -> str:
+        """The range as shown in reports."""
+        if self.start == self.end:
+            return self.start.isoformat()
+        return f"{self.start.isoformat()}..{self.end.isoformat()}"
+
+    def previous(self, unit: str) -> "Period":
+        """Return the period before this one: the previous day, week or month, or range."""
+        if unit == "month":
+            end = self.start - timedelta(days=1)
+            return Period(end.replace(day=1), end)
+        length = (self.end - self.start).days + 1
+        return Period(self.start - timedelta(days=length), self.start - timedelta(days=1))
+
+
+@dataclass
+class Comparison:
+    """A current period, the baseline it is compared with, and how to step back."""
+
+    current: Period
+    baseline: Period
+    unit: str
+
+    def trend_periods(self, count: int) -> list[Period]:
+        """The ``count`` periods ending with the current one, oldest first."""
+        periods = [self.current]
+        while len(periods) < count:
+            periods.append(periods[-1].previous(self.unit))
+        return periods[::-1]
+
+
+@dataclass
+class TaskDelta:
+    """One task's totals in the baseline and current periods, and its trend."""
+
+    task: str
+    baseline: float = 0.0
+    current: float = 0.0
+    trend: list[float] = field(default_factory=list)
+
+    @property
+    def delta(self) -> float:
+        """Change in seconds from the baseline."""
+        return self.current - self.baseline
+
+    @property
+    def percent(self) -> float | None:
+        """Change relative to the baseline, or None if there was no baseline time."""
+        return self.delta / self.baseline * 100 if self.baseline else None
+
+
+def parse_range(text: str) -> Period:
+    """Parse ``YYYY-MM-DD..YYYY-MM-DD`` (or a single date) into a Period."""
+    first, sep, last = text.partition("..")
+    try:
+        start = date.fromisoformat(first.strip())
+        end = date.fromisoformat(last.strip()) if sep else start
+    except ValueError:
+        raise CompareError(f"Invalid range {text!r}; expected YYYY-MM-DD..YYYY-MM-DD") from None
+    if end < start:
+        raise CompareError(f"Range {text!r} ends before it starts")
+    return Period(start, end)
+
+
+def resolve(spec: str, today: date, against: str | None = None) -> Comparison:
+    """Turn a period name or range (and an optional explicit baseline) into a Comparison.
+
+    Args:
+        spec: Current period: a name such as ``last-week``, or a date range
+        today: Date the names are relative to
+        against: Baseline range; default the period before the current one
+
+    Returns:
+        Comparison of the current period with its baseline
+
+    Raises:
+        CompareError: For an unknown name or malformed range
+    """
+    if spec in _NAMED:
+        unit, back = _NAMED[spec]
+        current = _period_containing(today, unit)
+        for _ in range(back):
+            current = current.previous(unit)
+    elif spec[:1].isdigit():
+        unit = "range"
+        current = parse_range(spec)
+    else:
+        names = ", ".join(_NAMED)
+        raise CompareError(f"Unknown period {spec!r}; use one of {names} or a date range")
+    baseline = parse_range(against) if against else current.previous(unit)
+    return Comparison(current, baseline, unit)
+
+
+def _period_containing(day: date, unit: str) -> Period:
+    if unit == "week":
+        start = day - timedelta(days=day.weekday())
+        return Period(start, start + timedelta(days=6))
+    if unit == "month":
+        last = calendar.monthrange(day.year, day.month)[1]
+        return Period(day.replace(day=1), day.replace(day=last))
+    return Period(day, day)
+
+
+def period_totals(daily: dict[str, dict[str, float]], period: Period) -> dict[str, float]:
+    """Sum per-day task totals over a period."""
+    start, end = period.start.isoformat(), period.end.isoformat()
+    totals: dict[str, float] = {}
+    for day, day_totals in daily.items():
+        if start <= day <= end:
+            for task, seconds in day_totals.items():
+                totals[task] = totals.get(task, 0.0) + seconds
+    return totals
+
+
+def compare(
+    daily: dict[str, dict[str, float]],
+    comparison: Comparison,
+    trend_periods: int = DEFAULT_TREND_PERIODS,
+) -> list[TaskDelta]:
+    """Compute per-task deltas and trends from per-day totals.
+
+    Args:
+        daily: Date to task totals covering every period involved (see
+            ``ReportCache.daily_totals``)
+        comparison: Periods to compare
+        trend_periods: Number of periods in each trend, ending with the current one
+
+    Returns:
+        TaskDelta per task with time in any period, by current time descending
+    """
+    baseline = period_totals(daily, comparison.baseline)
+    current = period_totals(daily, comparison.current)
+    trends = [period_totals(daily, period) for period in comparison.trend_periods(trend_periods)]
+
+    tasks = {task: None for totals in (current, baseline, *trends) for task in totals}
+    deltas = [
+        TaskDelta(
+            task,
+            baseline.get(task, 0.0),
+            current.get(task, 0.0),
+            [totals.get(task, 0.0) for totals in trends],
+        )
+        for task in tasks
+    ]
+    deltas.sort(key=lambda d: (d.current, d.baseline), reverse=True)
+    return deltas
+
+
+def date_span(comparison: Comparison, trend_periods: int) -> tuple[str, str]:
+    """First and last date needed to compute a comparison with its trends."""
+    periods = [comparison.baseline, *comparison.trend_periods(trend_periods)]
+    return (
+        min(period.start for period in periods).isoformat(),
+        max(period.end for period in periods).isoformat(),
+    )
@@ -0,0 +1,196 @@
+"""Shell completion of task names from a small prefix index.
+
+The index is a text file next to the data file, one known task per line::
+
+    <task>\t<times switched to>\t<last switched to, epoch seconds>\n
+
+sorted case-insensitively by task, so completing a prefix is a binary search
+followed by ranking the matches by frecency (use count decayed by age). It is
+built from the stored spans once, when it does not exist yet, and from then on
+updated incrementally on every ``switch_to``.
+
+Like time_surfer.prompt, this module imports only the standard library
+essentials so the ``time-surfer-complete`` entry point answers in a few
+milliseconds.
+"""
+
+import bisect
+import os
+import shlex
+import sys
+import time
+from collections.abc import Iterable
+
+TASK_INDEX_FILENAME = "tasks"
+DEFAULT_INDEX_PATH = os.path.join("~", ".local", "share", "time-surfer", TASK_INDEX_FILENAME)
+MAX_TASKS = 2000
+HALF_LIFE_DAYS = 14.0
+# Options of switch-to that take a value; keep in step with time_surfer.cli.
+SWITCH_TO_VALUE_OPTIONS = frozenset({"--note", "--ticket", "--meta"})
+
+IndexEntry = tuple[str, int, float]
+
+
+def _sort_key(entry: IndexEntry) -> str:
+    return entry[0].casefold()
+
+
+def _indexable(task: str) -> bool:
+    return bool(task) and "\t" not in task and "\n" not in task
+
+
+def decode_index(text: str) -> list[IndexEntry]:
+    """Parse index content into (task, count, last_used) entries, in index order."""
+    entries = []
+    for line in text.splitlines():
+        task, sep, rest = line.partition("\t")
+        count, sep2, last = rest.partition("\t")
+        if not (sep and sep2 and task):
+            continue
+        try:
+            entries.append((task, int(count), float(last)))
+        except ValueError:
+            continue
+    return entries
+
+
+def encode_index(entries: list[IndexEntry]) -> str:
+    """Serialise entries, sorted as the index requires."""
+    return "".join(
+        f"{task}\t{count}\t{last:.0f}\n" for task, count, last in sorted(entries, key=_sort_key)
+    )
+
+
+def read_index(path: str) -> list[IndexEntry]:
+    """Read the index at ``path`` (empty if missing)."""
+    try:
+        with open(path) as f:
+            return decode_index(f.read())
+    except OSError:
+        return []
+
+
+def frecency(count: int, last_used: float, now: float) -> float:
+    """Use count decayed with a two-week half-life since last use."""
+    age_days = max(0.0, now - last_used) / 86400
+    return count * 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+
+def record_use(entries: list[IndexEntry], task: str, when: float) -> list[IndexEntry] | None:
+    """Return the index with one more use of ``task``, or None if it cannot be indexed.
+
+    When the index is full the lowest-ranked task is dropped.
+    """
+    if not _indexable(task):
+        return None
+    updated = [entry for entry in entries if entry[0] != task]
+    previous = next((entry for entry in entries if entry[0] == task), None)
+    updated.append((task, (previous[1] if previous else 0) + 1, when))
+    if len(updated) > MAX_TASKS:
+        updated.sort(key=lambda e: frecency(e[1], e[2], when), reverse=True)
+        del updated[MAX_TASKS:]
+    return updated
+
+
+def index_from_history(uses: Iterable[tuple[str, float]]) -> list[IndexEntry]:
+    """Build index entries from past (task, epoch seconds) uses, oldest first.
+
+    Used to seed a missing index from the stored spans. If there are more than
+    ``MAX_TASKS`` tasks, the lowest-ranked ones are left out.
+    """
+    counts: dict[str, tuple[int, float]] = {}
+    for task, when in uses:
+        if _indexable(task):
+            counts[task] = (counts.get(task, (0, 0.0))[0] + 1, when)
+    entries = [(task, count, last) for task, (count, last) in counts.items()]
+    if len(entries) > MAX_TASKS:
+        now = max(last for _, _, last in entries)
+        entries.sort(key=lambda e: frecency(e[1], e[2], now), reverse=True)
+        del entries[MAX_TASKS:]
+    return entries
+
+
+def load_index(path: str) -> list[IndexEntry]:
+    """Read the index at ``path``, seeding it first from the data file next to it if missing."""
+    if not os.path.exists(path):
+        # Deferred: importing storage is only worth it the one time the index is built.
+        from pathlib import Path
+
+        from time_surfer.storage import Storage
+
+        Storage(Path(path).with_name("data.json")).seed_task_index()
+    return read_index(path)
+
+
+def completing_task(line: str) -> bool:
+    """Whether the last word of a command line is the task argument of ``switch-to``.
+
+    ``line`` runs up to the cursor, so a trailing space means a new, empty word.
+    Values of options such as ``--note`` and words after the task are not tasks.
+    """
+    # Close a quote left open by the word being typed.
+    for closing in ("", '"', "'"):
+        try:
+            words = shlex.split(line + closing)
+            break
+        except ValueError:
+            continue
+    else:
+        words = line.split()
+    if not closing and (not line or line[-1].isspace()):
+        words.append("")
+    if words[1:2] != ["switch-to"] or words[-1].startswith("-"):
+        return False
+    expecting_value = False
+    for word in words[2:-1]:
+        if expecting_value:
+            expecting_value = False
+        elif word.startswith("-"):
+            expecting_value = word in SWITCH_TO_VALUE_OPTIONS
+        else:
+            return False  # The task has already been given.
+    return not expecting_value
+
+
+def complete(
+    entries: list[IndexEntry], prefix: str, now: float | None = None, limit: int | None = None
+) -> list[str]:
+    """Tasks starting with ``prefix`` (case-insensitive), best first.
+
+    ``entries`` must be in index order, as returned by ``read_index``.
+    """
+    now = time.time() if now is None else now
+    folded = prefix.casefold()
+    keys = [_sort_key(entry) for entry in entries]
+    lo = bisect.bisect_left(keys, folded)
+    matches = []
+    for i in range(lo, len(entries)):
+        if not keys[i].startswith(folded):
+            break
+        matches.append(entries[i])
+    matches.sort(key=lambda e: (-frecency(e[1], e[2], now), e[0]))
+    return [task for task, _, _ in matches[:limit]]
+
+
+def main() -> None:
+    """Print completions, one per line.
+
+    Works as a bash ``complete -C`` command (``COMP_LINE`` is set and the word
+    being completed is the second argument) or standalone with a prefix
+    argument. Only the task argument of ``switch-to`` is completed.
+    """
+    if "COMP_LINE" in os.environ:
+        line = os.environ["COMP_LINE"]
+        point = os.environ.get("COMP_POINT", "")
+        prefix = sys.argv[2] if len(sys.argv) > 2 else ""
+        if not completing_task(line[: int(point)] if point.isdigit() else line):
+            return
+    else:
+        prefix = sys.argv[1] if len(sys.argv) > 1 else ""
+    path = os.environ.get("TIME_SURFER_TASK_INDEX") or os.path.expanduser(DEFAULT_INDEX_PATH)
+    for task in complete(load_index(path), prefix):
+        sys.stdout.write(task + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""User configuration from ``~/.config/time-surfer/config.yaml``."""
+
+import fnmatch
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from time_surfer.formatting import parse_duration
+from time_surfer.storage import Durability, Storage
+
+
+class ConfigError(ValueError):
+    """Raised when the configuration file is invalid."""
+
+
+@dataclass
+class Budget:
+    """A daily and/or weekly time limit for one task or one tag."""
+
+    name: str
+    is_tag: bool = False
+    daily: float | None = None
+    weekly: float | None = None
+
+    @property
+    def label(self) -> str:
+        """How the budget is referred to in warnings."""
+        return f"tag '{self.name}'" if self.is_tag else f"'{self.name}'"
+
+
+@dataclass
+class Config:
+    """Parsed configuration."""
+
+    budgets: list[Budget] = field(default_factory=list)
+    # Tag name to task names or glob patterns (e.g. "meeting*").
+    tags: dict[str, list[str]] = field(default_factory=dict)
+    metrics_enabled: bool = True
+    # Prometheus textfile-collector file rewritten after each command.
+    metrics_textfile: Path | None = None
+    # How the CLI's Storage makes writes durable (see time_surfer.storage.Durability).
+    durability: Durability = Durability.RELAXED
+    commit_max_events: int = Storage.DEFAULT_COMMIT_MAX_EVENTS
+    commit_interval_ms: int = Storage.DEFAULT_COMMIT_INTERVAL_MS
+
+    def tags_for(self, task: str) -> list[str]:
+        """Return the tags whose patterns match ``task``."""
+        return [
+            tag
+            for tag, patterns in self.tags.items()
+            if any(fnmatch.fnmatchcase(task, pattern) for pattern in patterns)
+        ]
+
+
+def default_config_path() -> Path:
+    """Return the config file path, honouring ``XDG_CONFIG_HOME``."""
+    base = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(base) / "time-surfer" / "config.yaml"
+
+
+# Parsed configs by path, with the (mtime, size) they were parsed at.
+_CACHE: dict[Path, tuple[tuple[int, int], Config]] = {}
+
+
+def load_config(path: Path | None = None) -> Config:
+    """Load the configuration file; a missing file gives the defaults.
+
+    Args:
+        path: Config file (default ``~/.config/time-surfer/config.yaml``)
+
+    Returns:
+        Parsed Config
+
+    Raises:
+        ConfigError: If the file is not valid YAML or has invalid values
+    """
+    path = path or default_config_path()
+    try:
+        stat = path.stat()
+    except OSError:
+        return Config()
+    # Commands load the config more than once; parse it again only if it changed.
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    config = _parse_file(path)
+    _CACHE[path] = (version, config)
+    return config
+
+
+def _parse_file(path: Path) -> Config:
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f)
+    except FileNotFoundError:
+        return Config()
+    except yaml.YAMLError as e:
+        raise ConfigError(f"{path}: {e}") from None
+
+    if data is None:
+        return Config()
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: expected a mapping at the top level")
+
+    config = Config(
+        budgets=[_parse_budget(entry, path) for entry in data.get("budgets") or []],
+        tags=_parse_tags(data.get("tags") or {}, path),
+    )
+    _parse_metrics(data.get("metrics") or {}, path, config)
+    _parse_storage(data.get("storage") or {}, path, config)
+    return config
+
+
+def _parse_storage(data, path: Path, config: Config) -> None:
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: 'storage' must be a mapping")
+    durability = data.get("durability", Durability.RELAXED.value)
+    if durability not in (Durability.STRICT, Durability.RELAXED):
+        raise ConfigError(f"{path}: 'storage.durability' must be 'strict' or 'relaxed'")
+    max_events = data.get("commit_max_events", Storage.DEFAULT_COMMIT_MAX_EVENTS)
+    if isinstance(max_events, bool) or not isinstance(max_events, int) or max_events < 1:
+        raise ConfigError(f"{path}: 'storage.commit_max_events' must be a positive integer")
+    interval_ms = config.commit_interval_ms
+    if data.get("commit_interval") is not None:
+        try:
+            interval_ms = round(parse_duration(str(data["commit_interval"])) * 1000)
+        except ValueError as e:
+            raise ConfigError(f"{path}: 'storage.commit_interval': {e}") from None
+    config.durability = Durability(durability)
+    config.commit_max_events = max_events
+    config.commit_interval_ms = interval_ms
+
+
+def _parse_metrics(data, path: Path, config: Config) -> None:
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: 'metrics' must be a mapping")
+    enabled = data.get("enabled", True)
+    if not isinstance(enabled, bool):
+        raise ConfigError(f"{path}: 'metrics.enabled' must be true or false")
+    textfile = data.get("textfile")
+    if textfile is not None and not isinstance(textfile, str):
+        raise ConfigError(f"{path}: 'metrics.textfile' must be a file path")
+    config.metrics_enabled = enabled
+    config.metrics_textfile = Path(textfile).expanduser() if textfile else None
+
+
+def _parse_tags(data, path: Path) -> dict[str, list[str]]:
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: 'tags' must map tag names to lists of tasks")
+    tags = {}
+    for tag, patterns in data.items():
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            raise ConfigError(f"{path}: tag '{tag}' must list task names or patterns")
+        tags[str(tag)] = patterns
+    return tags
+
+
+def _parse_budget(entry, path: Path) -> Budget:
+    if not isinstance(entry, dict) or ("task" in entry) == ("tag" in entry):
+        raise ConfigError(f"{path}: each budget needs exactly one of 'task' or 'tag'")
+    budget = Budget(name=str(entry.get("task", entry.get("tag"))), is_tag="tag" in entry)
+    for period in ("daily", "weekly"):
+        if entry.get(period) is not None:
+            try:
+                setattr(budget, period, parse_duration(str(entry[period])))
+            except ValueError as e:
+                raise ConfigError(f"{path}: budget for {budget.label}: {e}") from None
+    if budget.daily is None and budget.weekly is None:
+        raise ConfigError(f"{path}: budget for {budget.label} needs 'daily' or 'weekly'")
+    return budget
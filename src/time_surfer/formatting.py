@@ -1,8 +1,18 @@
 """Formatting utilities for time-surfer output."""
 
+import math
+import re
+
 from rich import box
 from rich.table import Table
 
+from time_surfer.compare import TaskDelta
+from time_surfer.heatmap import WEEKDAY_NAMES
+from time_surfer.stats import TaskStats
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)([hms])")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1}
+
 
 def format_duration(seconds: float) -> str:
     """Format seconds as H:MM:SS.
@@ -19,9 +29,36 @@ def format_duration(seconds: float) -> str:
     return f"{hours}:{mins:02d}:{secs:02d}"
 
 
+def parse_duration(text: str) -> float:
+    """Parse a duration such as "90", "45s", "10m" or "1h30m" into seconds.
+
+    Args:
+        text: Duration string; a bare number is taken as seconds
+
+    Returns:
+        Number of seconds
+
+    Raises:
+        ValueError: If the text is not a valid duration, or is negative or not finite
+    """
+    text = text.strip().lower()
+    try:
+        seconds = float(text)
+    except ValueError:
+        parts = _DURATION_PART.findall(text)
+        if not parts or "".join(value + unit for value, unit in parts) != text:
+            raise ValueError(f"Invalid duration: {text!r}")
+        seconds = sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+    if not math.isfinite(seconds) or seconds < 0:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return seconds
+
+
 def create_task_table(
     task_totals: dict[str, float],
     total_duration: float | None = None,
+    untracked: float | None = None,
+    attributed: dict[str, float] | None = None,
 ) -> Table:
     """Create a rich Table showing tasks, durations, and percentages.
 
@@ -29,6 +66,10 @@ def create_task_table(
         task_totals: Dict mapping task name to total seconds
         total_duration: Total duration in seconds (if provided, used to calculate
             untracked time and percentages)
+        untracked: Exact untracked seconds (e.g. from a Timeline); by default
+            ``total_duration`` minus the task sum, which is wrong if spans overlap
+        attributed: Seconds per task with overlapping time shared between
+            concurrent tasks; used for percentages so they add up to 100%
 
     Returns:
         Rich Table ready for printing
@@ -51,12 +92,14 @@ def create_task_table(
 
     for task, seconds in sorted_tasks:
         duration_str = format_duration(seconds)
-        percentage = (seconds / base_duration * 100) if base_duration > 0 else 0
+        share = attributed.get(task, seconds) if attributed is not None else seconds
+        percentage = (share / base_duration * 100) if base_duration > 0 else 0
         table.add_row(task, duration_str, f"{percentage:.1f}%")
 
     # Calculate and show untracked time if total_duration provided
     if total_duration is not None:
-        untracked = total_duration - task_sum
+        if untracked is None:
+            untracked = total_duration - task_sum
         # Only show if >= 0.5 seconds (handles floating point errors)
         if untracked >= 0.5:
             percentage = (untracked / base_duration * 100) if base_duration > 0 else 0
@@ -67,3 +110,204 @@ def create_task_table(
     table.add_row("Total", format_duration(base_duration), "100.0%", style="bold")
 
     return table
+
+
+def create_user_breakdown_table(user_totals: dict[str, dict[str, float]]) -> Table:
+    """Create a rich Table showing each user's time per task.
+
+    Args:
+        user_totals: Dict mapping user name to that user's task totals
+
+    Returns:
+        Rich Table ready for printing
+    """
+    table = Table(box=box.HORIZONTALS, show_edge=False)
+    table.add_column("User", style="magenta")
+    table.add_column("Task", style="cyan")
+    table.add_column("Duration", justify="right")
+
+    for user, task_totals in user_totals.items():
+        sorted_tasks = sorted(task_totals.items(), key=lambda x: x[1], reverse=True)
+        for i, (task, seconds) in enumerate(sorted_tasks):
+            table.add_row(user if i == 0 else "", task, format_duration(seconds))
+        if sorted_tasks:
+            table.add_row("", "Total", format_duration(sum(task_totals.values())), style="bold")
+            table.add_section()
+
+    return table
+
+
+def create_session_stats_table(tasks: dict[str, TaskStats]) -> Table:
+    """Create a rich Table of per-task session-length statistics.
+
+    Args:
+        tasks: Dict mapping task name to its session statistics
+
+    Returns:
+        Rich Table ready for printing, sorted by total time descending
+    """
+    quantile_points = sorted({p for stats in tasks.values() for p in stats.quantiles})
+
+    table = Table(box=box.HORIZONTALS, show_edge=False)
+    table.add_column("Task", style="cyan")
+    table.add_column("Sessions", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Mean", justify="right")
+    for p in quantile_points:
+        table.add_column(f"p{p * 100:g}", justify="right")
+    table.add_column("Longest", justify="right")
+
+    sorted_tasks = sorted(tasks.items(), key=lambda x: x[1].sessions.total, reverse=True)
+    for task, stats in sorted_tasks:
+        sessions = stats.sessions
+        percentiles = [format_duration(stats.quantiles[p].value or 0) for p in quantile_points]
+        table.add_row(
+            task,
+            str(sessions.count),
+            format_duration(sessions.total),
+            format_duration(sessions.mean),
+            *percentiles,
+            format_duration(sessions.maximum),
+        )
+
+    return table
+
+
+def create_hour_distribution_table(hour_of_day: list[float], width: int = 30) -> Table:
+    """Create a rich Table showing tracked time per hour of the day.
+
+    Args:
+        hour_of_day: 24 values of seconds tracked in each hour
+        width: Width of the longest bar in characters
+
+    Returns:
+        Rich Table ready for printing (empty hours are omitted)
+    """
+    table = Table(box=box.HORIZONTALS, show_edge=False)
+    table.add_column("Hour")
+    table.add_column("Duration", justify="right")
+    table.add_column("")
+
+    peak = max(hour_of_day, default=0)
+    for hour, seconds in enumerate(hour_of_day):
+        if seconds <= 0:
+            continue
+        bar = "█" * max(1, round(seconds / peak * width))
+        table.add_row(f"{hour:02d}:00", format_duration(seconds), f"[green]{bar}[/green]")
+
+    return table
+
+
+_HEAT_SHADES = "·░▒▓█"
+
+
+def format_heatmap(grid: list[float]) -> str:
+    """Render a weekday × 15-minute heatmap as text.
+
+    Args:
+        grid: 7 × 96 values of seconds per weekly slot, Monday 00:00 first
+
+    Returns:
+        One header line of hours and one line per weekday, shaded relative to
+        the busiest slot
+    """
+    per_day = len(grid) // len(WEEKDAY_NAMES)
+    per_hour = per_day // 24
+    peak = max(grid, default=0)
+    lines = [("    " + "".join(f"{hour:<{per_hour}d}" for hour in range(24))).rstrip()]
+    for weekday, name in enumerate(WEEKDAY_NAMES):
+        row = grid[weekday * per_day:(weekday + 1) * per_day]
+        cells = []
+        for seconds in row:
+            if seconds <= 0 or peak <= 0:
+                cells.append(_HEAT_SHADES[0])
+            else:
+                level = 1 + min(3, int(seconds / peak * 4))
+                cells.append(_HEAT_SHADES[level])
+        lines.append(f"{name} " + "".join(cells))
+    return "\n".join(lines)
+
+
+_SPARK_BARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: list[float]) -> str:
+    """Render values as a one-line bar chart scaled to the largest value.
+
+    Args:
+        values: Non-negative values, oldest first
+
+    Returns:
+        One character per value; "·" marks zero
+    """
+    peak = max(values, default=0)
+    chars = []
+    for value in values:
+        if value <= 0 or peak <= 0:
+            chars.append("·")
+        else:
+            level = min(len(_SPARK_BARS) - 1, int(value / peak * len(_SPARK_BARS)))
+            chars.append(_SPARK_BARS[level])
+    return "".join(chars)
+
+
+def format_delta(seconds: float) -> str:
+    """Format a signed change in seconds, e.g. "+1:30:00" or "-0:15:00"."""
+    sign = "-" if seconds < 0 else "+"
+    return sign + format_duration(abs(seconds))
+
+
+def create_compare_table(deltas: list[TaskDelta]) -> Table:
+    """Create a rich Table comparing task totals between two periods.
+
+    Args:
+        deltas: Per-task totals and trends (see time_surfer.compare)
+
+    Returns:
+        Rich Table ready for printing, with a totals row
+    """
+    table = Table(box=box.HORIZONTALS, show_edge=False)
+    table.add_column("Task", style="cyan")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("%", justify="right")
+    table.add_column("Trend")
+
+    for delta in deltas:
+        table.add_row(
+            delta.task,
+            format_duration(delta.baseline),
+            format_duration(delta.current),
+            _styled_delta(delta.delta),
+            _format_percent(delta.percent, delta.current),
+            sparkline(delta.trend),
+        )
+
+    baseline = sum(delta.baseline for delta in deltas)
+    current = sum(delta.current for delta in deltas)
+    trend = [sum(column) for column in zip(*(delta.trend for delta in deltas))]
+    table.add_section()
+    table.add_row(
+        "Total",
+        format_duration(baseline),
+        format_duration(current),
+        _styled_delta(current - baseline),
+        _format_percent((current - baseline) / baseline * 100 if baseline else None, current),
+        sparkline(trend),
+        style="bold",
+    )
+    return table
+
+
+def _styled_delta(seconds: float) -> str:
+    if abs(seconds) < 0.5:
+        return format_delta(0)
+    color = "green" if seconds > 0 else "red"
+    return f"[{color}]{format_delta(seconds)}[/{color}]"
+
+
+def _format_percent(percent: float | None, current: float) -> str:
+    if percent is None:
+        return "new" if current > 0 else ""
+    return f"{percent:+.0f}%"
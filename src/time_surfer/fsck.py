@@ -0,0 +1,355 @@
+"""Verification and repair of data files (``time-surfer fsck``).
+
+``check_file`` splits the data file into byte ranges ("segments") aligned to
+line boundaries and verifies them in parallel worker processes: every record
+must pass its checksum (schema version 3), decode into a valid day, and come
+after the previous record in date order. Only small per-segment summaries are
+sent back; the order across segment boundaries is checked when merging them.
+
+``check_tail`` verifies just the last few kilobytes, where the most recent
+days (the hot segment, rewritten by every save) live. It costs about a
+millisecond whatever the file size, so the CLI runs it on startup and, if it
+finds damage, runs ``repair`` when the backup passes every check.
+
+``repair`` keeps every good record, restores each damaged one from the last
+good copy (``<data file>.bak``, kept by saves) and moves the damaged lines to
+``<data file>.corrupt`` rather than deleting them.
+"""
+
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from time_surfer.storage import (
+    CHECKSUM_SCHEMA_VERSION,
+    LEGACY_SCHEMA_VERSION,
+    SCHEMA_VERSION,
+    CorruptDataError,
+    Storage,
+    UnsupportedSchemaError,
+    decode_payload,
+    decode_record,
+    read_schema_version,
+    seal,
+)
+
+DEFAULT_TAIL_BYTES = 64 * 1024
+# Segments smaller than this are not worth a worker process.
+MIN_SEGMENT_BYTES = 4 * 1024 * 1024
+CORRUPT_SUFFIX = ".corrupt"
+
+_DATE_PREFIX = re.compile(rb'^\{"date":"(\d{4}-\d{2}-\d{2})"')
+
+
+@dataclass
+class Problem:
+    """A damaged or misplaced record."""
+
+    offset: int
+    message: str
+    date: str | None = None
+
+    def __str__(self) -> str:
+        where = f"byte {self.offset}" + (f" ({self.date})" if self.date else "")
+        return f"{where}: {self.message}"
+
+
+@dataclass
+class SegmentResult:
+    """Summary of one verified byte range."""
+
+    records: int = 0
+    first_date: str | None = None
+    first_offset: int = 0
+    last_date: str | None = None
+    problems: list[Problem] = field(default_factory=list)
+
+
+@dataclass
+class FsckResult:
+    """Outcome of verifying a data file."""
+
+    schema_version: int | None
+    size: int = 0
+    records: int = 0
+    segments: int = 0
+    problems: list[Problem] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if no problems were found."""
+        return not self.problems
+
+
+@dataclass
+class RepairResult:
+    """What a repair changed."""
+
+    kept: int = 0
+    restored: list[str] = field(default_factory=list)
+    lost: list[Problem] = field(default_factory=list)
+    quarantine_file: Path | None = None
+
+
+@dataclass
+class _Line:
+    offset: int
+    raw: bytes
+    date: str | None
+    line: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class _Damaged(_Line):
+    # Date of the last good record before this line.
+    prev_date: str | None = None
+
+
+def _header(path: Path) -> tuple[int | None, int]:
+    """Return the schema version and the offset of the first record."""
+    with open(path, "rb") as f:
+        first = f.readline(64)
+    with open(path) as f:
+        version = read_schema_version(f)
+    if version is None or version == LEGACY_SCHEMA_VERSION:
+        return version, 0
+    return version, len(first)
+
+
+def _scan(storage: Storage, f: BinaryIO, start: int, end: int, version: int) -> Iterator[_Line]:
+    """Decode the lines starting in [start, end), verifying each record."""
+    checksummed = version >= CHECKSUM_SCHEMA_VERSION
+    f.seek(start)
+    if start > 0:
+        f.seek(start - 1)
+        if f.read(1) != b"\n":
+            f.readline()  # Finish the line that started in the previous segment.
+    offset = f.tell()
+    while offset < end:
+        raw = f.readline()
+        if not raw:
+            break
+        item = _decode(storage, offset, raw, checksummed)
+        offset += len(raw)
+        if item is not None:
+            yield item
+
+
+def _decode(storage: Storage, offset: int, raw: bytes, checksummed: bool) -> _Line | None:
+    stripped = raw.rstrip(b"\n")
+    if not stripped:
+        return None
+    match = _DATE_PREFIX.match(stripped)
+    item = _Line(offset, raw, match.group(1).decode() if match else None)
+    try:
+        text = stripped.decode()
+        if checksummed:
+            record = decode_record(text)
+        else:
+            record = decode_payload(text)
+            text = seal(text)
+        storage._dict_to_day(record)
+    except UnicodeDecodeError:
+        item.error = "not valid UTF-8"
+    except CorruptDataError as e:
+        item.error = str(e)
+    except (KeyError, TypeError, ValueError) as e:
+        item.error = f"invalid day record: {e!r}"
+    else:
+        item.date = record["date"]
+        item.line = text
+    return item
+
+
+def check_segment(path: Path, start: int, end: int, version: int) -> SegmentResult:
+    """Verify the records starting in one byte range of a data file."""
+    result = SegmentResult()
+    with open(path, "rb") as f:
+        for item in _scan(Storage(path), f, start, end, version):
+            if item.error is not None:
+                result.problems.append(Problem(item.offset, item.error, item.date))
+                continue
+            if result.last_date is not None and item.date <= result.last_date:
+                kind = "duplicate date" if item.date == result.last_date else "out of order"
+                result.problems.append(Problem(item.offset, kind, item.date))
+                continue
+            if result.first_date is None:
+                result.first_date, result.first_offset = item.date, item.offset
+            result.last_date = item.date
+            result.records += 1
+    return result
+
+
+def check_file(
+    path: Path, max_workers: int | None = None, min_segment_bytes: int = MIN_SEGMENT_BYTES
+) -> FsckResult:
+    """Verify every record of a data file, in parallel for large files.
+
+    Args:
+        path: Data file to verify
+        max_workers: Worker processes (default: one per CPU; 1 runs inline)
+        min_segment_bytes: Smallest range given to a worker
+
+    Returns:
+        FsckResult listing every problem found
+
+    Raises:
+        UnsupportedSchemaError: If the file is newer than this version supports
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return FsckResult(schema_version=None)
+    version, body = _header(path)
+    result = FsckResult(schema_version=version, size=size)
+    if version is None:
+        return result
+    if version == LEGACY_SCHEMA_VERSION:
+        result.segments = 1
+        try:
+            result.records = sum(1 for _ in Storage(path).iter_lines())
+        except CorruptDataError as e:
+            result.problems.append(Problem(0, str(e)))
+        return result
+    if version > SCHEMA_VERSION:
+        raise UnsupportedSchemaError(
+            f"{path} uses schema version {version}; "
+            f"this version of time-surfer supports up to {SCHEMA_VERSION}"
+        )
+
+    workers = max_workers or os.cpu_count() or 1
+    count = max(1, min(workers, (size - body) // max(1, min_segment_bytes)))
+    bounds = [body + (size - body) * i // count for i in range(count + 1)]
+    args = ([path] * count, bounds[:-1], bounds[1:], [version] * count)
+    if count == 1:
+        segments = list(map(check_segment, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=count) as executor:
+            segments = list(executor.map(check_segment, *args))
+
+    result.segments = count
+    last_date = None
+    for segment in segments:
+        result.records += segment.records
+        result.problems.extend(segment.problems)
+        if segment.first_date is None:
+            continue
+        if last_date is not None and segment.first_date <= last_date:
+            kind = "duplicate date" if segment.first_date == last_date else "out of order"
+            result.problems.append(Problem(segment.first_offset, kind, segment.first_date))
+            result.records -= 1
+        last_date = segment.last_date
+    result.problems.sort(key=lambda problem: problem.offset)
+    return result
+
+
+def check_tail(path: Path, nbytes: int = DEFAULT_TAIL_BYTES) -> list[Problem]:
+    """Verify the records in the last ``nbytes`` of a data file (the hot segment).
+
+    Legacy (schema version 1) files are not line-based and are not checked.
+    """
+    try:
+        size = path.stat().st_size
+        version, body = _header(path)
+    except (FileNotFoundError, UnicodeDecodeError):
+        return []
+    if version is None or version == LEGACY_SCHEMA_VERSION or version > SCHEMA_VERSION:
+        return []
+    start = max(body, size - nbytes)
+    return check_segment(path, start, size, version).problems
+
+
+def repair(storage: Storage) -> RepairResult:
+    """Rewrite the data file without damaged records, restoring them from the backup.
+
+    Each damaged line is replaced by the backup's records for the same date or,
+    if its date cannot be read, for the dates between its neighbours (records
+    are stored in date order). Damaged lines are appended to
+    ``<data file>.corrupt``. The backup itself is left untouched.
+
+    Returns:
+        RepairResult with the dates restored and the damage that could not be
+    """
+    with storage.lock():
+        good, bad = _read_tolerant(storage.data_file)
+        result = RepairResult(kept=len(good))
+        if not bad:
+            return result
+        backup, _ = _read_tolerant(storage.backup_file)
+
+        dates = sorted(good)
+        restored: dict[str, str] = {}
+        for item in bad:
+            if item.date in good:
+                continue  # A duplicate, or a damaged copy of a day that is intact.
+            if item.date is not None:
+                wanted = [item.date]
+            else:
+                wanted = [
+                    date
+                    for date in backup
+                    if date not in good and _between(dates, item.prev_date, date)
+                ]
+            found = [date for date in wanted if date in backup]
+            restored.update((date, backup[date]) for date in found)
+            if not found:
+                result.lost.append(Problem(item.offset, item.error or "damaged", item.date))
+        result.restored = sorted(restored)
+
+        quarantine = storage.data_file.with_name(storage.data_file.name + CORRUPT_SUFFIX)
+        with open(quarantine, "ab") as f:
+            for item in bad:
+                f.write(item.raw if item.raw.endswith(b"\n") else item.raw + b"\n")
+        result.quarantine_file = quarantine
+
+        storage._write_lines(sorted({**good, **restored}.items()))
+    return result
+
+
+def _read_tolerant(path: Path) -> tuple[dict[str, str], list[_Damaged]]:
+    """Split a data file into good records (date to line) and damaged lines."""
+    try:
+        version, body = _header(path)
+    except FileNotFoundError:
+        return {}, []
+    except UnicodeDecodeError:
+        version, body = SCHEMA_VERSION, 0
+    good: dict[str, str] = {}
+    bad: list[_Damaged] = []
+    if version is None:
+        return good, bad
+    if version > SCHEMA_VERSION:
+        raise UnsupportedSchemaError(f"{path} uses schema version {version}")
+    if version == LEGACY_SCHEMA_VERSION:
+        try:
+            return dict(Storage(path).iter_lines()), bad
+        except CorruptDataError as e:
+            # The whole file is one damaged record.
+            with open(path, "rb") as f:
+                raw = f.read()
+            return good, [_Damaged(0, raw, None, error=str(e))]
+
+    last_date = None
+    with open(path, "rb") as f:
+        for item in _scan(Storage(path), f, body, os.fstat(f.fileno()).st_size, version):
+            if item.error is not None or item.date in good:
+                error = item.error or "duplicate date"
+                bad.append(_Damaged(item.offset, item.raw, item.date, error=error))
+                bad[-1].prev_date = last_date
+                continue
+            good[item.date] = item.line
+            last_date = max(last_date or item.date, item.date)
+    return good, bad
+
+
+def _between(dates: list[str], prev_date: str | None, date: str) -> bool:
+    """Whether ``date`` lies after ``prev_date`` and before the next good date."""
+    if prev_date is not None and date <= prev_date:
+        return False
+    later = [d for d in dates if prev_date is None or d > prev_date]
+    return not later or date < later[0]
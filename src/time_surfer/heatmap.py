@@ -0,0 +1,73 @@
+"""Weekday × time-of-day heatmaps from precomputed per-day bins.
+
+The week is divided into 7 × 96 fixed slots (Monday 00:00-00:15 is slot 0). A
+day record's bins map each task to the seconds its spans spent in each slot;
+they are computed once per day record and cached by content hash next to the
+report rollups (see ``ReportCache.heatmap``), so a week or a year heatmap
+is a sum of small arrays rather than a re-slicing of every span.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from time_surfer.models import Day
+
+BIN_MINUTES = 15
+BINS_PER_DAY = 24 * 60 // BIN_MINUTES
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+SLOTS = len(WEEKDAY_NAMES) * BINS_PER_DAY
+
+# Task to {slot: seconds}; sparse, since a day touches few slots.
+DayBins = dict[str, dict[int, float]]
+
+
+def slot_of(when: datetime) -> int:
+    """Return the weekly slot containing ``when``."""
+    return when.weekday() * BINS_PER_DAY + (when.hour * 60 + when.minute) // BIN_MINUTES
+
+
+def add_span_bins(start: datetime, end: datetime, bins: dict[int, float]) -> None:
+    """Add the seconds between ``start`` and ``end`` to the slots they cover."""
+    cursor = start
+    while cursor < end:
+        minute = cursor.minute - cursor.minute % BIN_MINUTES
+        floor = cursor.replace(minute=minute, second=0, microsecond=0)
+        segment_end = min(floor + timedelta(minutes=BIN_MINUTES), end)
+        slot = slot_of(cursor)
+        bins[slot] = bins.get(slot, 0.0) + (segment_end - cursor).total_seconds()
+        cursor = segment_end
+
+
+def day_bins(day: Day, now: datetime | None = None) -> DayBins:
+    """Bin a day's spans by task; open spans run to ``now`` (skipped if None)."""
+    bins: DayBins = {}
+    for span in day.spans:
+        end = span.end or now
+        if end is None or end <= span.start:
+            continue
+        add_span_bins(span.start, end, bins.setdefault(span.task, {}))
+    return bins
+
+
+@dataclass
+class Heatmap:
+    """Seconds per task in each weekly slot, summed over a range of days."""
+
+    tasks: dict[str, list[float]] = field(default_factory=dict)
+    days: int = 0
+
+    def add(self, bins: DayBins) -> None:
+        """Add one day's bins."""
+        self.days += 1
+        for task, slots in bins.items():
+            grid = self.tasks.get(task)
+            if grid is None:
+                grid = self.tasks[task] = [0.0] * SLOTS
+            for slot, seconds in slots.items():
+                grid[slot] += seconds
+
+    def grid(self, task: str | None = None) -> list[float]:
+        """Seconds per slot for one task, or for all tasks together."""
+        if task is not None:
+            return list(self.tasks.get(task, [0.0] * SLOTS))
+        return [sum(column) for column in zip(*self.tasks.values())] or [0.0] * SLOTS
@@ -0,0 +1,191 @@
+"""Automatic task switching from version-control hooks.
+
+``install_git_hook`` adds a post-checkout hook that hands the new branch to
+``time-surfer hook git-checkout`` in the background. Rebases and bisects fire
+many checkouts within seconds, so each hook invocation records itself as the
+latest pending checkout, waits for the burst to settle, and only the one that is
+still the latest when the wait ends calls ``switch_to``. A burst therefore costs
+one small pending-file write per checkout and a single ``save_day``, and the
+resulting span is backdated to when the final checkout happened.
+"""
+
+import os
+import shlex
+import stat
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from time_surfer.models import TrackerResult
+from time_surfer.storage import atomic_write
+from time_surfer.tracker import Tracker
+
+DEFAULT_SETTLE_SECONDS = 2.0
+PENDING_FILENAME = "git-checkout.pending"
+HOOK_BEGIN = "# >>> time-surfer: switch task on branch checkout >>>"
+HOOK_END = "# <<< time-surfer <<<"
+BRANCH_PREFIXES = ("feature/", "feat/", "bugfix/", "fix/", "hotfix/", "chore/")
+
+
+class HookInstallError(Exception):
+    """Raised when a hook cannot be installed or removed."""
+
+
+def task_from_branch(branch: str) -> str:
+    """Derive a task name from a branch, e.g. ``feature/login-page`` -> ``login-page``."""
+    branch = branch.removeprefix("refs/heads/")
+    for prefix in BRANCH_PREFIXES:
+        if branch.startswith(prefix) and len(branch) > len(prefix):
+            return branch[len(prefix):]
+    return branch
+
+
+def hook_script() -> str:
+    """Return the post-checkout snippet that runs the debounced switch.
+
+    Only branch checkouts on a named branch count; detached HEADs (bisect, the
+    middle of a rebase) are ignored. The snippet always exits 0 because git
+    reports the hook's status as the status of the checkout itself.
+    """
+    command = f"{shlex.quote(sys.executable)} -m time_surfer.cli hook git-checkout"
+    return (
+        f"{HOOK_BEGIN}\n"
+        'if [ "$3" = "1" ] && branch=$(git symbolic-ref --short -q HEAD); then\n'
+        f'    ({command} "$branch" >/dev/null 2>&1 &)\n'
+        "fi\n"
+        f"{HOOK_END}\n"
+    )
+
+
+def _hooks_dir(repo: Path) -> Path:
+    """Locate the hooks directory, honouring worktrees and core.hooksPath."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--git-path", "hooks"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise HookInstallError(f"{repo} is not a git repository") from e
+    return (repo / output).resolve()
+
+
+def install_git_hook(repo: Path) -> Path:
+    """Install (or keep) the post-checkout hook in a repository.
+
+    An existing hook that is not ours is kept and the snippet is appended.
+
+    Returns:
+        Path of the hook file
+    """
+    hook = _hooks_dir(repo) / "post-checkout"
+    existing = hook.read_text() if hook.exists() else ""
+    if HOOK_BEGIN in existing:
+        return hook
+    if existing and not existing.startswith("#!/bin/sh") and not existing.startswith("#!/bin/bash"):
+        raise HookInstallError(f"{hook} exists and is not a shell script; add the hook manually")
+
+    content = existing or "#!/bin/sh\n"
+    if not content.endswith("\n"):
+        content += "\n"
+    hook.parent.mkdir(parents=True, exist_ok=True)
+    hook.write_text(content + hook_script())
+    hook.chmod(hook.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return hook
+
+
+def uninstall_git_hook(repo: Path) -> Path | None:
+    """Remove our snippet from the post-checkout hook, deleting it if nothing remains.
+
+    Returns:
+        Path of the hook file, or None if it was not installed
+    """
+    hook = _hooks_dir(repo) / "post-checkout"
+    if not hook.exists():
+        return None
+    lines = hook.read_text().splitlines(keepends=True)
+    try:
+        begin = lines.index(HOOK_BEGIN + "\n")
+        end = lines.index(HOOK_END + "\n", begin)
+    except ValueError:
+        return None
+
+    del lines[begin:end + 1]
+    if all(not line.strip() or line.startswith("#!") for line in lines):
+        hook.unlink()
+    else:
+        hook.write_text("".join(lines))
+    return hook
+
+
+@dataclass
+class PendingCheckout:
+    """The most recent checkout waiting for its burst to settle."""
+
+    token: str
+    branch: str
+    at: float
+
+    def encode(self) -> str:
+        """Serialise as one tab-separated line."""
+        return f"{self.token}\t{self.at!r}\t{self.branch}\n"
+
+    @classmethod
+    def read(cls, path: Path) -> "PendingCheckout | None":
+        """Read the pending checkout from ``path``, if any."""
+        try:
+            token, at, branch = path.read_text().rstrip("\n").split("\t", 2)
+            return cls(token=token, branch=branch, at=float(at))
+        except (OSError, ValueError):
+            return None
+
+
+class CheckoutDebouncer:
+    """Coalesces bursts of checkouts into one switch to the settled branch."""
+
+    def __init__(
+        self,
+        tracker: Tracker,
+        pending_file: Path | None = None,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.tracker = tracker
+        self.pending_file = pending_file or tracker.storage.data_file.with_name(PENDING_FILENAME)
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self.sleep = sleep
+
+    def record(self, branch: str) -> PendingCheckout:
+        """Mark ``branch`` as the latest checkout, superseding earlier ones."""
+        pending = PendingCheckout(
+            token=f"{os.getpid()}-{time.monotonic_ns()}", branch=branch, at=self.clock()
+        )
+        atomic_write(self.pending_file, lambda f: f.write(pending.encode()))
+        return pending
+
+    def settle(self, pending: PendingCheckout) -> TrackerResult | None:
+        """Switch to the pending branch's task if no later checkout has happened.
+
+        Returns:
+            The switch result, or None if the checkout was superseded
+        """
+        latest = PendingCheckout.read(self.pending_file)
+        if latest is None or latest.token != pending.token:
+            return None
+        return self.tracker.switch_to(
+            task_from_branch(pending.branch), at=datetime.fromtimestamp(pending.at)
+        )
+
+    def checkout(self, branch: str) -> TrackerResult | None:
+        """Record a checkout, wait for the burst to settle, then switch if still latest."""
+        pending = self.record(branch)
+        self.sleep(self.settle_seconds)
+        return self.settle(pending)
@@ -0,0 +1,324 @@
+"""Streaming import and export of iCalendar (ICS) files.
+
+Both directions work line by line: the parser unfolds and decodes one content
+line at a time and yields each VEVENT as soon as it ends, and the exporter
+writes one VEVENT per closed span while streaming days from a storage
+snapshot. Imports are applied with one batched rewrite of the data file
+(``Storage.save_days``), never one save per event.
+
+Supported: DTSTART/DTEND or DURATION, in UTC, with a TZID, or floating (local)
+time. All-day and cancelled events are skipped, and recurrence rules are not
+expanded: only an event's first occurrence is imported.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TextIO
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from time_surfer.cache import content_hash
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage
+from time_surfer.sync import merge_days
+
+DEFAULT_TASK_PREFIX = "meeting: "
+PRODID = "-//time-surfer//EN"
+# Content lines are folded at 75 octets (RFC 5545, section 3.1).
+MAX_LINE_OCTETS = 75
+
+_DURATION = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+class CalendarError(ValueError):
+    """Raised for calendar content that cannot be read."""
+
+
+@dataclass
+class CalendarEvent:
+    """A timed calendar event, in local time."""
+
+    summary: str
+    start: datetime
+    end: datetime
+    uid: str | None = None
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a calendar import."""
+
+    events: int = 0
+    skipped: int = 0
+    days: int = 0
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join folded content lines (continuations start with a space or tab)."""
+    current: str | None = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_line(line: str) -> tuple[str, dict[str, str], str]:
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    head, sep, value = _split_unquoted(line, ":")
+    if not sep:
+        raise CalendarError(f"Malformed content line: {line[:60]!r}")
+    name, *params = head.split(";")
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parsed[key.upper()] = param_value.strip('"')
+    return name.upper(), parsed, value
+
+
+def _split_unquoted(line: str, separator: str) -> tuple[str, str, str]:
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == separator and not quoted:
+            return line[:i], separator, line[i + 1:]
+    return line, "", ""
+
+
+def unescape_text(value: str) -> str:
+    """Decode an iCalendar TEXT value."""
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def escape_text(value: str) -> str:
+    """Encode a string as an iCalendar TEXT value."""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def parse_datetime(value: str, params: dict[str, str]) -> datetime | None:
+    """Parse a DATE-TIME into naive local time; None for an all-day DATE."""
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        return None
+    try:
+        parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise CalendarError(f"Invalid date-time: {value!r}") from None
+    if value.endswith("Z"):
+        return parsed.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    if "TZID" in params:
+        try:
+            zone = ZoneInfo(params["TZID"])
+        except (ZoneInfoNotFoundError, ValueError):
+            return parsed
+        return parsed.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse an iCalendar DURATION such as ``PT1H30M``."""
+    match = _DURATION.match(value)
+    if not match:
+        raise CalendarError(f"Invalid duration: {value!r}")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def iter_events(lines: Iterable[str]) -> Iterator[CalendarEvent | None]:
+    """Yield each VEVENT as it is read; None for events that cannot be imported.
+
+    Args:
+        lines: Lines of an ICS file, e.g. an open file object
+
+    Returns:
+        Iterator of CalendarEvent (or None for all-day, cancelled or
+        incomplete events, so callers can count them)
+    """
+    props: dict[str, tuple[dict[str, str], str]] | None = None
+    depth = 0
+    for line in unfold(lines):
+        if not line:
+            continue
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and depth == 0:
+                props = {}
+            elif props is not None:
+                depth += 1  # Nested component such as VALARM.
+            continue
+        if name == "END":
+            if props is None:
+                continue
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                yield _event(props)
+                props = None
+            continue
+        if props is not None and depth == 0:
+            props.setdefault(name, (params, value))
+
+
+def _event(props: dict[str, tuple[dict[str, str], str]]) -> CalendarEvent | None:
+    if "DTSTART" not in props or props.get("STATUS", ({}, ""))[1].upper() == "CANCELLED":
+        return None
+    start = parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+    if start is None:
+        return None
+    if "DTEND" in props:
+        end = parse_datetime(props["DTEND"][1], props["DTEND"][0])
+    elif "DURATION" in props:
+        end = start + parse_duration(props["DURATION"][1])
+    else:
+        end = None
+    if end is None or end <= start:
+        return None
+    summary = unescape_text(props.get("SUMMARY", ({}, ""))[1]).strip() or "(no title)"
+    uid = props["UID"][1] if "UID" in props else None
+    return CalendarEvent(summary=summary, start=start, end=end, uid=uid)
+
+
+def import_events(
+    storage: Storage,
+    events: Iterable[CalendarEvent | None],
+    task_prefix: str = DEFAULT_TASK_PREFIX,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    dry_run: bool = False,
+    now: datetime | None = None,
+) -> ImportResult:
+    """Add events as spans, merging them into stored days in one batch.
+
+    Each event becomes a span of ``task_prefix + summary`` on the day it starts.
+    Overlaps with tracked spans are resolved as in sync (see
+    ``time_surfer.sync.merge_days``): the later start wins and the interrupted
+    task resumes afterwards. Importing the same events again changes nothing.
+    Events that have not ended by ``now`` are skipped, so an import never cuts
+    into the task being tracked.
+
+    Args:
+        storage: Storage to import into
+        events: Events, e.g. from ``iter_events``; None entries count as skipped
+        task_prefix: Prefix for task names
+        start_date: Ignore events before this date (YYYY-MM-DD)
+        end_date: Ignore events after this date (YYYY-MM-DD)
+        dry_run: Count without writing
+        now: Current time (default: now)
+
+    Returns:
+        ImportResult with the number of events imported and skipped
+    """
+    now = now or datetime.now()
+    result = ImportResult()
+    by_date: dict[str, list[Span]] = {}
+    for event in events:
+        if event is None or event.end > now:
+            result.skipped += 1
+            continue
+        date = event.start.strftime("%Y-%m-%d")
+        if (start_date and date < start_date) or (end_date and date > end_date):
+            continue
+        span = Span(task_prefix + event.summary, event.start, event.end)
+        by_date.setdefault(date, []).append(span)
+        result.events += 1
+
+    if not by_date:
+        return result
+
+    # Held from the read to the save, so spans tracked meanwhile are not overwritten.
+    with storage.lock():
+        with storage.snapshot() as snapshot:
+            existing = {day.date: day for day in snapshot.iter_days(min(by_date), max(by_date))}
+
+        updated = []
+        replaced = []
+        for date, spans in sorted(by_date.items()):
+            imported = Day(
+                date=date,
+                start_time=min(span.start for span in spans),
+                end_time=max(span.end for span in spans),
+                spans=spans,
+            )
+            day = existing.get(date)
+            # Merging also resolves overlaps between the imported events themselves.
+            merged = merge_days(day or imported, imported)
+            if merged != day:
+                updated.append(merged)
+                if day is not None:
+                    replaced.append((day, merged))
+        result.days = len(updated)
+
+        if not dry_run:
+            storage.save_days(updated)
+            NoteStore(storage.notes_file).carry_over(replaced)
+    return result
+
+
+def write_calendar(days: Iterable[Day], out: TextIO, now: datetime | None = None) -> int:
+    """Write closed spans as a VCALENDAR, one VEVENT per span.
+
+    Times are written in UTC. Each event's UID is derived from its task and
+    start, so re-exporting updates rather than duplicates events in calendar
+    apps.
+
+    Returns:
+        Number of events written
+    """
+    stamp = _utc(now or datetime.now())
+    for line in ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"):
+        _write_line(out, line)
+    count = 0
+    for day in days:
+        for span in day.spans:
+            if span.end is None:
+                continue
+            uid = content_hash(f"{span.task}|{span.start.isoformat()}")
+            for line in (
+                "BEGIN:VEVENT",
+                f"UID:{uid}@time-surfer",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{_utc(span.start)}",
+                f"DTEND:{_utc(span.end)}",
+                f"SUMMARY:{escape_text(span.task)}",
+                "END:VEVENT",
+            ):
+                _write_line(out, line)
+            count += 1
+    _write_line(out, "END:VCALENDAR")
+    return count
+
+
+def _utc(when: datetime) -> str:
+    return when.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _write_line(out: TextIO, line: str) -> None:
+    """Write a content line, folded at 75 octets, with a CRLF ending."""
+    encoded = line.encode()
+    if len(encoded) <= MAX_LINE_OCTETS:
+        out.write(line + "\r\n")
+        return
+    chunks = []
+    limit = MAX_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte UTF-8 sequence.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = MAX_LINE_OCTETS - 1
+    out.write("\r\n ".join(chunks) + "\r\n")
@@ -0,0 +1,264 @@
+"""Idle detection daemon with pluggable activity sources.
+
+The daemon never polls on a fixed tick. While the user is active it sleeps until
+the exact moment the idle threshold could next be crossed; sources that can
+signal activity through a file descriptor wake it early via the platform
+selector (epoll on Linux). Sources that can only be sampled declare a
+``resolution``, and the daemon wakes at least that often to keep their
+timestamps accurate. While idle it re-samples on an interval to notice the user
+returning.
+"""
+
+import glob
+import os
+import re
+import selectors
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from time_surfer.tracker import Tracker
+
+DEFAULT_INPUT_IRQ_PATTERN = r"i8042|keyboard|mouse|touchpad|hid"
+
+
+class ActivitySource(ABC):
+    """Reports the most recent user activity it can observe.
+
+    ``resolution`` is the longest the daemon may go between samples, for sources
+    that only learn of activity when sampled; None for exact timestamps.
+    """
+
+    resolution: float | None = None
+
+    @abstractmethod
+    def last_activity(self) -> float | None:
+        """Return the wall-clock time (epoch seconds) of the latest activity, if known."""
+
+    def fileno(self) -> int | None:
+        """Return a descriptor that becomes readable on activity, if supported."""
+        return None
+
+    def drain(self) -> None:
+        """Consume pending readiness on ``fileno()`` after a wakeup."""
+
+    def close(self) -> None:
+        """Release any resources held by the source."""
+
+
+class ProcInterruptsSource(ActivitySource):
+    """Detects input by watching interrupt counters in /proc/interrupts.
+
+    Counters are only sampled when the daemon wakes, so the cost is one small
+    file read per wakeup regardless of how busy the input devices are. A change
+    only shows that input happened since the previous sample, so it is dated at
+    that sample: up to ``resolution`` seconds early, never late.
+    """
+
+    def __init__(
+        self,
+        path: Path = Path("/proc/interrupts"),
+        pattern: str = DEFAULT_INPUT_IRQ_PATTERN,
+        clock: Callable[[], float] = time.time,
+        resolution: float = 10.0,
+    ):
+        self.path = path
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.clock = clock
+        self.resolution = resolution
+        self._count: int | None = None
+        self._sampled: float | None = None
+        self._last: float | None = None
+
+    def last_activity(self) -> float | None:
+        now = self.clock()
+        count = self._read_count()
+        if count is None:
+            return self._last
+        if count != self._count:
+            if self._count is not None:
+                self._last = self._sampled
+            self._count = count
+        self._sampled = now
+        return self._last
+
+    def _read_count(self) -> int | None:
+        try:
+            lines = self.path.read_text().splitlines()
+        except OSError:
+            return None
+        total = 0
+        for line in lines[1:]:
+            if not self.pattern.search(line):
+                continue
+            for field in line.split()[1:]:
+                if not field.isdigit():
+                    break
+                total += int(field)
+        return total
+
+
+class TerminalActivitySource(ActivitySource):
+    """Detects typing in terminals from the access times of their tty devices."""
+
+    def __init__(self, patterns: tuple[str, ...] = ("/dev/pts/[0-9]*", "/dev/tty[0-9]*")):
+        self.patterns = patterns
+
+    def last_activity(self) -> float | None:
+        latest = None
+        for pattern in self.patterns:
+            for path in glob.glob(pattern):
+                try:
+                    atime = os.stat(path).st_atime
+                except OSError:
+                    continue
+                if latest is None or atime > latest:
+                    latest = atime
+        return latest
+
+
+class FakeActivitySource(ActivitySource):
+    """Activity source driven by tests; ``touch`` wakes a waiting daemon."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._last: float | None = None
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+
+    def touch(self, at: float | None = None) -> None:
+        """Record activity (now, or at the given time) and wake the daemon."""
+        self._last = self.clock() if at is None else at
+        os.write(self._write_fd, b"\0")
+
+    def last_activity(self) -> float | None:
+        return self._last
+
+    def fileno(self) -> int | None:
+        return self._read_fd
+
+    def drain(self) -> None:
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+class IdleDaemon:
+    """Pauses tracking when no source has seen activity for ``threshold`` seconds.
+
+    With ``idle_task`` set the daemon switches to that task instead of pausing.
+    Either way the open span is closed at the moment of last activity, and the
+    previous task is resumed when activity returns (unless the user switched
+    task in the meantime).
+    """
+
+    def __init__(
+        self,
+        tracker: Tracker,
+        sources: list[ActivitySource],
+        threshold: float,
+        idle_task: str | None = None,
+        idle_poll_interval: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.tracker = tracker
+        self.sources = sources
+        self.threshold = threshold
+        self.idle_task = idle_task
+        self.idle_poll_interval = idle_poll_interval
+        self.clock = clock
+
+        # Sampled sources are polled at least this often while active; under
+        # half the threshold, so input dated at the previous sample cannot look
+        # like a full threshold of idleness.
+        resolutions = [s.resolution for s in sources if s.resolution is not None]
+        self._max_sleep = min(resolutions + [threshold / 2]) if resolutions else None
+
+        self.is_idle = False
+        self._resume_task: str | None = None
+        self._started = clock()
+        self._stopped = False
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+
+    def step(self) -> float:
+        """Evaluate idleness once and act on any transition.
+
+        Returns:
+            Seconds until the next evaluation is needed
+        """
+        now = self.clock()
+        last = self._last_activity()
+        idle_for = now - last
+
+        if not self.is_idle and idle_for >= self.threshold:
+            self._enter_idle(last)
+        elif self.is_idle and idle_for < self.threshold:
+            self._leave_idle()
+
+        if self.is_idle:
+            return self.idle_poll_interval
+        sleep = max(self.threshold - idle_for, 0.0)
+        return sleep if self._max_sleep is None else min(sleep, self._max_sleep)
+
+    def run(self) -> None:
+        """Run until ``stop`` is called, sleeping between evaluations."""
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wake_r, selectors.EVENT_READ, None)
+            for source in self.sources:
+                fd = source.fileno()
+                if fd is not None:
+                    selector.register(fd, selectors.EVENT_READ, source)
+
+            while not self._stopped:
+                timeout = self.step()
+                for key, _ in selector.select(timeout):
+                    if key.data is not None:
+                        key.data.drain()
+
+    def stop(self) -> None:
+        """Ask a running daemon to exit (safe to call from other threads)."""
+        self._stopped = True
+        os.write(self._wake_w, b"\0")
+
+    def close(self) -> None:
+        """Release the daemon's wakeup pipe and its sources."""
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        for source in self.sources:
+            source.close()
+
+    def _last_activity(self) -> float:
+        seen = [t for t in (source.last_activity() for source in self.sources) if t is not None]
+        return max(seen + [self._started])
+
+    def _enter_idle(self, last_activity: float) -> None:
+        self.is_idle = True
+        day = self.tracker.get_current_day()
+        if day is None or day.current_task is None or day.current_task == self.idle_task:
+            return
+
+        at = datetime.fromtimestamp(last_activity)
+        if self.idle_task is not None:
+            result = self.tracker.switch_to(self.idle_task, at=at)
+        else:
+            result = self.tracker.pause(at=at)
+        if result.success:
+            self._resume_task = day.current_task
+
+    def _leave_idle(self) -> None:
+        self.is_idle = False
+        task, self._resume_task = self._resume_task, None
+
+        day = self.tracker.get_current_day()
+        if day is None or task is None or day.current_task != self.idle_task:
+            return
+        self.tracker.switch_to(task)
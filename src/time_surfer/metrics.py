@@ -0,0 +1,324 @@
+"""Operational metrics in the Prometheus text exposition format.
+
+Each process records into the in-memory ``METRICS`` registry: command latency
+histograms, time spent waiting for storage locks, day parse and file rewrite
+times, and the size of the data. When a command exits, the CLI appends what it
+recorded to ``metrics.json.pending`` in the cache directory with one unlocked
+append (``record``); the pending samples are folded into ``metrics.json``
+(histograms and counters add up across processes, gauges keep the latest
+value) once they reach ``PENDING_MAX_BYTES``, or by every command if a
+textfile-collector file for node_exporter is configured, since it must stay
+current::
+
+    # ~/.config/time-surfer/config.yaml
+    metrics:
+      textfile: /var/lib/node_exporter/textfile_collector/time_surfer.prom
+
+``time-surfer metrics`` and the API server's ``GET /metrics`` render the same
+data on request, including pending samples. Recording is a few dictionary
+updates and one append per command; merging is one small locked read and
+write, and failures to write are ignored.
+"""
+
+import bisect
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+STATE_FILENAME = "metrics.json"
+PENDING_SUFFIX = ".pending"
+# Pending samples are folded into the state file once they grow past this.
+PENDING_MAX_BYTES = 64 * 1024
+# Seconds; Prometheus client defaults.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric name to (type, help) for the exposition format.
+METRIC_TYPES = {
+    "time_surfer_command_duration_seconds": ("histogram", "Wall time of a command."),
+    "time_surfer_storage_write_seconds": ("histogram", "Time to rewrite the data file."),
+    "time_surfer_parse_seconds_total": ("counter", "Time spent decoding day records."),
+    "time_surfer_days_parsed_total": ("counter", "Day records decoded."),
+    "time_surfer_lock_wait_seconds_total": ("counter", "Time spent waiting for a held lock."),
+    "time_surfer_lock_contended_total": ("counter", "Lock acquisitions that had to wait."),
+    "time_surfer_storage_bytes": ("gauge", "Size of the data file."),
+    "time_surfer_day_spans": ("gauge", "Spans in the most recently saved day."),
+}
+
+
+def series_key(name: str, labels: dict[str, str]) -> str:
+    """Return the exposition-format series for a metric name and labels."""
+    if not labels:
+        return name
+    inner = ",".join(f'{key}="{_escape(str(value))}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def empty_state() -> dict:
+    """Return a state with no samples."""
+    return {"histograms": {}, "counters": {}, "gauges": {}}
+
+
+def merge_state(base: dict, delta: dict) -> dict:
+    """Add ``delta`` into ``base`` (in place) and return it.
+
+    Histogram buckets and counters are summed; gauges take the value in ``delta``.
+    """
+    for key, hist in delta["histograms"].items():
+        into = base["histograms"].get(key)
+        if into is None or len(into["counts"]) != len(hist["counts"]):
+            base["histograms"][key] = {"counts": list(hist["counts"]), "sum": hist["sum"]}
+            continue
+        into["counts"] = [a + b for a, b in zip(into["counts"], hist["counts"])]
+        into["sum"] += hist["sum"]
+    for key, value in delta["counters"].items():
+        base["counters"][key] = base["counters"].get(key, 0.0) + value
+    base["gauges"].update(delta["gauges"])
+    return base
+
+
+class Metrics:
+    """Thread-safe in-process registry of histograms, counters and gauges."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._state = empty_state()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one sample in a histogram."""
+        key = series_key(name, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            hist = self._state["histograms"].get(key)
+            if hist is None:
+                hist = self._state["histograms"][key] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                }
+            hist["counts"][index] += 1
+            hist["sum"] += value
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add to a counter."""
+        key = series_key(name, labels)
+        with self._lock:
+            counters = self._state["counters"]
+            counters[key] = counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge."""
+        with self._lock:
+            self._state["gauges"][series_key(name, labels)] = value
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        """Return a copy of everything recorded so far."""
+        with self._lock:
+            return merge_state(empty_state(), self._state)
+
+    def drain(self) -> dict:
+        """Return everything recorded so far and start afresh."""
+        with self._lock:
+            state, self._state = self._state, empty_state()
+        return state
+
+
+METRICS = Metrics()
+
+
+class TimedLock:
+    """A lock that counts the time callers spend waiting for it.
+
+    Uncontended acquisitions cost one extra non-blocking attempt and no clock
+    reads. Wraps a Lock or RLock (default: a new RLock).
+    """
+
+    def __init__(self, name: str, lock=None, metrics: Metrics = METRICS):
+        self.name = name
+        self._lock = lock if lock is not None else threading.RLock()
+        self._metrics = metrics
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        waited = time.perf_counter() - start
+        self._metrics.inc("time_surfer_lock_wait_seconds_total", waited, lock=self.name)
+        self._metrics.inc("time_surfer_lock_contended_total", lock=self.name)
+        return acquired
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def render(state: dict, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> str:
+    """Render a state in the Prometheus text exposition format."""
+    by_name: dict[str, list[str]] = {}
+    for kind in ("histograms", "counters", "gauges"):
+        for key in state[kind]:
+            by_name.setdefault(key.partition("{")[0], []).append(key)
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = METRIC_TYPES.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key in sorted(by_name[name]):
+            if key in state["histograms"]:
+                lines.extend(_render_histogram(key, state["histograms"][key], buckets))
+            elif key in state["counters"]:
+                lines.append(f"{key} {_number(state['counters'][key])}")
+            else:
+                lines.append(f"{key} {_number(state['gauges'][key])}")
+    return "".join(line + "\n" for line in lines)
+
+
+def _render_histogram(key: str, hist: dict, buckets: tuple[float, ...]) -> list[str]:
+    name, _, rest = key.partition("{")
+    labels = rest[:-1]
+    bounds = [_number(bound) for bound in buckets] + ["+Inf"]
+    if len(hist["counts"]) != len(bounds):
+        return []
+    lines = []
+    cumulative = 0
+    for bound, count in zip(bounds, hist["counts"]):
+        cumulative += count
+        le = f'{labels},le="{bound}"' if labels else f'le="{bound}"'
+        lines.append(f"{name}_bucket{{{le}}} {cumulative}")
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_number(hist['sum'])}")
+    lines.append(f"{name}_count{suffix} {cumulative}")
+    return lines
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def load_state(path: Path) -> dict:
+    """Read accumulated metrics, including pending samples (empty if missing or unreadable)."""
+    state = _load_state_file(path)
+    for delta in _read_pending(_pending_file(path)):
+        merge_state(state, delta)
+    return state
+
+
+def _load_state_file(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return empty_state()
+    return state if _is_state(state) else empty_state()
+
+
+def _is_state(state) -> bool:
+    return isinstance(state, dict) and all(
+        isinstance(state.get(kind), dict) for kind in ("histograms", "counters", "gauges")
+    )
+
+
+def _pending_file(path: Path) -> Path:
+    return path.with_name(path.name + PENDING_SUFFIX)
+
+
+def _read_pending(pending: Path) -> Iterator[dict]:
+    try:
+        f = open(pending)
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                continue  # A torn line from an interrupted append.
+            if _is_state(delta):
+                yield delta
+
+
+def record(path: Path, metrics: Metrics = METRICS) -> None:
+    """Append what ``metrics`` recorded to the pending samples of the state at ``path``.
+
+    One unlocked ``O_APPEND`` write; the samples are folded into the state file
+    by ``persist`` once they exceed ``PENDING_MAX_BYTES``. Failures are ignored.
+    """
+    delta = metrics.drain()
+    if not any(delta.values()):
+        return
+    line = (json.dumps(delta, separators=(",", ":")) + "\n").encode()
+    pending = _pending_file(path)
+    with contextlib.suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(pending, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > PENDING_MAX_BYTES:
+            persist(path, metrics)
+
+
+def persist(
+    path: Path, metrics: Metrics = METRICS, textfile: Path | None = None
+) -> dict | None:
+    """Merge what ``metrics`` recorded into the state at ``path``.
+
+    With ``textfile``, the merged state is also written there for node_exporter's
+    textfile collector. Returns the merged state, or None if it could not be
+    written (recorded samples are then dropped).
+    """
+    delta = metrics.drain()
+    with contextlib.suppress(OSError):
+        return _persist(path, delta, textfile)
+    return None
+
+
+def _persist(path: Path, delta: dict, textfile: Path | None) -> dict:
+    # Imported here: storage itself records into METRICS.
+    from time_surfer.storage import atomic_write
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # Take the pending samples aside first, so appends made meanwhile start a new file.
+        pending = _pending_file(path)
+        claimed = pending.with_name(pending.name + ".merging")
+        with contextlib.suppress(FileNotFoundError):
+            os.replace(pending, claimed)
+        state = merge_state(_load_state_file(path), delta)
+        for pending_delta in _read_pending(claimed):
+            merge_state(state, pending_delta)
+        atomic_write(path, lambda f: json.dump(state, f, separators=(",", ":")))
+        claimed.unlink(missing_ok=True)
+        if textfile is not None:
+            text = render(state)
+            atomic_write(textfile, lambda f: f.write(text))
+    return state
@@ -0,0 +1,245 @@
+"""Streaming migration of data files between schema versions.
+
+Migration reads the old file incrementally, upgrades one day record at a time
+through each registered step, and writes the current format to a temporary
+file that is atomically swapped in, holding the storage lock so no tracker
+write lands in between. Line-based files (version 2 onwards) are always
+written in date order, so memory use is bounded by the largest single day
+record. Version 1 files are one JSON object in insertion order, so their
+records are sorted in memory, as ``Storage`` does when it reads them.
+"""
+
+import json
+import os
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+from time_surfer.storage import (
+    CHECKSUM_SCHEMA_VERSION,
+    LEGACY_SCHEMA_VERSION,
+    SCHEMA_VERSION,
+    CorruptDataError,
+    Storage,
+    UnsupportedSchemaError,
+    atomic_write,
+    decode_payload,
+    decode_record,
+    encode_header,
+    encode_record,
+    read_schema_version,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _upgrade_v1_record(record: dict) -> dict:
+    """Version 1 records could omit optional fields; fill them in explicitly."""
+    return {
+        "date": record["date"],
+        "start_time": record.get("start_time"),
+        "end_time": record.get("end_time"),
+        "current_task": record.get("current_task"),
+        "spans": [
+            {"task": span["task"], "start": span["start"], "end": span.get("end")}
+            for span in record.get("spans", [])
+        ],
+    }
+
+
+# Maps a schema version to the function upgrading a record to the next version.
+# Version 3 only adds per-record checksums, which encode_record writes, so
+# version 2 records need no change.
+MIGRATIONS: dict[int, Callable[[dict], dict]] = {
+    LEGACY_SCHEMA_VERSION: _upgrade_v1_record,
+}
+
+
+@dataclass
+class MigrationResult:
+    """Outcome of a migration."""
+
+    from_version: int | None
+    to_version: int
+    days: int = 0
+    backup_file: Path | None = None
+
+    @property
+    def migrated(self) -> bool:
+        """Whether the data file was rewritten."""
+        return self.from_version is not None and self.from_version != self.to_version
+
+
+def iter_legacy_records(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Incrementally parse a version 1 file (one JSON object keyed by date).
+
+    Only the current day's record and one read chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    def expect(char: str) -> None:
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != char:
+            raise ValueError(f"Malformed legacy data file: expected {char!r}")
+        pos += 1
+
+    def decode():
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            pos = end
+            return value
+
+    expect("{")
+    skip_whitespace()
+    if pos < len(buffer) and buffer[pos] == "}":
+        return
+    while True:
+        key = decode()
+        expect(":")
+        record = decode()
+        if not isinstance(record, dict):
+            raise ValueError(f"Malformed legacy data file: entry {key!r} is not an object")
+        record.setdefault("date", key)
+        yield record
+
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == ",":
+            pos += 1
+            continue
+        expect("}")
+        return
+
+
+def _iter_records(f: TextIO, version: int) -> Iterator[dict]:
+    """Yield records from an open data file of the given version."""
+    if version == LEGACY_SCHEMA_VERSION:
+        yield from iter_legacy_records(f)
+        return
+    for line in f:
+        if not line.strip():
+            continue
+        line = line.rstrip("\n")
+        yield decode_record(line) if version >= CHECKSUM_SCHEMA_VERSION else decode_payload(line)
+
+
+def _upgrade(record: dict, version: int) -> dict:
+    """Apply every registered migration step from ``version`` to the current one."""
+    for step in range(version, SCHEMA_VERSION):
+        upgrade = MIGRATIONS.get(step)
+        if upgrade is not None:
+            record = upgrade(record)
+    return record
+
+
+def _iter_upgraded(f: TextIO, version: int) -> Iterator[str]:
+    """Yield an open file's records as current storage lines, in date order.
+
+    Raises:
+        CorruptDataError: If a line-based file's records are out of date order
+    """
+    records = (_upgrade(record, version) for record in _iter_records(f, version))
+    if version == LEGACY_SCHEMA_VERSION:
+        lines = sorted(((r["date"], encode_record(r)) for r in records), key=lambda r: r[0])
+        for _, line in lines:
+            yield line
+        return
+    last_date = None
+    for record in records:
+        if last_date is not None and record["date"] <= last_date:
+            raise CorruptDataError(f"Record {record['date']} is out of date order")
+        last_date = record["date"]
+        yield encode_record(record)
+
+
+def migrate_file(data_file: Path, backup: bool = True, dry_run: bool = False) -> MigrationResult:
+    """Rewrite a data file in the current schema version, in date order.
+
+    Holds the storage lock (see ``Storage.lock``) while rewriting, so no write
+    from a tracker is lost.
+
+    Args:
+        data_file: Data file to migrate
+        backup: Keep the original as ``<name>.v<N>.bak`` (a hard link, no copy)
+        dry_run: Only report what would be migrated; for old files this still
+            streams through the data to count days
+
+    Returns:
+        MigrationResult describing what was (or would be) done
+
+    Raises:
+        UnsupportedSchemaError: If the file is newer than this version supports
+        CorruptDataError: If a record is damaged or out of order
+    """
+    if dry_run or not data_file.exists():
+        return _migrate(data_file, backup, dry_run)
+    with Storage(data_file).lock():
+        return _migrate(data_file, backup, dry_run)
+
+
+def _migrate(data_file: Path, backup: bool, dry_run: bool) -> MigrationResult:
+    try:
+        f = open(data_file)
+    except FileNotFoundError:
+        return MigrationResult(from_version=None, to_version=SCHEMA_VERSION)
+
+    with f:
+        version = read_schema_version(f)
+        result = MigrationResult(from_version=version, to_version=SCHEMA_VERSION)
+        if version is None or version == SCHEMA_VERSION:
+            return result
+        if version > SCHEMA_VERSION:
+            raise UnsupportedSchemaError(
+                f"{data_file} uses schema version {version}; "
+                f"this version of time-surfer supports up to {SCHEMA_VERSION}"
+            )
+
+        if dry_run:
+            result.days = sum(1 for _ in _iter_upgraded(f, version))
+            return result
+
+        def write(out: TextIO) -> None:
+            out.write(encode_header())
+            for line in _iter_upgraded(f, version):
+                out.write(line)
+                out.write("\n")
+                result.days += 1
+
+        if backup:
+            backup_file = data_file.with_name(f"{data_file.name}.v{version}.bak")
+            backup_file.unlink(missing_ok=True)
+            os.link(data_file, backup_file)
+            result.backup_file = backup_file
+
+        atomic_write(data_file, write, fsync=True)
+
+    return result
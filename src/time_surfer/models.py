@@ -28,6 +28,14 @@ class Day:
         """Return True if the day has been started but not stopped."""
         return self.start_time is not None and self.end_time is None
 
+    @property
+    def open_span(self) -> Span | None:
+        """Return the span still being tracked, if any."""
+        for span in reversed(self.spans):
+            if span.end is None:
+                return span
+        return None
+
 
 @dataclass
 class TrackerResult:
@@ -37,3 +45,4 @@ class TrackerResult:
     message: str
     day: Day | None = None
     task_totals: dict[str, float] | None = None
+    warnings: list[str] = field(default_factory=list)
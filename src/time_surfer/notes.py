@@ -0,0 +1,244 @@
+"""Notes, ticket IDs and key/value metadata attached to spans.
+
+Annotations live in a side store, ``notes.jsonl`` next to the data file, so
+span records in ``data.json`` stay as compact as before: switching tasks and
+building reports never read, parse or rewrite them. A span is identified by a
+short hash of its task and start (``span_id``), which needs no extra field in
+the span record. Rewrites that change a span's start or fold it into another
+(compaction, sync merges, calendar imports) record where its annotations went
+with ``NoteStore.carry_over``.
+
+The store is append-only, one JSON object per change::
+
+    {"id": "3f9c0e1a2b", "date": "2026-01-30", "note": "pairing with Sam"}
+    {"id": "3f9c0e1a2b", "date": "2026-01-30", "ticket": "OPS-12", "meta": {"pr": "481"}}
+    {"id": "3f9c0e1a2b", "date": "2026-01-30", "clear": true}
+    {"id": "3f9c0e1a2b", "date": "2026-01-30", "moved_to": "8d41b7c095"}
+
+Notes and tickets accumulate, metadata keys are overwritten, ``clear`` drops
+everything recorded for the span so far, and ``moved_to`` hands it all to the
+span that replaced it. Each change is a single
+``O_APPEND`` write, so annotating never rewrites the file and concurrent
+writers do not interleave.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from time_surfer.models import Day, Span
+
+NOTES_FILENAME = "notes.jsonl"
+SPAN_ID_LENGTH = 10
+
+
+def span_id(span: Span) -> str:
+    """Return the stable short id of a span, derived from its task and start."""
+    key = f"{span.task}|{span.start.isoformat()}".encode()
+    return hashlib.blake2b(key, digest_size=SPAN_ID_LENGTH // 2).hexdigest()
+
+
+def rekey_spans(before: Iterable[Span], after: list[Span]) -> dict[str, str]:
+    """Map the id of each span in ``before`` that is gone from ``after`` to its successor.
+
+    The successor is the span that now covers the old span's start, preferring
+    one of the same task, or else the last span that starts before it (a span
+    pruned as noise hands its annotations to the one it interrupted).
+    """
+    kept = {span_id(span) for span in after}
+    moves = {}
+    for span in before:
+        old = span_id(span)
+        if old in kept:
+            continue
+        earlier = [s for s in after if s.start <= span.start]
+        covering = [s for s in earlier if s.end is None or span.start < s.end]
+        target = next(
+            (s for s in covering if s.task == span.task),
+            covering[-1] if covering else (earlier[-1] if earlier else None),
+        )
+        if target is not None:
+            moves[old] = span_id(target)
+    return moves
+
+
+def parse_metadata(items: Iterable[str]) -> dict[str, str]:
+    """Parse ``KEY=VALUE`` strings into a dict.
+
+    Raises:
+        ValueError: If an item has no ``=`` or an empty key
+    """
+    metadata = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Expected KEY=VALUE, got {item!r}")
+        metadata[key.strip()] = value
+    return metadata
+
+
+@dataclass
+class SpanNote:
+    """Everything attached to one span."""
+
+    span_id: str
+    date: str
+    notes: list[str] = field(default_factory=list)
+    tickets: list[str] = field(default_factory=list)
+    metadata: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        """True if nothing is attached."""
+        return not (self.notes or self.tickets or self.metadata)
+
+    def apply(self, record: dict) -> None:
+        """Apply one stored change."""
+        if record.get("clear"):
+            self.notes, self.tickets, self.metadata = [], [], {}
+        if record.get("note"):
+            self.notes.append(record["note"])
+        if record.get("ticket") and record["ticket"] not in self.tickets:
+            self.tickets.append(record["ticket"])
+        self.metadata.update(record.get("meta") or {})
+
+    def absorb(self, other: "SpanNote") -> None:
+        """Take over the annotations of a span that was merged into this one."""
+        self.notes.extend(other.notes)
+        self.tickets.extend(t for t in other.tickets if t not in self.tickets)
+        self.metadata.update(other.metadata)
+
+
+class NoteStore:
+    """Append-only store of span annotations."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def add(
+        self,
+        span: Span,
+        note: str | None = None,
+        ticket: str | None = None,
+        metadata: dict[str, str] | None = None,
+        clear: bool = False,
+    ) -> None:
+        """Record a change to a span's annotations."""
+        record: dict = {"id": span_id(span), "date": span.start.strftime("%Y-%m-%d")}
+        if clear:
+            record["clear"] = True
+        if note:
+            record["note"] = note
+        if ticket:
+            record["ticket"] = ticket
+        if metadata:
+            record["meta"] = metadata
+        self._append([record])
+
+    def carry_over(self, changes: Iterable[tuple[Day, Day]]) -> int:
+        """Move annotations onto the spans that replaced theirs in a rewrite.
+
+        Call it after saving days whose spans were merged, cut or pruned, so
+        notes on the old spans still resolve (see ``rekey_spans``).
+
+        Args:
+            changes: Pairs of (day as it was, day as saved)
+
+        Returns:
+            Number of annotated spans moved
+        """
+        notes = self.load()
+        if not notes:
+            return 0
+        records = [
+            {"id": old, "date": before.date, "moved_to": new}
+            for before, after in changes
+            for old, new in rekey_spans(before.spans, after.spans).items()
+            if old in notes
+        ]
+        if records:
+            self._append(records)
+        return len(records)
+
+    def _append(self, records: list[dict]) -> None:
+        # One write for all records, so a batch is never interleaved with another writer's.
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode())
+        finally:
+            os.close(fd)
+
+    def load(self, date: str | None = None) -> dict[str, SpanNote]:
+        """Return the annotations of every span (on ``date`` only, if given), by span id.
+
+        Spans whose annotations were cleared are left out.
+        """
+        notes: dict[str, SpanNote] = {}
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return notes
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A torn final line from an interrupted write.
+                if not isinstance(record, dict) or "id" not in record:
+                    continue
+                if date is not None and record.get("date") != date:
+                    continue
+                if record.get("moved_to"):
+                    moved = notes.pop(record["id"], None)
+                    if moved is not None:
+                        target = notes.get(record["moved_to"])
+                        if target is None:
+                            target = notes[record["moved_to"]] = SpanNote(
+                                record["moved_to"], moved.date
+                            )
+                        target.absorb(moved)
+                    continue
+                note = notes.get(record["id"])
+                if note is None:
+                    note = notes[record["id"]] = SpanNote(record["id"], record.get("date", ""))
+                note.apply(record)
+        return {key: note for key, note in notes.items() if not note.empty}
+
+    def get(self, span: Span) -> SpanNote | None:
+        """Return a span's annotations, if any."""
+        return self.load(span.start.strftime("%Y-%m-%d")).get(span_id(span))
+
+
+def find_span(spans: Iterable[Span], prefix: str) -> Span | None:
+    """Return the span whose id starts with ``prefix``.
+
+    Raises:
+        ValueError: If more than one span matches
+    """
+    matches = [span for span in spans if span_id(span).startswith(prefix)]
+    if len(matches) > 1:
+        raise ValueError(f"Span id {prefix!r} is ambiguous")
+    return matches[0] if matches else None
+
+
+def describe(note: SpanNote) -> str:
+    """Render annotations on one line, e.g. ``OPS-12 pr=481: pairing with Sam``."""
+    parts = [*note.tickets, *(f"{key}={value}" for key, value in sorted(note.metadata.items()))]
+    head = " ".join(parts)
+    text = "; ".join(note.notes)
+    if head and text:
+        return f"{head}: {text}"
+    return head or text
+
+
+def span_label(span: Span) -> str:
+    """Return ``HH:MM-HH:MM`` for a span (``HH:MM-...`` while it is open)."""
+    return f"{span.start:%H:%M}-{span.end:%H:%M}" if span.end else f"{span.start:%H:%M}-..."
@@ -0,0 +1,62 @@
+"""Shell prompt segment showing the current task and elapsed time.
+
+This module is the ``time-surfer-prompt`` entry point and runs on every prompt
+render, so it deliberately imports nothing beyond ``os``, ``sys`` and ``time``:
+no typer, rich or json, and it never opens ``data.json``. It reads the status
+snapshot that Tracker rewrites on every change, whose format is a single line::
+
+    <start of current span, epoch seconds>\t<task name>\n
+
+An empty file means no task is running.
+"""
+
+import os
+import sys
+import time
+
+STATUS_FILENAME = "status"
+DEFAULT_STATUS_PATH = os.path.join("~", ".local", "share", "time-surfer", STATUS_FILENAME)
+
+
+def encode_status(task: str | None, since: float | None) -> str:
+    """Return status file content for a running task (or none)."""
+    if task is None or since is None:
+        return ""
+    return f"{since:.0f}\t{task}\n"
+
+
+def read_status(path: str) -> tuple[str, float] | None:
+    """Return (task, since) from a status file, or None if nothing is running."""
+    try:
+        with open(path) as f:
+            line = f.readline()
+    except OSError:
+        return None
+    since, sep, task = line.rstrip("\n").partition("\t")
+    if not sep or not task:
+        return None
+    try:
+        return task, float(since)
+    except ValueError:
+        return None
+
+
+def render(path: str | None = None, now: float | None = None) -> str:
+    """Return the prompt segment, e.g. "coding 1:05", or "" when idle."""
+    status = read_status(os.path.expanduser(path or DEFAULT_STATUS_PATH))
+    if status is None:
+        return ""
+    task, since = status
+    elapsed = max(0, int((time.time() if now is None else now) - since))
+    return f"{task} {elapsed // 3600}:{elapsed % 3600 // 60:02d}"
+
+
+def main() -> None:
+    """Print the prompt segment; an optional argument overrides the status file path."""
+    segment = render(sys.argv[1] if len(sys.argv) > 1 else None)
+    if segment:
+        sys.stdout.write(segment + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Filter expressions for reports.
+
+An expression such as::
+
+    task ~ "review" and duration > 10m and date >= 2026-09-01
+
+is parsed once and compiled into a predicate over ``(task, seconds, date)``
+that is applied to each span as days are streamed from storage, so only
+matching spans are ever aggregated. Date comparisons that must hold for every
+match (those joined to the rest of the expression by ``and``) are also turned
+into a date range, letting storage skip non-matching days without parsing them.
+
+Grammar::
+
+    expr       := or_expr
+    or_expr    := and_expr ("or" and_expr)*
+    and_expr   := not_expr ("and" not_expr)*
+    not_expr   := "not" not_expr | "(" expr ")" | comparison
+    comparison := field op value
+
+Fields are ``task`` (``=``, ``!=``, ``~`` and ``!~`` for regular-expression
+search), ``duration`` (a span's length, e.g. ``90s``, ``10m``, ``1h30m``) and
+``date`` (``YYYY-MM-DD``); the latter two accept ``= != < <= > >=``.
+"""
+
+import operator
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from time_surfer.formatting import parse_duration
+from time_surfer.models import Day
+
+Predicate = Callable[[str, float, str], bool]
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op><=|>=|!=|!~|=|~|<|>)
+      | (?P<paren>[()])
+      | (?P<word>[^\s()<>=!~"']+)
+    )""",
+    re.VERBOSE,
+)
+
+_COMPARISONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_FIELD_OPS = {
+    "task": {"=", "!=", "~", "!~"},
+    "duration": set(_COMPARISONS),
+    "date": set(_COMPARISONS),
+}
+
+
+class QueryError(ValueError):
+    """Raised when a filter expression cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Token:
+    """A lexical token and its position in the expression."""
+
+    kind: str
+    text: str
+    pos: int
+
+
+def tokenize(text: str) -> list[Token]:
+    """Split an expression into tokens.
+
+    Raises:
+        QueryError: On characters that cannot start a token
+    """
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise QueryError(f"Unexpected character at position {pos}: {text[pos:].strip()[:1]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        tokens.append(Token(kind, value, match.start(kind)))
+        pos = match.end()
+    return tokens
+
+
+@dataclass
+class Query:
+    """A compiled filter expression."""
+
+    text: str
+    predicate: Predicate
+    start_date: str | None = None
+    end_date: str | None = None
+
+    def matches(self, task: str, seconds: float, date: str) -> bool:
+        """Whether a span with these properties passes the filter."""
+        return self.predicate(task, seconds, date)
+
+    def task_totals(self, days: Iterable[Day], now: datetime) -> dict[str, float]:
+        """Aggregate seconds per task over the matching spans of ``days``.
+
+        Open spans count up to ``now``.
+        """
+        totals: dict[str, float] = {}
+        matches = self.predicate
+        for day in days:
+            for span in day.spans:
+                seconds = ((span.end or now) - span.start).total_seconds()
+                if matches(span.task, seconds, day.date):
+                    totals[span.task] = totals.get(span.task, 0.0) + seconds
+        return totals
+
+
+class _Parser:
+    """Recursive-descent parser producing predicates and date bounds.
+
+    Each parse method returns ``(predicate, start_date, end_date)``, where the
+    bounds are implied by the sub-expression (None when unbounded).
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def parse(self) -> Query:
+        if not self.tokens:
+            raise QueryError("Empty filter expression")
+        predicate, start, end = self._or()
+        if self.pos < len(self.tokens):
+            token = self.tokens[self.pos]
+            raise QueryError(f"Unexpected {token.text!r} at position {token.pos}")
+        return Query(self.text, predicate, start, end)
+
+    def _peek(self) -> Token | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self, expected: str) -> Token:
+        token = self._peek()
+        if token is None:
+            raise QueryError(f"Expected {expected} at end of expression")
+        self.pos += 1
+        return token
+
+    def _keyword(self, word: str) -> bool:
+        token = self._peek()
+        if token is not None and token.kind == "word" and token.text.lower() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def _or(self):
+        parts = [self._and()]
+        while self._keyword("or"):
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        predicates = [p for p, _, _ in parts]
+        # A range holds for the disjunction only if every branch is bounded.
+        starts = [s for _, s, _ in parts]
+        ends = [e for _, _, e in parts]
+        start = None if None in starts else min(starts)
+        end = None if None in ends else max(ends)
+        return (lambda t, s, d: any(p(t, s, d) for p in predicates)), start, end
+
+    def _and(self):
+        parts = [self._not()]
+        while self._keyword("and"):
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        predicates = [p for p, _, _ in parts]
+        starts = [s for _, s, _ in parts if s is not None]
+        ends = [e for _, _, e in parts if e is not None]
+        start = max(starts) if starts else None
+        end = min(ends) if ends else None
+        return (lambda t, s, d: all(p(t, s, d) for p in predicates)), start, end
+
+    def _not(self):
+        if self._keyword("not"):
+            inner, _, _ = self._not()
+            return (lambda t, s, d: not inner(t, s, d)), None, None
+        token = self._peek()
+        if token is not None and token.kind == "paren" and token.text == "(":
+            self.pos += 1
+            result = self._or()
+            closing = self._next("')'")
+            if closing.text != ")":
+                raise QueryError(f"Expected ')' at position {closing.pos}")
+            return result
+        return self._comparison()
+
+    def _comparison(self):
+        field = self._next("a field name")
+        name = field.text.lower()
+        if field.kind != "word" or name not in _FIELD_OPS:
+            fields = ", ".join(_FIELD_OPS)
+            raise QueryError(f"Unknown field {field.text!r} at position {field.pos} (use {fields})")
+        op = self._next("an operator")
+        if op.kind != "op" or op.text not in _FIELD_OPS[name]:
+            allowed = " ".join(sorted(_FIELD_OPS[name]))
+            raise QueryError(f"Operator {op.text!r} not supported for {name} (use {allowed})")
+        value = self._next("a value")
+        if value.kind not in ("word", "string"):
+            raise QueryError(f"Expected a value at position {value.pos}")
+
+        if name == "task":
+            return _task_predicate(op.text, value.text), None, None
+        if name == "duration":
+            try:
+                seconds = parse_duration(value.text)
+            except ValueError as e:
+                raise QueryError(str(e)) from None
+            compare = _COMPARISONS[op.text]
+            return (lambda t, s, d: compare(s, seconds)), None, None
+        return _date_comparison(op.text, value.text)
+
+
+def _task_predicate(op: str, value: str) -> Predicate:
+    """Build a task predicate; regex results are memoised per distinct task."""
+    if op == "=":
+        return lambda t, s, d: t == value
+    if op == "!=":
+        return lambda t, s, d: t != value
+
+    try:
+        pattern = re.compile(value, re.IGNORECASE)
+    except re.error as e:
+        raise QueryError(f"Invalid pattern {value!r}: {e}") from None
+    cache: dict[str, bool] = {}
+    negate = op == "!~"
+
+    def search(t: str, s: float, d: str) -> bool:
+        hit = cache.get(t)
+        if hit is None:
+            hit = cache[t] = pattern.search(t) is not None
+        return hit != negate
+
+    return search
+
+
+def _date_comparison(op: str, value: str):
+    """Build a date predicate together with the range it implies."""
+    try:
+        date = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise QueryError(f"Invalid date {value!r} (use YYYY-MM-DD)") from None
+
+    day = date.isoformat()
+    before = (date - timedelta(days=1)).isoformat()
+    after = (date + timedelta(days=1)).isoformat()
+    bounds = {
+        "=": (day, day),
+        "!=": (None, None),
+        "<": (None, before),
+        "<=": (None, day),
+        ">": (after, None),
+        ">=": (day, None),
+    }
+    compare = _COMPARISONS[op]
+    start, end = bounds[op]
+    return (lambda t, s, d: compare(d, day)), start, end
+
+
+def compile_query(text: str) -> Query:
+    """Parse and compile a filter expression.
+
+    Args:
+        text: Expression such as ``task ~ "review" and duration > 10m``
+
+    Returns:
+        Compiled Query
+
+    Raises:
+        QueryError: If the expression is invalid
+    """
+    return _Parser(text).parse()
@@ -0,0 +1,268 @@
+"""Local HTTP JSON API for tracker operations.
+
+A long-running alternative to spawning the CLI per event: browser extensions and
+editor plugins can POST switches to a persistent process instead.
+
+Endpoints:
+    POST /start              start tracking for the day
+    POST /switch-to          body {"task": "name"}
+    POST /stop               stop tracking for the day
+    GET  /show               current status
+    GET  /report             task totals for the day
+    GET  /metrics            Prometheus metrics (see time_surfer.metrics)
+
+Requests must name a local Host (so a DNS-rebound name cannot reach the API),
+and a request carrying an Origin header must come from the server itself or an
+origin in ``allowed_origins``. POST bodies must be sent as application/json,
+which browsers cannot do cross-origin without a preflight this server never
+answers. Together these keep web pages from driving the tracker.
+"""
+
+import json
+import traceback
+from collections.abc import Iterable
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from time_surfer.cache import default_cache_dir
+from time_surfer.metrics import METRICS, STATE_FILENAME, load_state, merge_state, persist, render
+from time_surfer.models import TrackerResult
+from time_surfer.storage import Storage
+from time_surfer.threadsafe import ThreadSafeTracker
+from time_surfer.tracker import Tracker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+MAX_BODY_BYTES = 64 * 1024
+
+
+class TrackerServer(ThreadingHTTPServer):
+    """HTTP server holding one Tracker shared by all connections.
+
+    The tracker must be safe to call from several threads at once, such as
+    ThreadSafeTracker. ``GET /metrics`` combines the metrics accumulated in
+    ``metrics_file`` by CLI runs with this process's own. ``allowed_origins``
+    lists further origins (e.g. ``chrome-extension://<id>``) whose requests are
+    accepted.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        tracker: Tracker | None = None,
+        verbose: bool = False,
+        metrics_file: Path | None = None,
+        allowed_origins: Iterable[str] = (),
+    ):
+        super().__init__(address, TrackerRequestHandler)
+        self.tracker = tracker or ThreadSafeTracker()
+        self.verbose = verbose
+        self.metrics_file = metrics_file or default_cache_dir() / STATE_FILENAME
+        self.allowed_origins = {origin.rstrip("/") for origin in allowed_origins}
+
+
+class TrackerRequestHandler(BaseHTTPRequestHandler):
+    """Maps JSON endpoints onto Tracker operations (HTTP/1.1 keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; avoid Nagle + delayed-ACK stalls.
+    disable_nagle_algorithm = True
+    server: TrackerServer
+
+    def do_GET(self) -> None:
+        self._handle(self._get)
+
+    def do_POST(self) -> None:
+        self._handle(self._post)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format: str, *args) -> None:
+        super().log_message(format, *args)
+
+    def _handle(self, handler) -> None:
+        if not self._local_host():
+            self._send_json(HTTPStatus.FORBIDDEN, {"success": False, "message": "Host not allowed"})
+            return
+        if not self._allowed_origin():
+            self._send_json(
+                HTTPStatus.FORBIDDEN, {"success": False, "message": "Origin not allowed"}
+            )
+            return
+        try:
+            handler()
+        except Exception:
+            self.log_error("%s %s failed:\n%s", self.command, self.path, traceback.format_exc())
+            self.close_connection = True
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"success": False, "message": "Internal server error"},
+            )
+
+    def _local_host(self) -> bool:
+        try:
+            hostname = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        except ValueError:
+            return False
+        return hostname in LOCAL_HOSTS
+
+    def _allowed_origin(self) -> bool:
+        origin = self.headers.get("Origin")
+        if origin is None:
+            return True  # Not sent by a browser (curl, scripts, plugins).
+        origin = origin.rstrip("/")
+        if origin in self.server.allowed_origins:
+            return True
+        try:
+            parts = urlsplit(origin)
+            port = parts.port
+        except ValueError:
+            return False
+        return (
+            parts.scheme == "http"
+            and parts.hostname in LOCAL_HOSTS
+            and port == self.server.server_address[1]
+        )
+
+    def _get(self) -> None:
+        if self.path.split("?", 1)[0] == "/metrics":
+            self._send_metrics()
+            return
+        routes = {
+            "/show": self.server.tracker.get_status,
+            "/report": self.server.tracker.get_report_data,
+        }
+        self._dispatch(routes, body=None)
+
+    def _post(self) -> None:
+        body = self._read_json()
+        if body is None:
+            return
+        routes = {
+            "/start": self.server.tracker.start,
+            "/stop": self.server.tracker.stop,
+            "/switch-to": lambda: self._switch_to(body),
+        }
+        self._dispatch(routes, body)
+
+    def _dispatch(self, routes: dict, body: dict | None) -> None:
+        path = self.path.split("?", 1)[0]
+        operation = routes.get(path)
+        if operation is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"success": False, "message": "Not found"})
+            return
+
+        with METRICS.timer(
+            "time_surfer_command_duration_seconds", command=path.lstrip("/"), interface="server"
+        ):
+            result = operation()
+        if result is None:
+            return
+
+        status = HTTPStatus.OK if result.success else HTTPStatus.CONFLICT
+        self._send_json(status, result_to_dict(result, self.server.tracker.storage))
+
+    def _switch_to(self, body: dict) -> TrackerResult | None:
+        task = body.get("task")
+        if not isinstance(task, str) or not task:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST, {"success": False, "message": "Missing 'task'"}
+            )
+            return None
+        return self.server.tracker.switch_to(task)
+
+    def _send_metrics(self) -> None:
+        storage = self.server.tracker.storage
+        METRICS.set("time_surfer_storage_bytes", storage.file_size())
+        state = merge_state(load_state(self.server.metrics_file), METRICS.snapshot())
+        data = render(state).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict | None:
+        header = self.headers.get("Content-Length") or "0"
+        length = int(header) if header.isdigit() else -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body cannot be skipped reliably, so the connection is not reused.
+            self.close_connection = True
+            status, message = (
+                (HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body exceeds {MAX_BODY_BYTES} bytes")
+                if length > MAX_BODY_BYTES
+                else (HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+            )
+            self._send_json(status, {"success": False, "message": message})
+            return None
+        raw = self.rfile.read(length) if length else b""
+        if self.headers.get_content_type() != "application/json":
+            self._send_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                {"success": False, "message": "Content-Type must be application/json"},
+            )
+            return None
+        if not raw.strip():
+            return {}
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError:
+            body = None
+        if not isinstance(body, dict):
+            self._send_json(
+                HTTPStatus.BAD_REQUEST, {"success": False, "message": "Body must be a JSON object"}
+            )
+            return None
+        return body
+
+    def _send_json(self, status: HTTPStatus, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def result_to_dict(result: TrackerResult, storage: Storage) -> dict:
+    """Convert a TrackerResult to a JSON-serialisable dict."""
+    payload: dict = {
+        "success": result.success,
+        "message": result.message,
+        "day": storage._day_to_dict(result.day) if result.day else None,
+        "task_totals": result.task_totals,
+    }
+    day = result.day
+    if day is not None and day.start_time is not None:
+        now = datetime.now()
+        payload["total_seconds"] = ((day.end_time or now) - day.start_time).total_seconds()
+        if day.open_span is not None:
+            payload["current_task_seconds"] = (now - day.open_span.start).total_seconds()
+    return payload
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    verbose: bool = False,
+    allowed_origins: Iterable[str] = (),
+) -> None:
+    """Run the API server until interrupted."""
+    with TrackerServer((host, port), verbose=verbose, allowed_origins=allowed_origins) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.tracker.storage.close()
+            persist(server.metrics_file)
@@ -0,0 +1,214 @@
+"""Single-pass work-pattern statistics.
+
+Everything here is computed with online algorithms in one streaming pass over
+spans: Welford running moments for session lengths and the P-squared (P²)
+estimator for percentiles, so memory stays constant however much history is fed
+in.
+"""
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from time_surfer.models import Day, Span
+
+DEFAULT_QUANTILES = (0.5, 0.9)
+
+
+@dataclass
+class RunningStats:
+    """Count, mean, variance and range of a stream (Welford's algorithm)."""
+
+    count: int = 0
+    mean: float = 0.0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    _m2: float = 0.0
+
+    def add(self, x: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.minimum = min(self.minimum, x)
+        self.maximum = max(self.maximum, x)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two observations)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile using five markers (Jain & Chlamtac P²)."""
+
+    def __init__(self, p: float):
+        self.p = p
+        self._heights: list[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Add one observation."""
+        q = self._heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        n = self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                n[i] += step
+
+    @property
+    def value(self) -> float | None:
+        """Current estimate (exact while fewer than five observations)."""
+        q = self._heights
+        if not q:
+            return None
+        if len(q) < 5:
+            rank = self.p * (len(q) - 1)
+            lo = math.floor(rank)
+            hi = min(lo + 1, len(q) - 1)
+            return q[lo] + (q[hi] - q[lo]) * (rank - lo)
+        return q[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+
+@dataclass
+class TaskStats:
+    """Session-length statistics for one task."""
+
+    sessions: RunningStats = field(default_factory=RunningStats)
+    quantiles: dict[float, P2Quantile] = field(default_factory=dict)
+
+    def add(self, seconds: float) -> None:
+        """Record one session of the task."""
+        self.sessions.add(seconds)
+        for estimator in self.quantiles.values():
+            estimator.add(seconds)
+
+
+@dataclass
+class FocusBlock:
+    """An uninterrupted run of one task."""
+
+    task: str
+    start: datetime
+    end: datetime
+
+    @property
+    def seconds(self) -> float:
+        """Length of the block in seconds."""
+        return (self.end - self.start).total_seconds()
+
+
+class WorkPatternStats:
+    """Accumulates work-pattern statistics from a stream of days.
+
+    A session is a run of contiguous closed spans of the same task; a context
+    switch is a change of task between consecutive sessions on the same day.
+    Open spans are ignored.
+    """
+
+    def __init__(self, quantiles: tuple[float, ...] = DEFAULT_QUANTILES):
+        self.quantile_points = quantiles
+        self.tasks: dict[str, TaskStats] = {}
+        self.days = 0
+        self.context_switches = 0
+        self.tracked_seconds = 0.0
+        self.longest_focus: FocusBlock | None = None
+        self.hour_of_day = [0.0] * 24
+
+    def add_day(self, day: Day) -> None:
+        """Feed one day's spans (in order) into the statistics."""
+        self.days += 1
+        block: FocusBlock | None = None
+        for span in day.spans:
+            if span.end is None:
+                continue
+            self._add_to_hours(span)
+            self.tracked_seconds += (span.end - span.start).total_seconds()
+
+            if block is not None and block.task == span.task and span.start <= block.end:
+                block.end = max(block.end, span.end)
+                continue
+            if block is not None:
+                self._close_block(block)
+                if block.task != span.task:
+                    self.context_switches += 1
+            block = FocusBlock(task=span.task, start=span.start, end=span.end)
+
+        if block is not None:
+            self._close_block(block)
+
+    @property
+    def switches_per_hour(self) -> float:
+        """Context switches per tracked hour."""
+        hours = self.tracked_seconds / 3600
+        return self.context_switches / hours if hours > 0 else 0.0
+
+    def _close_block(self, block: FocusBlock) -> None:
+        stats = self.tasks.get(block.task)
+        if stats is None:
+            stats = TaskStats(quantiles={p: P2Quantile(p) for p in self.quantile_points})
+            self.tasks[block.task] = stats
+        stats.add(block.seconds)
+        if self.longest_focus is None or block.seconds > self.longest_focus.seconds:
+            self.longest_focus = block
+
+    def _add_to_hours(self, span: Span) -> None:
+        cursor = span.start
+        while cursor < span.end:
+            next_hour = cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            segment_end = min(next_hour, span.end)
+            self.hour_of_day[cursor.hour] += (segment_end - cursor).total_seconds()
+            cursor = segment_end
+
+
+def compute_stats(
+    days: Iterable[Day], quantiles: tuple[float, ...] = DEFAULT_QUANTILES
+) -> WorkPatternStats:
+    """Compute work-pattern statistics in one pass over the given days."""
+    stats = WorkPatternStats(quantiles)
+    for day in days:
+        stats.add_day(day)
+    return stats
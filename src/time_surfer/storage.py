@@ -1,49 +1,657 @@
-"""JSON persistence for time-surfer data."""
+"""JSON persistence for time-surfer data.
 
+The data file is versioned JSON Lines: a header line ``{"schema_version": N}``
+followed by one JSON object per day, sorted by date. Since schema version 3
+each record is followed by a tab and the CRC-32 of the JSON, and every read
+verifies it: a damaged record raises CorruptDataError instead of being skipped
+(and then dropped by the next save). Older files are still readable: version 2
+records are checksummed as they are read, and version 1 files (a single JSON
+object keyed by date) are converted record by record; ``time-surfer migrate``
+rewrites either in place.
+
+Writers never modify the data file in place: every commit writes a new file and
+renames it over the old one. A reader holding the old file open therefore keeps
+a consistent point-in-time view, which ``Storage.snapshot`` exposes for reads
+that span several passes over the data. A save that read the whole old file
+(and so verified it) keeps it as ``<data file>.bak``, the last good copy that
+``time-surfer fsck --repair`` restores damaged records from.
+"""
+
+import atexit
+import contextlib
+import fcntl
+import heapq
+import io
 import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
+from enum import StrEnum
 from pathlib import Path
+from typing import TextIO
 
+from time_surfer.completion import (
+    TASK_INDEX_FILENAME,
+    encode_index,
+    index_from_history,
+    read_index,
+    record_use,
+)
+from time_surfer.metrics import METRICS, TimedLock
 from time_surfer.models import Day, Span
+from time_surfer.notes import NOTES_FILENAME
+from time_surfer.prompt import STATUS_FILENAME, encode_status
+
+SCHEMA_VERSION = 3
+LEGACY_SCHEMA_VERSION = 1
+# The first version with per-record checksums.
+CHECKSUM_SCHEMA_VERSION = 3
+BACKUP_SUFFIX = ".bak"
+
+_DATE_PREFIX = '{"date":"'
+
+
+class UnsupportedSchemaError(ValueError):
+    """Raised when the data file was written by a newer version of time-surfer."""
+
+
+class CorruptDataError(ValueError):
+    """Raised when a data file record fails its checksum or cannot be decoded."""
+
+
+def encode_header(version: int = SCHEMA_VERSION) -> str:
+    """Return the header line for a data file."""
+    return json.dumps({"schema_version": version}, separators=(",", ":")) + "\n"
+
+
+def checksum(payload: str) -> str:
+    """Return the CRC-32 of a record's JSON as 8 hex digits."""
+    return f"{zlib.crc32(payload.encode()):08x}"
+
+
+def seal(payload: str) -> str:
+    """Append the checksum to a record's JSON, giving a storage line."""
+    return f"{payload}\t{checksum(payload)}"
+
+
+def unseal(line: str) -> str:
+    """Return the JSON of a storage line after verifying its checksum.
+
+    Raises:
+        CorruptDataError: If the checksum is missing or does not match
+    """
+    payload, sep, digest = line.rpartition("\t")
+    if not sep or checksum(payload) != digest:
+        raise CorruptDataError(f"Checksum mismatch in record {line[:40]!r}")
+    return payload
+
+
+def encode_record(record: dict) -> str:
+    """Serialise one day record as a storage line (without newline)."""
+    return seal(json.dumps(record, separators=(",", ":")))
+
+
+def decode_record(line: str) -> dict:
+    """Verify and decode one storage line.
+
+    Raises:
+        CorruptDataError: If the checksum does not match or the JSON is invalid
+    """
+    return decode_payload(unseal(line))
+
+
+def decode_payload(payload: str) -> dict:
+    """Decode a record's JSON, which must be an object with a date.
+
+    Raises:
+        CorruptDataError: If it is not
+    """
+    try:
+        record = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise CorruptDataError(f"Undecodable record {payload[:40]!r}: {e}") from None
+    if not isinstance(record, dict) or not isinstance(record.get("date"), str):
+        raise CorruptDataError(f"Record without a date: {payload[:40]!r}")
+    return record
+
+
+def record_date(line: str) -> str:
+    """Return the date of a storage line, parsing JSON only if unavoidable."""
+    if line.startswith(_DATE_PREFIX) and line[19:20] == '"':
+        return line[9:19]
+    return decode_record(line)["date"]
+
+
+def read_schema_version(f: TextIO) -> int | None:
+    """Detect the schema version of an open data file.
+
+    Leaves the file positioned after the header, or rewound to the start for
+    legacy files. Returns None for an empty (or whitespace-only) file. Reads at
+    most a few bytes beyond the header, however large the file is.
+    """
+    first = f.readline(64)
+    if first.endswith("\n"):
+        try:
+            header = json.loads(first)
+        except json.JSONDecodeError:
+            header = None
+        if isinstance(header, dict) and "schema_version" in header:
+            return int(header["schema_version"])
+
+    f.seek(0)
+    while chunk := f.read(4096):
+        if chunk.strip():
+            f.seek(0)
+            return LEGACY_SCHEMA_VERSION
+    return None
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once, at import.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def atomic_write(path: Path, write: Callable[[TextIO], None], fsync: bool = False) -> None:
+    """Replace ``path`` with content produced by ``write``, atomically.
+
+    The content is written to a temporary file in the same directory and renamed
+    over ``path``, so readers never observe a partial write. With ``fsync`` the
+    file and its directory are flushed to stable storage. The new file keeps the
+    mode of the one it replaces, or gets the umask's default (as ``open`` would).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            # mkstemp creates the file 0600, which would hide it from other users.
+            os.fchmod(f.fileno(), mode)
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+    if fsync:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class Durability(StrEnum):
+    """How eagerly writes are made durable.
+
+    STRICT: every save is fsynced (file and directory) before returning.
+    RELAXED: saves are group-committed without fsync, flushed after
+        ``commit_max_events`` events or ``commit_interval_ms`` milliseconds (and
+        at interpreter exit). The default of one event makes this write-through.
+    MEMORY: nothing touches disk; intended for tests and embedding.
+    """
+
+    STRICT = "strict"
+    RELAXED = "relaxed"
+    MEMORY = "memory"
 
 
 class Storage:
     """Handles persistence of time tracking data to JSON."""
 
     DEFAULT_DATA_PATH = Path.home() / ".local" / "share" / "time-surfer" / "data.json"
+    DEFAULT_COMMIT_INTERVAL_MS = 1000
+    DEFAULT_COMMIT_MAX_EVENTS = 1
 
-    def __init__(self, data_file: Path | None = None):
+    def __init__(
+        self,
+        data_file: Path | None = None,
+        durability: Durability = Durability.RELAXED,
+        commit_interval_ms: int = DEFAULT_COMMIT_INTERVAL_MS,
+        commit_max_events: int = DEFAULT_COMMIT_MAX_EVENTS,
+    ):
         self.data_file = data_file or self.DEFAULT_DATA_PATH
+        self.durability = Durability(durability)
+        self.commit_interval_ms = commit_interval_ms
+        self.commit_max_events = commit_max_events
+
+        self._lock = TimedLock("storage")
+        # Day records not (yet) on disk, as encoded lines keyed by date.
+        self._memory: dict[str, str] = {}
+        self._pending: dict[str, str] = {}
+        self._pending_events = 0
+        self._timer: threading.Timer | None = None
+        self._exit_hook_registered = False
+        # Serialises read-modify-write transactions (see lock()).
+        self._transaction_lock = TimedLock("transaction")
+        self._lock_file: TextIO | None = None
+        self._lock_depth = 0
+
+    def __enter__(self) -> "Storage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def save_day(self, day: Day) -> None:
         """Save a day's data to storage."""
-        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        line = encode_record(self._day_to_dict(day))
+        METRICS.set("time_surfer_day_spans", len(day.spans))
+
+        if self.durability is Durability.MEMORY:
+            with self._lock:
+                self._memory[day.date] = line
+            return
+
+        if self.durability is Durability.STRICT:
+            with self.lock(), self._lock:
+                self._rewrite({day.date: line})
+            return
+
+        with self._lock:
+            self._pending[day.date] = line
+            self._pending_events += 1
+            due = self._pending_events >= self.commit_max_events
+            if not due:
+                self._schedule_flush()
+        if due:
+            self.flush()
+
+    @property
+    def lock_file(self) -> Path:
+        """Path of the file locked by ``lock()``, next to the data file."""
+        return self.data_file.with_name(self.data_file.name + ".lock")
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the data file for a read-modify-write.
+
+        Excludes other threads using this Storage and, through ``flock`` on
+        ``lock_file``, other processes, so a load, change and save cannot
+        interleave with another one and lose its update. Every write of the
+        data file takes it, and every writer that saves what it read (Tracker,
+        compaction, migration, sync, calendar import, fsck repair) must hold
+        it from the read to the save. Reads do not take it. Reentrant; a no-op
+        across processes in memory mode.
+        """
+        with self._transaction_lock:
+            if self._lock_depth == 0 and self.durability is not Durability.MEMORY:
+                self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self.lock_file, "a")
+                try:
+                    self._acquire_file_lock(lock_file)
+                except BaseException:
+                    lock_file.close()
+                    raise
+                self._lock_file = lock_file
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    # Closing the file releases the flock.
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _acquire_file_lock(self, lock_file: TextIO) -> None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            pass
+        start = time.perf_counter()
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        METRICS.inc("time_surfer_lock_wait_seconds_total", time.perf_counter() - start, lock="file")
+        METRICS.inc("time_surfer_lock_contended_total", lock="file")
+
+    def save_days(self, days: Iterable[Day]) -> None:
+        """Save several days with a single rewrite of the data file."""
+        self.save_lines({day.date: encode_record(self._day_to_dict(day)) for day in days})
+
+    def save_lines(self, lines: dict[str, str]) -> None:
+        """Save already encoded day records (date to line) with a single rewrite.
+
+        Records are stored verbatim, so a line read from another data file can
+        be copied without being parsed.
+        """
+        if not lines:
+            return
+        with self._lock:
+            if self.durability is Durability.MEMORY:
+                self._memory.update(lines)
+                return
+            self._pending.update(lines)
+        self.flush()
+
+    @property
+    def status_file(self) -> Path:
+        """Path of the prompt status snapshot, next to the data file."""
+        return self.data_file.with_name(STATUS_FILENAME)
+
+    def save_status(self, day: Day) -> None:
+        """Record the running task and its start for prompt segments.
+
+        The snapshot is tiny and fixed-format so ``time-surfer-prompt`` can read
+        it without parsing the data file (see time_surfer.prompt).
+        """
+        if self.durability is Durability.MEMORY:
+            return
+        span = day.open_span if day.is_active and day.current_task is not None else None
+        content = encode_status(
+            span.task if span else None, span.start.timestamp() if span else None
+        )
+        atomic_write(self.status_file, lambda f: f.write(content))
+
+    @property
+    def notes_file(self) -> Path:
+        """Path of the span annotation store, next to the data file (see time_surfer.notes)."""
+        return self.data_file.with_name(NOTES_FILENAME)
+
+    @property
+    def task_index_file(self) -> Path:
+        """Path of the task-name completion index, next to the data file."""
+        return self.data_file.with_name(TASK_INDEX_FILENAME)
+
+    def record_task_use(self, task: str, when: datetime) -> None:
+        """Count a switch to ``task`` in the completion index.
+
+        The index is updated in place rather than rebuilt from the data file
+        (see time_surfer.completion); a missing index is seeded from the stored
+        spans, which already include this switch.
+        """
+        if self.durability is Durability.MEMORY:
+            return
+        if not self.task_index_file.exists():
+            self.seed_task_index()
+            if self.task_index_file.exists():
+                return
+        entries = record_use(read_index(str(self.task_index_file)), task, when.timestamp())
+        if entries is not None:
+            atomic_write(self.task_index_file, lambda f: f.write(encode_index(entries)))
 
-        data = self._load_all_data()
-        data[day.date] = self._day_to_dict(day)
+    def seed_task_index(self) -> None:
+        """Build the completion index from the stored spans if it does not exist yet.
 
-        with open(self.data_file, "w") as f:
-            json.dump(data, f, indent=2)
+        Each span counts as one switch to its task, last used at its start. Does
+        nothing without a data file, or in memory mode.
+        """
+        if self.durability is Durability.MEMORY or not self.data_file.exists():
+            return
+        with self.lock():
+            if self.task_index_file.exists():
+                return
+            entries = index_from_history(
+                (span.task, span.start.timestamp())
+                for day in self.iter_days()
+                for span in day.spans
+            )
+            atomic_write(self.task_index_file, lambda f: f.write(encode_index(entries)))
+
+    def flush(self) -> None:
+        """Commit any group-committed writes to disk."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+        # The storage lock is always taken before the in-process one.
+        with self.lock(), self._lock:
+            if not self._pending:
+                return
+            self._rewrite(self._pending)
+            self._pending.clear()
+            self._pending_events = 0
+
+    def close(self) -> None:
+        """Flush pending writes and release background resources."""
+        self.flush()
+        if self._exit_hook_registered:
+            atexit.unregister(self.flush)
+            self._exit_hook_registered = False
 
     def load_day(self, date: str) -> Day | None:
         """Load a day's data from storage. Returns None if not found."""
-        data = self._load_all_data()
-        if date not in data:
+        for _, line in self._iter_records(date, date):
+            return self._parse_line(line)
+        return None
+
+    def load_all_days(self) -> list[Day]:
+        """Load every stored day, ordered by date."""
+        return list(self.iter_days())
+
+    def iter_days(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[Day]:
+        """Yield stored days in date order, optionally within an inclusive range.
+
+        The data file is streamed line by line; only days in range are parsed.
+        """
+        for _, line in self._iter_records(start_date, end_date):
+            yield self._parse_line(line)
+
+    def iter_lines(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Yield (date, encoded record) pairs in date order without parsing them."""
+        return self._iter_records(start_date, end_date)
+
+    def fingerprint(self) -> tuple[int, int, int] | None:
+        """Return (inode, size, mtime_ns) of the data file, identifying its content.
+
+        Returns None when the file alone does not describe the stored data: in
+        memory mode, or while group-committed writes are pending.
+        """
+        if self.durability is Durability.MEMORY or self._pending:
             return None
-        return self._dict_to_day(data[date])
+        try:
+            st = self.data_file.stat()
+        except FileNotFoundError:
+            return (0, 0, 0)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
 
-    def _load_all_data(self) -> dict:
-        """Load all data from the JSON file."""
-        if not self.data_file.exists():
-            return {}
+    def snapshot(self) -> "StorageSnapshot":
+        """Pin the current contents of storage for consistent, non-blocking reads.
+
+        The snapshot keeps the current data file open (and copies any writes not
+        yet flushed), so it is unaffected by later saves, which replace the file
+        rather than overwrite it. Close it when done, or use it as a context
+        manager.
+        """
+        return StorageSnapshot(self)
+
+    def replace_all_days(self, days: list[Day]) -> None:
+        """Rewrite storage so that it contains exactly the given days."""
+        lines = {day.date: encode_record(self._day_to_dict(day)) for day in days}
+        with self.lock(), self._lock:
+            if self.durability is Durability.MEMORY:
+                self._memory = lines
+                return
+            self._pending.clear()
+            self._pending_events = 0
+            self._write_lines(sorted(lines.items()))
+
+    def dumps(self, days: list[Day]) -> str:
+        """Serialise days exactly as they would be written to storage."""
+        lines = {day.date: encode_record(self._day_to_dict(day)) for day in days}
+        return self._dumps(sorted(lines.items()))
+
+    def file_size(self) -> int:
+        """Return the size of the data file in bytes (0 if missing)."""
+        if self.durability is Durability.MEMORY:
+            return len(self._dumps(sorted(self._memory.items())).encode()) if self._memory else 0
+        try:
+            return self.data_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def schema_version(self) -> int | None:
+        """Return the schema version of the data file (None if missing or empty)."""
+        if self.durability is Durability.MEMORY:
+            return SCHEMA_VERSION
         try:
             with open(self.data_file) as f:
-                content = f.read()
-                if not content.strip():
-                    return {}
-                return json.loads(content)
-        except json.JSONDecodeError:
-            return {}
+                return read_schema_version(f)
+        except FileNotFoundError:
+            return None
+
+    def _schedule_flush(self) -> None:
+        """Arrange for pending writes to be flushed after the commit interval."""
+        if not self._exit_hook_registered:
+            atexit.register(self.flush)
+            self._exit_hook_registered = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.commit_interval_ms / 1000, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _rewrite(self, updates: dict[str, str]) -> None:
+        """Stream the data file into a new copy with ``updates`` merged in by date.
+
+        Unchanged days are copied as raw lines without being parsed.
+        """
+        merged = _merge_by_date(self._iter_file_records(), sorted(updates.items()))
+        self._write_lines(merged, backup=True)
+
+    @property
+    def backup_file(self) -> Path:
+        """Path of the last good copy of the data file, kept by saves."""
+        return self.data_file.with_name(self.data_file.name + BACKUP_SUFFIX)
+
+    def _write_lines(self, records: Iterable[tuple[str, str]], backup: bool = False) -> None:
+        """Atomically replace the data file with the given (date, line) records.
+
+        With ``backup``, ``records`` must read the whole current file: once that
+        has succeeded (verifying every checksum), the old file is kept as
+        ``backup_file`` by a hard link instead of a copy.
+        """
+
+        def write(f: TextIO) -> None:
+            f.write(encode_header())
+            for _, line in records:
+                f.write(line)
+                f.write("\n")
+
+        pending_backup = self._link_pending_backup() if backup else None
+        try:
+            with METRICS.timer("time_surfer_storage_write_seconds"):
+                atomic_write(self.data_file, write, fsync=self.durability is Durability.STRICT)
+        except BaseException:
+            if pending_backup is not None:
+                pending_backup.unlink(missing_ok=True)
+            raise
+        if pending_backup is not None:
+            os.replace(pending_backup, self.backup_file)
+
+    def _link_pending_backup(self) -> Path | None:
+        """Hard-link the current data file to a temporary name, or None if there is none."""
+        pending = self.backup_file.with_name(f".{self.backup_file.name}.{os.getpid()}.tmp")
+        pending.unlink(missing_ok=True)
+        try:
+            os.link(self.data_file, pending)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            return None  # E.g. a filesystem without hard links; keep no backup.
+        return pending
+
+    def _dumps(self, records: Iterable[tuple[str, str]]) -> str:
+        """Serialise (date, line) records in the storage layout."""
+        return encode_header() + "".join(f"{line}\n" for _, line in records)
+
+    def _iter_records(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Yield (date, line) for every day, including unflushed writes."""
+        if self.durability is Durability.MEMORY:
+            records = iter(sorted(self._memory.items()))
+        else:
+            with self._lock:
+                pending = sorted(self._pending.items())
+            records = _merge_by_date(self._iter_file_records(), pending)
+
+        for date, line in records:
+            if start_date is not None and date < start_date:
+                continue
+            if end_date is not None and date > end_date:
+                break
+            yield date, line
+
+    def _iter_file_records(self) -> Iterator[tuple[str, str]]:
+        """Yield (date, line) records from the data file in date order."""
+        try:
+            f = open(self.data_file)
+        except FileNotFoundError:
+            return
+        with f:
+            yield from self._read_records(f)
+
+    def _read_records(self, f: TextIO) -> Iterator[tuple[str, str]]:
+        """Yield (date, line) records from an open data file."""
+        version = read_schema_version(f)
+        if version is None:
+            return
+        if version == LEGACY_SCHEMA_VERSION:
+            yield from self._iter_legacy_records(f)
+            return
+        if version > SCHEMA_VERSION:
+            raise UnsupportedSchemaError(
+                f"{self.data_file} uses schema version {version}; "
+                f"this version of time-surfer supports up to {SCHEMA_VERSION}"
+            )
+        checksummed = version >= CHECKSUM_SCHEMA_VERSION
+        for number, raw in enumerate(f, start=2):
+            line = raw.rstrip("\n")
+            if not line:
+                continue
+            try:
+                if checksummed:
+                    unseal(line)
+                else:
+                    # Validate before sealing: a checksum must not bless a damaged record.
+                    decode_payload(line)
+                    line = seal(line)
+                date = record_date(line)
+            except CorruptDataError as e:
+                raise CorruptDataError(
+                    f"{self.data_file}, line {number}: {e}; "
+                    "run 'time-surfer fsck --repair' to restore it from the last good copy"
+                ) from None
+            yield date, line
+
+    def _iter_legacy_records(self, f: TextIO) -> Iterator[tuple[str, str]]:
+        """Yield records from a schema version 1 file (one JSON object keyed by date)."""
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise CorruptDataError(f"{self.data_file} is not valid JSON: {e}") from None
+        for date in sorted(data):
+            yield date, encode_record(data[date])
+
+    def _parse_line(self, line: str) -> Day:
+        """Decode one storage line into a Day, counting the time taken."""
+        start = time.perf_counter()
+        day = self._dict_to_day(decode_record(line))
+        METRICS.inc("time_surfer_parse_seconds_total", time.perf_counter() - start)
+        METRICS.inc("time_surfer_days_parsed_total")
+        return day
 
     def _day_to_dict(self, day: Day) -> dict:
         """Convert a Day object to a dictionary."""
@@ -80,3 +688,146 @@ class Storage:
             start=datetime.fromisoformat(data["start"]),
             end=datetime.fromisoformat(data["end"]) if data["end"] else None,
         )
+
+
+class _PositionalReader(io.RawIOBase):
+    """Read-only view of a file descriptor with its own offset.
+
+    Uses ``os.pread`` so any number of readers can share one descriptor.
+    """
+
+    def __init__(self, fd: int):
+        super().__init__()
+        self._fd = fd
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            self._offset = offset
+        elif whence == os.SEEK_CUR:
+            self._offset += offset
+        else:
+            self._offset = os.fstat(self._fd).st_size + offset
+        return self._offset
+
+    def tell(self) -> int:
+        return self._offset
+
+    def readinto(self, buffer) -> int:
+        data = os.pread(self._fd, len(buffer), self._offset)
+        buffer[: len(data)] = data
+        self._offset += len(data)
+        return len(data)
+
+
+class StorageSnapshot:
+    """A read-only, point-in-time view of a Storage (see ``Storage.snapshot``).
+
+    Offers the read methods of Storage. Every pass over the snapshot sees the
+    same data however many saves happen meanwhile, and taking or reading a
+    snapshot never blocks writers.
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+        self.data_file = storage.data_file
+        self.durability = storage.durability
+        self._fd: int | None = None
+        self._stat: os.stat_result | None = None
+        with storage._lock:
+            if storage.durability is Durability.MEMORY:
+                self._pending = sorted(storage._memory.items())
+                return
+            self._pending = sorted(storage._pending.items())
+            try:
+                self._fd = os.open(storage.data_file, os.O_RDONLY)
+            except FileNotFoundError:
+                return
+            self._stat = os.fstat(self._fd)
+
+    def __enter__(self) -> "StorageSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the pinned data file."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def fingerprint(self) -> tuple[int, int, int] | None:
+        """The data file fingerprint at the time of the snapshot (see Storage.fingerprint)."""
+        if self.durability is Durability.MEMORY or self._pending:
+            return None
+        if self._stat is None:
+            return (0, 0, 0)
+        return (self._stat.st_ino, self._stat.st_size, self._stat.st_mtime_ns)
+
+    def load_day(self, date: str) -> Day | None:
+        """Load a day as of the snapshot. Returns None if not found."""
+        for _, line in self.iter_lines(date, date):
+            return self._parse_line(line)
+        return None
+
+    def load_all_days(self) -> list[Day]:
+        """Load every day in the snapshot, ordered by date."""
+        return list(self.iter_days())
+
+    def iter_days(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[Day]:
+        """Yield days in date order, optionally within an inclusive range."""
+        for _, line in self.iter_lines(start_date, end_date):
+            yield self._parse_line(line)
+
+    def iter_lines(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Yield (date, encoded record) pairs in date order without parsing them."""
+        if self.durability is Durability.MEMORY:
+            records = iter(self._pending)
+        else:
+            records = _merge_by_date(self._iter_file_records(), self._pending)
+        for date, line in records:
+            if start_date is not None and date < start_date:
+                continue
+            if end_date is not None and date > end_date:
+                break
+            yield date, line
+
+    def _dict_to_day(self, data: dict) -> Day:
+        return self.storage._dict_to_day(data)
+
+    def _parse_line(self, line: str) -> Day:
+        return self.storage._parse_line(line)
+
+    def _iter_file_records(self) -> Iterator[tuple[str, str]]:
+        if self._fd is None:
+            return
+        with io.TextIOWrapper(io.BufferedReader(_PositionalReader(self._fd))) as f:
+            yield from self.storage._read_records(f)
+
+
+def _merge_by_date(
+    base: Iterable[tuple[str, str]], updates: Iterable[tuple[str, str]]
+) -> Iterator[tuple[str, str]]:
+    """Merge two date-ordered record streams; ``updates`` wins on equal dates."""
+    # Tag updates with 0 so they sort before base records for the same date.
+    tagged = heapq.merge(
+        ((date, 0, line) for date, line in updates),
+        ((date, 1, line) for date, line in base),
+    )
+    last = None
+    for date, _, line in tagged:
+        if date == last:
+            continue
+        last = date
+        yield date, line
@@ -0,0 +1,473 @@
+"""Multi-process stress test of the tracker against one shared data file.
+
+Usage:
+    python -m time_surfer.stress [--processes N] [--events N] [--speed X] [--batch-writers N]
+
+Every worker process runs its own ``Tracker`` and ``Storage`` on the same data
+file and replays a stream of start / switch_to / stop events, either synthetic
+or recorded (JSON Lines such as ``{"action": "switch_to", "task": "email"}``,
+or the history in an existing data file). All workers share an accelerated
+clock: at the default ``--speed 36000`` a second covers ten hours of tracking,
+so a few seconds of load replay whole days. With ``--batch-writers`` further
+processes run ``compact_storage`` over the whole file in a loop meanwhile, as
+a stand-in for every batch writer (compaction, migration, sync, calendar
+import) that rewrites days it read: any tracker write landing between such a
+read and its save shows up as a lost span.
+
+Each worker notes the clock reading every event was applied at. Since changes
+are serialised by ``Storage.lock``, replaying all events in that order against
+an in-memory tracker gives the day records that must be on disk (compared
+after compaction when batch writers ran, which merge spans); the report
+lists spans missing from the data file (lost), spans it should not contain
+(unexpected) and days breaking span invariants (corrupted), besides throughput
+and latency percentiles.
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from time_surfer.compaction import compact_day, compact_storage
+from time_surfer.models import Day, Span
+from time_surfer.storage import Durability, Storage
+from time_surfer.tracker import Tracker
+
+ACTIONS = ("start", "switch_to", "stop")
+DEFAULT_BASE = datetime(2024, 1, 1, 8, 0)
+DEFAULT_SPEED = 36000.0
+# Seconds to wait for the worker processes to start.
+STARTUP_TIMEOUT = 60.0
+
+
+@dataclass
+class Event:
+    """One tracker call to replay."""
+
+    action: str
+    task: str | None = None
+
+
+@dataclass
+class AcceleratedClock:
+    """A clock running ``speed`` times faster than wall time from ``base``.
+
+    Based on ``time.time``, so instances in different processes agree.
+    """
+
+    base: datetime = DEFAULT_BASE
+    speed: float = DEFAULT_SPEED
+    origin: float = field(default_factory=time.time)
+
+    def __call__(self) -> datetime:
+        return self.base + timedelta(seconds=(time.time() - self.origin) * self.speed)
+
+
+class _RecordingClock:
+    """Wrap a clock, remembering the last time it returned."""
+
+    def __init__(self, clock: AcceleratedClock):
+        self.clock = clock
+        self.last: datetime | None = None
+
+    def __call__(self) -> datetime:
+        self.last = self.clock()
+        return self.last
+
+
+@dataclass
+class StressReport:
+    """Outcome of a stress run."""
+
+    processes: int = 0
+    batch_runs: int = 0
+    operations: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    simulated: timedelta = timedelta(0)
+    days: int = 0
+    spans: int = 0
+    errors: list[str] = field(default_factory=list)
+    lost: list[str] = field(default_factory=list)
+    unexpected: list[str] = field(default_factory=list)
+    corrupted: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if every operation succeeded and nothing was lost or corrupted."""
+        return not (self.errors or self.lost or self.unexpected or self.corrupted)
+
+    @property
+    def throughput(self) -> float:
+        """Operations per second."""
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: int) -> float:
+        """Latency percentile in seconds (p in 1..99)."""
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[p - 1]
+
+
+def synthetic_events(
+    count: int, tasks: int = 8, seed: int | None = None, stop_ratio: float = 0.002
+) -> list[Event]:
+    """Generate mostly switches among ``tasks`` names, with occasional stops and starts."""
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < stop_ratio:
+            events.append(Event("stop"))
+        elif roll < 2 * stop_ratio:
+            events.append(Event("start"))
+        else:
+            events.append(Event("switch_to", f"task-{rng.randrange(tasks)}"))
+    return events
+
+
+def read_events(lines: Iterable[str]) -> Iterator[Event]:
+    """Parse recorded events, one JSON object per line.
+
+    Raises:
+        ValueError: For an unknown action or a switch without a task
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        event = Event(data.get("action", ""), data.get("task"))
+        if event.action not in ACTIONS or (event.action == "switch_to" and not event.task):
+            raise ValueError(f"Invalid event: {line.strip()}")
+        yield event
+
+
+def events_from_days(days: Iterable[Day]) -> Iterator[Event]:
+    """Turn tracked history into events: a switch per span, a stop per stopped day."""
+    for day in days:
+        for span in day.spans:
+            yield Event("switch_to", span.task)
+        if day.end_time is not None:
+            yield Event("stop")
+
+
+def apply_event(tracker: Tracker, event: Event):
+    """Run one event against a tracker and return its TrackerResult."""
+    if event.action == "start":
+        return tracker.start()
+    if event.action == "stop":
+        return tracker.stop()
+    return tracker.switch_to(event.task)
+
+
+def _worker(
+    worker: int,
+    data_file: str,
+    durability: str,
+    events: list[Event],
+    clock: AcceleratedClock,
+    interval: float,
+    barrier,
+    results,
+) -> None:
+    recording = _RecordingClock(clock)
+    tracker = Tracker(Storage(Path(data_file), durability=durability), clock=recording)
+    applied = []
+    latencies = []
+    errors = []
+    barrier.wait()
+    for seq, event in enumerate(events):
+        recording.last = None
+        begin = time.perf_counter()
+        try:
+            apply_event(tracker, event)
+        except Exception as e:  # noqa: BLE001 - reported, not raised
+            errors.append(f"worker {worker} event {seq} ({event.action}): {e!r}")
+        else:
+            applied.append((recording.last, worker, seq, event.action, event.task))
+        latencies.append(time.perf_counter() - begin)
+        if interval:
+            time.sleep(interval)
+    tracker.storage.close()
+    results.put((applied, latencies, errors))
+
+
+def _batch_worker(
+    worker: int, data_file: str, durability: str, barrier, done, results
+) -> None:
+    storage = Storage(Path(data_file), durability=durability)
+    runs = 0
+    errors = []
+    barrier.wait()
+    while not done.is_set():
+        try:
+            compact_storage(storage, min_span_seconds=0)
+        except Exception as e:  # noqa: BLE001 - reported, not raised
+            errors.append(f"batch writer {worker} run {runs}: {e!r}")
+        runs += 1
+    storage.close()
+    results.put((runs, errors))
+
+
+def _compacted(day: Day) -> Day:
+    return compact_day(day, min_span_seconds=0)
+
+
+def expected_days(applied: list[tuple]) -> dict[str, Day]:
+    """Replay applied events in clock order on an in-memory tracker."""
+    now: list[datetime] = []
+    storage = Storage(Path("expected.json"), durability=Durability.MEMORY)
+    tracker = Tracker(storage, clock=lambda: now[-1])
+    for at, _, _, action, task in sorted(applied):
+        now.append(at)
+        apply_event(tracker, Event(action, task))
+    return {day.date: day for day in storage.load_all_days()}
+
+
+def check_day(day: Day) -> list[str]:
+    """Return the span invariants a stored day breaks."""
+    problems = []
+    previous: Span | None = None
+    for span in day.spans:
+        if span.end is not None and span.end < span.start:
+            problems.append(f"{day.date}: span {span.task!r} ends before it starts")
+        if previous is not None:
+            if previous.end is None:
+                problems.append(f"{day.date}: open span {previous.task!r} is not the last")
+            elif span.start < previous.end:
+                problems.append(f"{day.date}: {span.task!r} overlaps {previous.task!r}")
+        previous = span
+    if day.is_active and previous is not None and previous.end is None:
+        if day.current_task != previous.task:
+            problems.append(f"{day.date}: current task is not the open span's")
+    elif previous is not None and previous.end is None:
+        problems.append(f"{day.date}: stopped day has an open span")
+    return problems
+
+
+def _span_keys(day: Day | None) -> set[tuple]:
+    if day is None:
+        return set()
+    return {(day.date, span.task, span.start, span.end) for span in day.spans}
+
+
+def verify(
+    report: StressReport,
+    storage: Storage,
+    expected: dict[str, Day],
+    normalize: Callable[[Day], Day] | None = None,
+) -> None:
+    """Compare stored days with the expected ones, filling in the report.
+
+    ``normalize`` is applied to both sides first, e.g. to compact them.
+    """
+    try:
+        actual = {day.date: day for day in storage.load_all_days()}
+    except Exception as e:  # noqa: BLE001 - an unreadable file is corruption
+        report.corrupted.append(f"data file unreadable: {e!r}")
+        return
+    if normalize is not None:
+        actual = {date: normalize(day) for date, day in actual.items()}
+        expected = {date: normalize(day) for date, day in expected.items()}
+    report.days = len(actual)
+    for date in sorted(set(actual) | set(expected)):
+        day = actual.get(date)
+        if day is not None:
+            report.spans += len(day.spans)
+            report.corrupted.extend(check_day(day))
+            if day != expected.get(date) and _span_keys(day) == _span_keys(expected.get(date)):
+                report.corrupted.append(f"{date}: day fields differ from the expected record")
+        wanted, stored = _span_keys(expected.get(date)), _span_keys(day)
+        report.lost.extend(_describe(key) for key in sorted(wanted - stored, key=_sort_key))
+        report.unexpected.extend(_describe(key) for key in sorted(stored - wanted, key=_sort_key))
+
+
+def _sort_key(key: tuple) -> tuple:
+    date, task, start, end = key
+    return (date, start, end or datetime.max, task)
+
+
+def _describe(key: tuple) -> str:
+    _, task, start, end = key
+    end_text = end.isoformat(timespec="seconds") if end else "open"
+    return f"{task!r} {start.isoformat(timespec='seconds')} - {end_text}"
+
+
+def run(
+    data_file: Path,
+    streams: list[list[Event]],
+    clock: AcceleratedClock | None = None,
+    durability: Durability = Durability.RELAXED,
+    interval: float = 0.0,
+    batch_writers: int = 0,
+) -> StressReport:
+    """Replay one event stream per process against ``data_file`` and verify the result.
+
+    Args:
+        data_file: Data file shared by all workers (normally new and empty)
+        streams: Events for each worker process
+        clock: Clock shared by the workers (default: an AcceleratedClock from now)
+        durability: Durability mode of the workers' storage
+        interval: Seconds each worker waits between events
+        batch_writers: Extra processes compacting the whole file in a loop
+            until the tracker workers finish
+
+    Returns:
+        StressReport with throughput, latencies and any lost or corrupted spans
+    """
+    clock = clock or AcceleratedClock()
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(len(streams) + batch_writers + 1, timeout=STARTUP_TIMEOUT)
+    results = context.Queue()
+    batch_results = context.Queue()
+    done = context.Event()
+    workers = [
+        context.Process(
+            target=_worker,
+            args=(i, str(data_file), durability, events, clock, interval, barrier, results),
+        )
+        for i, events in enumerate(streams)
+    ]
+    batch = [
+        context.Process(
+            target=_batch_worker,
+            args=(i, str(data_file), durability, barrier, done, batch_results),
+        )
+        for i in range(batch_writers)
+    ]
+    for process in workers + batch:
+        process.start()
+    barrier.wait()
+    begin = time.perf_counter()
+    outcomes = _collect(results, workers)
+    elapsed = time.perf_counter() - begin
+    done.set()
+    batch_outcomes = _collect(batch_results, batch)
+    for process in workers + batch:
+        process.join()
+
+    report = StressReport(processes=len(workers), elapsed=elapsed)
+    for runs, errors in batch_outcomes:
+        report.batch_runs += runs
+        report.errors.extend(errors)
+    applied = []
+    for worker_applied, latencies, errors in outcomes:
+        applied.extend(worker_applied)
+        report.latencies.extend(latencies)
+        report.errors.extend(errors)
+    report.operations = len(report.latencies)
+    if applied:
+        times = [at for at, *_ in applied]
+        report.simulated = max(times) - min(times)
+
+    with Storage(data_file) as storage:
+        verify(report, storage, expected_days(applied), _compacted if batch_writers else None)
+    return report
+
+
+def _collect(results, workers: list) -> list[tuple]:
+    """Wait for every worker's results, failing if a worker died without sending them."""
+    outcomes = []
+    while len(outcomes) < len(workers):
+        try:
+            outcomes.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(process.is_alive() for process in workers):
+                raise RuntimeError("A stress worker exited without reporting") from None
+    return outcomes
+
+
+def format_report(report: StressReport) -> str:
+    """Render a report as plain text."""
+    lines = [
+        f"{report.operations} operations from {report.processes} processes "
+        f"in {report.elapsed:.2f}s ({report.simulated} simulated)",
+        f"throughput: {report.throughput:.0f} ops/s",
+        "latency ms: "
+        + " ".join(f"p{p}={report.percentile(p) * 1000:.2f}" for p in (50, 95, 99))
+        + f" max={max(report.latencies, default=0.0) * 1000:.2f}",
+        f"stored: {report.days} days, {report.spans} spans",
+    ]
+    if report.batch_runs:
+        lines.insert(1, f"batch writers: {report.batch_runs} whole-file compactions")
+    for label, problems in (
+        ("errors", report.errors),
+        ("lost spans", report.lost),
+        ("unexpected spans", report.unexpected),
+        ("corrupted", report.corrupted),
+    ):
+        lines.append(f"{label}: {len(problems)}")
+        lines.extend(f"  {problem}" for problem in problems[:10])
+    lines.append("OK" if report.ok else "FAILED")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--events", type=int, default=200, help="Synthetic events per process")
+    parser.add_argument("--tasks", type=int, default=8, help="Distinct synthetic task names")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--replay", type=Path, help="Recorded events (JSON Lines) or a data file to replay"
+    )
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED)
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between events")
+    parser.add_argument(
+        "--durability",
+        choices=[Durability.STRICT.value, Durability.RELAXED.value],
+        default=Durability.RELAXED.value,
+    )
+    parser.add_argument(
+        "--batch-writers", type=int, default=0, help="Processes compacting the file meanwhile"
+    )
+    parser.add_argument("--data-file", type=Path, help="Keep the data file here")
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        events = list(_load_replay(args.replay))
+        streams = [events[i:: args.processes] for i in range(args.processes)]
+    else:
+        seed = args.seed if args.seed is not None else random.randrange(2**32)
+        streams = [
+            synthetic_events(args.events, args.tasks, seed + i) for i in range(args.processes)
+        ]
+
+    clock = AcceleratedClock(speed=args.speed)
+    if args.data_file is not None:
+        data_file = args.data_file
+        report = run(
+            data_file, streams, clock, args.durability, args.interval, args.batch_writers
+        )
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_file = Path(tmp) / "data.json"
+            report = run(
+                data_file, streams, clock, args.durability, args.interval, args.batch_writers
+            )
+    print(format_report(report))
+    return 0 if report.ok else 1
+
+
+def _load_replay(path: Path) -> Iterator[Event]:
+    """Read recorded events, or the history of a time-surfer data file."""
+    with open(path) as f:
+        first = f.readline()
+    if '"action"' in first:
+        with open(path) as f:
+            yield from read_events(f)
+    else:
+        yield from events_from_days(Storage(path).iter_days())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
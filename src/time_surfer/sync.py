@@ -0,0 +1,201 @@
+"""Two-way sync of data files between machines, one day at a time.
+
+Both sides are compared by a content hash of each day's raw storage line, so
+unchanged days are neither parsed nor copied. For every peer the hashes agreed
+at the end of the previous sync are kept in ``sync-state.json`` next to the
+local data file, which makes each differing day a three-way decision:
+
+* changed on one side only: that side's line is copied verbatim to the other;
+* changed on both sides (or never synced): the two days are merged with
+  ``merge_days`` and the result is written to both.
+
+Both data files end up with byte-identical lines for every day, so the next
+sync finds nothing to do until either side changes.
+"""
+
+import heapq
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from time_surfer.cache import content_hash
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage, atomic_write, encode_record
+
+STATE_FILENAME = "sync-state.json"
+PEER_DATA_FILENAME = "data.json"
+OPEN = datetime.max
+
+
+class SyncError(ValueError):
+    """Raised when a sync cannot be carried out."""
+
+
+@dataclass
+class SyncResult:
+    """What a sync changed."""
+
+    days: int = 0
+    pulled: int = 0
+    pushed: int = 0
+    merged: int = 0
+
+    @property
+    def unchanged(self) -> int:
+        """Days identical on both sides."""
+        return self.days - self.pulled - self.pushed - self.merged
+
+
+def merge_days(a: Day, b: Day) -> Day:
+    """Merge two versions of the same day; the result does not depend on argument order.
+
+    Spans are deduplicated and taken in order of (start, end, task). Where spans
+    of the same task overlap they are joined; where a span starts inside one of
+    a different task, the later start wins: the earlier span is cut at that
+    point and resumes after the later span ends, if it ran longer. Only the
+    latest open span can stay open. The day is still active if either side is.
+    """
+    # (start, end, task) with open spans ending at OPEN, so tuples order like spans.
+    heap = sorted({(span.start, span.end or OPEN, span.task) for span in [*a.spans, *b.spans]})
+    merged: list[list] = []
+    while heap:
+        start, end, task = heapq.heappop(heap)
+        if not merged or start >= merged[-1][1]:
+            merged.append([start, end, task])
+            continue
+        previous = merged[-1]
+        if previous[2] == task:
+            previous[1] = max(previous[1], end)
+            continue
+        if previous[1] > end:
+            heapq.heappush(heap, (end, previous[1], previous[2]))
+        previous[1] = start
+        if previous[1] == previous[0]:
+            merged.pop()
+        merged.append([start, end, task])
+
+    spans = [Span(task, start, None if end == OPEN else end) for start, end, task in merged]
+    starts = [day.start_time for day in (a, b) if day.start_time is not None]
+    active = a.is_active or b.is_active or any(span.end is None for span in spans)
+    ends = [day.end_time for day in (a, b) if day.end_time is not None]
+    end_time = None if active or not ends else max(ends)
+    if spans and spans[-1].end is None:
+        current_task = spans[-1].task
+    elif end_time is not None and spans:
+        # A stopped day keeps its last task, as Tracker.stop leaves it.
+        current_task = spans[-1].task
+    else:
+        current_task = None
+
+    return Day(
+        date=a.date,
+        start_time=min(starts) if starts else None,
+        end_time=end_time,
+        current_task=current_task,
+        spans=spans,
+    )
+
+
+def peer_data_file(path: Path) -> Path:
+    """Resolve a peer given as a data directory or a data file."""
+    return path / PEER_DATA_FILENAME if path.is_dir() else path
+
+
+def sync(local: Storage, remote: Storage, dry_run: bool = False) -> SyncResult:
+    """Bring ``local`` and ``remote`` to the same content, transferring only differing days.
+
+    Args:
+        local: This machine's storage (holds the sync state)
+        remote: The other machine's storage, e.g. on a mounted directory
+        dry_run: Count what would change without writing anything
+
+    Returns:
+        SyncResult with the number of days pulled, pushed and merged
+
+    Raises:
+        SyncError: If both storages use the same data file
+    """
+    if os.path.realpath(local.data_file) == os.path.realpath(remote.data_file):
+        raise SyncError(f"{remote.data_file} is the local data file")
+
+    state_file = local.data_file.with_name(STATE_FILENAME)
+    peer = os.path.realpath(remote.data_file)
+
+    # Both stores stay locked from the snapshots to the saves, so a switch-to on
+    # either side cannot be overwritten by the merged result. Locks are taken in
+    # path order, so syncs started from both sides at once cannot deadlock.
+    first, second = sorted((local, remote), key=lambda s: os.path.realpath(s.lock_file))
+    with first.lock(), second.lock():
+        states = _load_state(state_file)
+        base: dict[str, str] = states.get(peer, {})
+        result = SyncResult()
+        hashes: dict[str, str] = {}
+        to_local: dict[str, str] = {}
+        to_remote: dict[str, str] = {}
+        # (before, merged) pairs per side, to move notes off spans the merge cut.
+        local_merges: list[tuple[Day, Day]] = []
+        remote_merges: list[tuple[Day, Day]] = []
+        with local.snapshot() as mine, remote.snapshot() as theirs:
+            for date, ours, other in _pair_by_date(mine.iter_lines(), theirs.iter_lines()):
+                result.days += 1
+                ours_hash = content_hash(ours) if ours is not None else None
+                other_hash = content_hash(other) if other is not None else None
+                if ours_hash == other_hash:
+                    hashes[date] = ours_hash
+                    continue
+                if other is not None and (ours is None or ours_hash == base.get(date)):
+                    to_local[date] = other
+                    result.pulled += 1
+                elif ours is not None and (other is None or other_hash == base.get(date)):
+                    to_remote[date] = ours
+                    result.pushed += 1
+                else:
+                    ours_day, other_day = mine._parse_line(ours), theirs._parse_line(other)
+                    merged = merge_days(ours_day, other_day)
+                    local_merges.append((ours_day, merged))
+                    remote_merges.append((other_day, merged))
+                    to_local[date] = to_remote[date] = encode_record(local._day_to_dict(merged))
+                    result.merged += 1
+                hashes[date] = content_hash(to_local.get(date) or to_remote[date])
+
+        if dry_run:
+            return result
+
+        remote.save_lines(to_remote)
+        local.save_lines(to_local)
+        NoteStore(remote.notes_file).carry_over(remote_merges)
+        NoteStore(local.notes_file).carry_over(local_merges)
+        states[peer] = hashes
+        atomic_write(state_file, lambda f: json.dump(states, f, separators=(",", ":")))
+        return result
+
+
+def _pair_by_date(
+    left: Iterator[tuple[str, str]], right: Iterator[tuple[str, str]]
+) -> Iterator[tuple[str, str | None, str | None]]:
+    """Join two date-ordered record streams into (date, left line, right line)."""
+    done = ("\uffff", "")
+    a, b = next(left, done), next(right, done)
+    while a is not done or b is not done:
+        if a[0] == b[0]:
+            yield a[0], a[1], b[1]
+            a, b = next(left, done), next(right, done)
+        elif a[0] < b[0]:
+            yield a[0], a[1], None
+            a = next(left, done)
+        else:
+            yield b[0], None, b[1]
+            b = next(right, done)
+
+
+def _load_state(path: Path) -> dict[str, dict[str, str]]:
+    try:
+        with open(path) as f:
+            states = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return states if isinstance(states, dict) else {}
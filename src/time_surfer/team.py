@@ -0,0 +1,139 @@
+"""Team rollups across many users' data files."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from time_surfer.cache import ReportCache
+from time_surfer.storage import CorruptDataError, Storage, UnsupportedSchemaError
+from time_surfer.tracker import Tracker
+
+
+@dataclass
+class TeamReport:
+    """Aggregated task times for a team, with the per-user breakdown.
+
+    Users whose data file could not be read are left out of the totals and
+    listed in ``failed_users`` with the reason.
+    """
+
+    user_totals: dict[str, dict[str, float]]
+    failed_users: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def task_totals(self) -> dict[str, float]:
+        """Total seconds per task across all users."""
+        return merge_task_totals(self.user_totals.values())
+
+
+def discover_data_files(data_dir: Path) -> dict[str, Path]:
+    """Find per-user data files in a directory.
+
+    Both ``<data_dir>/<user>.json`` and ``<data_dir>/<user>/data.json`` layouts
+    are recognised.
+
+    Returns:
+        Dict mapping user name to data file, ordered by user name
+    """
+    files: dict[str, Path] = {}
+    for path in data_dir.iterdir():
+        if path.is_file() and path.suffix == ".json":
+            files[path.stem] = path
+        elif path.is_dir() and (path / "data.json").is_file():
+            files[path.name] = path / "data.json"
+    return dict(sorted(files.items()))
+
+
+def aggregate_data_file(
+    data_file: Path, start_date: str, end_date: str, cache_dir: Path | None = None
+) -> dict[str, float]:
+    """Aggregate closed-span task times in one data file over a date range.
+
+    With ``cache_dir``, per-day rollups from the report cache are reused for
+    days whose content has not changed.
+    """
+    storage = Storage(data_file)
+    if cache_dir is not None:
+        return ReportCache(cache_dir).closed_totals(storage, start_date, end_date)
+    tracker = Tracker(storage)
+    totals: dict[str, float] = {}
+    with storage.snapshot() as snapshot:
+        for day in snapshot.iter_days(start_date, end_date):
+            for task, seconds in tracker._aggregate_task_times(day.spans).items():
+                totals[task] = totals.get(task, 0.0) + seconds
+    return totals
+
+
+def _aggregate_user(
+    data_file: Path, start_date: str, end_date: str, cache_dir: Path | None
+) -> tuple[dict[str, float] | None, str | None]:
+    """Run aggregate_data_file, returning (totals, None) or (None, error)."""
+    try:
+        return aggregate_data_file(data_file, start_date, end_date, cache_dir), None
+    except (CorruptDataError, UnsupportedSchemaError) as e:
+        return None, str(e)
+    except (OSError, UnicodeDecodeError) as e:
+        return None, f"cannot read {data_file}: {e}"
+    except (KeyError, TypeError, ValueError) as e:
+        return None, f"invalid day record in {data_file}: {e!r}"
+
+
+def merge_task_totals(partials) -> dict[str, float]:
+    """Merge several task_totals dicts into one."""
+    merged: dict[str, float] = {}
+    for totals in partials:
+        for task, seconds in totals.items():
+            merged[task] = merged.get(task, 0.0) + seconds
+    return merged
+
+
+def build_team_report(
+    data_dir: Path,
+    start_date: str,
+    end_date: str,
+    max_workers: int | None = None,
+    cache_dir: Path | None = None,
+) -> TeamReport:
+    """Aggregate every user's data file in parallel.
+
+    Each file is parsed and aggregated in its own worker process; only the small
+    per-user task_totals dicts are sent back and merged. A file that cannot be
+    read or parsed fails only its own user, who is listed in ``failed_users``.
+
+    Args:
+        data_dir: Directory containing per-user data files
+        start_date: First date to include (YYYY-MM-DD)
+        end_date: Last date to include (YYYY-MM-DD)
+        max_workers: Worker processes (default: one per CPU; 1 runs inline)
+        cache_dir: Report cache directory for per-day rollups (default: no cache)
+
+    Returns:
+        TeamReport with per-user totals and the users that failed
+    """
+    files = discover_data_files(data_dir)
+    users = list(files)
+    paths = [files[user] for user in users]
+    starts = [start_date] * len(paths)
+    ends = [end_date] * len(paths)
+    cache_dirs = [cache_dir] * len(paths)
+
+    if max_workers == 1 or len(paths) <= 1:
+        results = list(map(_aggregate_user, paths, starts, ends, cache_dirs))
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _aggregate_user, paths, starts, ends, cache_dirs, chunksize=chunksize
+                )
+            )
+
+    report = TeamReport(user_totals={})
+    for user, (totals, error) in zip(users, results):
+        if error is None:
+            report.user_totals[user] = totals
+        else:
+            report.failed_users[user] = error
+    return report
@@ -0,0 +1,159 @@
+"""Thread-safe tracking for long-lived services that embed the library.
+
+``CachingStorage`` keeps recently used days in an in-process LRU cache, so
+repeated lookups cost a ``stat`` of the data file and a copy of the cached Day
+instead of reading and parsing the file. Writes go through to disk and update
+the cache; changes made by other processes are detected by the data file's
+(inode, size, mtime) fingerprint, which clears the cache.
+
+Each date has its own lock: a cache miss reading one day never blocks lookups
+of another, and ``ThreadSafeTracker`` holds the lock for the current day across
+load, transition and save so concurrent switches cannot lose updates.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from time_surfer.budgets import BudgetChecker
+from time_surfer.cache import ReportCache
+from time_surfer.metrics import TimedLock
+from time_surfer.models import Day, TrackerResult
+from time_surfer.storage import Storage
+from time_surfer.tracker import Tracker
+
+DEFAULT_MAX_CACHED_DAYS = 128
+
+
+def _copy_day(day: Day | None) -> Day | None:
+    """Copy a day deeply enough that callers may mutate it and its spans."""
+    if day is None:
+        return None
+    return Day(
+        date=day.date,
+        start_time=day.start_time,
+        end_time=day.end_time,
+        current_task=day.current_task,
+        spans=[copy.copy(span) for span in day.spans],
+    )
+
+
+class CachingStorage(Storage):
+    """Storage with a write-through LRU cache of Day objects."""
+
+    def __init__(
+        self,
+        data_file: Path | None = None,
+        max_cached_days: int = DEFAULT_MAX_CACHED_DAYS,
+        **kwargs,
+    ):
+        super().__init__(data_file, **kwargs)
+        self.max_cached_days = max_cached_days
+        self._days: OrderedDict[str, Day | None] = OrderedDict()
+        self._cached_fingerprint: tuple | None = None
+        # Guards _days, _cached_fingerprint and _day_locks; never held during I/O.
+        self._cache_lock = threading.Lock()
+        self._day_locks: dict[str, TimedLock] = {}
+
+    def day_lock(self, date: str) -> TimedLock:
+        """Return the (reentrant) lock serialising access to one date."""
+        with self._cache_lock:
+            lock = self._day_locks.get(date)
+            if lock is None:
+                lock = self._day_locks[date] = TimedLock("day")
+            return lock
+
+    def load_day(self, date: str) -> Day | None:
+        fingerprint = self.fingerprint()
+        hit, day = self._lookup(date, fingerprint)
+        if hit:
+            return _copy_day(day)
+
+        with self.day_lock(date):
+            hit, day = self._lookup(date, fingerprint)
+            if hit:
+                return _copy_day(day)
+            day = super().load_day(date)
+            with self._cache_lock:
+                # Only cache what was read if no write happened meanwhile.
+                if self._cached_fingerprint == fingerprint:
+                    self._store(date, day)
+            return _copy_day(day)
+
+    def save_day(self, day: Day) -> None:
+        with self.day_lock(day.date):
+            before = self.fingerprint()
+            super().save_day(day)
+            after = self.fingerprint()
+            with self._cache_lock:
+                if before != self._cached_fingerprint:
+                    # The file changed since it was cached (another process or
+                    # a concurrent write); other cached days may be stale.
+                    self._days.clear()
+                self._cached_fingerprint = after
+                self._store(day.date, _copy_day(day))
+
+    def clear_cache(self) -> None:
+        """Drop every cached day."""
+        with self._cache_lock:
+            self._days.clear()
+
+    def _lookup(self, date: str, fingerprint: tuple | None) -> tuple[bool, Day | None]:
+        with self._cache_lock:
+            if fingerprint != self._cached_fingerprint:
+                self._days.clear()
+                self._cached_fingerprint = fingerprint
+                return False, None
+            if date not in self._days:
+                return False, None
+            self._days.move_to_end(date)
+            return True, self._days[date]
+
+    def _store(self, date: str, day: Day | None) -> None:
+        self._days[date] = day
+        self._days.move_to_end(date)
+        while len(self._days) > self.max_cached_days:
+            self._days.popitem(last=False)
+
+
+class ThreadSafeTracker(Tracker):
+    """Tracker safe to share between threads, backed by CachingStorage.
+
+    Operations on the current day are serialised by that day's lock. Reads work
+    on private copies, and reads served from the cache take no day lock, so
+    they do not wait for a switch that is rewriting the file.
+    """
+
+    def __init__(
+        self,
+        storage: CachingStorage | None = None,
+        cache: ReportCache | None = None,
+        budgets: BudgetChecker | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ):
+        super().__init__(storage or CachingStorage(), cache=cache, budgets=budgets, clock=clock)
+
+    @contextmanager
+    def _today_locked(self) -> Iterator[None]:
+        with self.storage.day_lock(self._now().strftime("%Y-%m-%d")):
+            yield
+
+    def start(self) -> TrackerResult:
+        with self._today_locked():
+            return super().start()
+
+    def stop(self) -> TrackerResult:
+        with self._today_locked():
+            return super().stop()
+
+    def switch_to(self, task: str, at: datetime | None = None) -> TrackerResult:
+        with self._today_locked():
+            return super().switch_to(task, at)
+
+    def pause(self, at: datetime | None = None) -> TrackerResult:
+        with self._today_locked():
+            return super().pause(at)
@@ -0,0 +1,102 @@
+"""Overlap- and gap-aware timeline of a day's spans.
+
+Summing span durations double-counts time when spans overlap (manual edits,
+imports, concurrent timers), so ``total - sum(task_totals)`` stops being the
+untracked time. A sweep over the sorted span boundaries instead yields, in
+O(n log n), the exact union of tracked time, the time covered by two or more
+spans, the gaps, and each task's share of tracked time: while k spans run
+concurrently each is attributed 1/k of the elapsed time, so attributed shares
+and untracked time always add up to the window.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from time_surfer.models import Day, Span
+
+
+@dataclass
+class Timeline:
+    """Exact time accounting for a window of spans."""
+
+    start: datetime
+    end: datetime
+    tracked_seconds: float = 0.0
+    overlapped_seconds: float = 0.0
+    gaps: list[tuple[datetime, datetime]] = field(default_factory=list)
+    attributed: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def window_seconds(self) -> float:
+        """Length of the window in seconds."""
+        return (self.end - self.start).total_seconds()
+
+    @property
+    def untracked_seconds(self) -> float:
+        """Time in the window not covered by any span."""
+        return sum((end - start).total_seconds() for start, end in self.gaps)
+
+
+def build_timeline(
+    spans: list[Span], start: datetime, end: datetime, now: datetime | None = None
+) -> Timeline:
+    """Sweep spans clipped to ``[start, end]`` into a Timeline.
+
+    Args:
+        spans: Spans in any order, possibly overlapping
+        start: Start of the window
+        end: End of the window
+        now: End for open spans (default ``end``)
+
+    Returns:
+        Timeline for the window
+    """
+    timeline = Timeline(start=start, end=end)
+    open_end = now or end
+
+    # (time, +1/-1, task); ends sort before starts at the same instant so
+    # back-to-back spans are not counted as overlapping.
+    events: list[tuple[datetime, int, str]] = []
+    for span in spans:
+        span_start = max(span.start, start)
+        span_end = min(span.end or open_end, end)
+        if span_end <= span_start:
+            continue
+        events.append((span_start, 1, span.task))
+        events.append((span_end, -1, span.task))
+        timeline.attributed.setdefault(span.task, 0.0)
+    events.sort()
+
+    active: dict[str, int] = {}
+    running = 0
+    cursor = start
+    for when, delta, task in events:
+        if when > cursor:
+            seconds = (when - cursor).total_seconds()
+            if running == 0:
+                timeline.gaps.append((cursor, when))
+            else:
+                timeline.tracked_seconds += seconds
+                if running > 1:
+                    timeline.overlapped_seconds += seconds
+                for active_task, count in active.items():
+                    timeline.attributed[active_task] += seconds * count / running
+            cursor = when
+
+        running += delta
+        count = active.get(task, 0) + delta
+        if count:
+            active[task] = count
+        else:
+            del active[task]
+
+    if end > cursor:
+        timeline.gaps.append((cursor, end))
+    return timeline
+
+
+def day_timeline(day: Day, now: datetime) -> Timeline | None:
+    """Timeline of a day from its start to its end (or ``now`` while active)."""
+    if day.start_time is None:
+        return None
+    return build_timeline(day.spans, day.start_time, day.end_time or now, now=now)
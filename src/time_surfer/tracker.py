@@ -1,28 +1,61 @@
 """Business logic for time tracking operations."""
 
+from collections.abc import Callable
 from datetime import datetime
 
+from time_surfer.budgets import BudgetChecker
+from time_surfer.cache import ReportCache
 from time_surfer.models import Day, Span, TrackerResult
 from time_surfer.storage import Storage
 
 
 class Tracker:
-    """Handles time tracking operations."""
-
-    def __init__(self, storage: Storage | None = None):
+    """Handles time tracking operations.
+
+    With a ``cache``, reports are served from the persistent report cache while
+    the data file is unchanged (see time_surfer.cache). With ``budgets``,
+    switch_to, get_status and get_report_data add a warning for every exceeded
+    budget (see time_surfer.budgets). ``clock`` replaces ``datetime.now``, e.g.
+    to replay accelerated time.
+
+    Changes (start, stop, switch_to, pause) run under ``Storage.lock`` and read
+    the clock once holding it, so concurrent processes never lose each other's
+    updates and see time move forward.
+    """
+
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        cache: ReportCache | None = None,
+        budgets: BudgetChecker | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ):
         self.storage = storage or Storage()
+        self.cache = cache
+        self.budgets = budgets
+        self.clock = clock
+
+    def _now(self) -> datetime:
+        """Return the current time from the clock."""
+        return self.clock() if self.clock is not None else datetime.now()
 
     def start(self) -> TrackerResult:
         """Start tracking for the current day."""
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
+        with self.storage.lock():
+            now = self._now()
+            existing_day = self.storage.load_day(now.strftime("%Y-%m-%d"))
+
+            result = self._start(existing_day, now)
+            if result.success:
+                self._save(result.day)
+        return result
 
-        existing_day = self.storage.load_day(date_str)
+    def _start(self, existing_day: Day | None, now: datetime) -> TrackerResult:
+        """Apply a start at ``now`` to the stored day, without persisting it."""
         if existing_day and existing_day.is_active:
             return TrackerResult(success=False, message="Day already started")
 
-        day = Day(date=date_str, start_time=now)
-        self.storage.save_day(day)
+        day = self._restart(existing_day, now)
 
         time_str = now.strftime("%H:%M")
         return TrackerResult(
@@ -31,12 +64,30 @@ class Tracker:
             day=day,
         )
 
+    def _restart(self, day: Day | None, now: datetime) -> Day:
+        """Return the day started (again) at ``now``.
+
+        A stopped day keeps its spans, such as earlier tracking or imported
+        calendar events, and is simply reopened.
+        """
+        if day is None:
+            return Day(date=now.strftime("%Y-%m-%d"), start_time=now)
+        start = min(day.start_time, now) if day.start_time is not None else now
+        return Day(date=day.date, start_time=start, spans=day.spans)
+
     def stop(self) -> TrackerResult:
         """Stop tracking for the current day."""
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
+        with self.storage.lock():
+            now = self._now()
+            day = self.storage.load_day(now.strftime("%Y-%m-%d"))
 
-        day = self.storage.load_day(date_str)
+            result = self._stop(day, now)
+            if result.success:
+                self._save(result.day)
+        return result
+
+    def _stop(self, day: Day | None, now: datetime) -> TrackerResult:
+        """Apply a stop at ``now`` to the stored day, without persisting it."""
         if not day or not day.is_active:
             return TrackerResult(success=False, message="Day not started")
 
@@ -46,7 +97,6 @@ class Tracker:
                 span.end = now
 
         day.end_time = now
-        self.storage.save_day(day)
 
         time_str = now.strftime("%H:%M")
         task_totals = self._aggregate_task_times(day.spans) if day.spans else {}
@@ -71,12 +121,72 @@ class Tracker:
                 totals[span.task] = duration
         return totals
 
+    def pause(self, at: datetime | None = None) -> TrackerResult:
+        """Close the open span without stopping the day.
+
+        Time until the next switch is reported as untracked. ``at`` backdates
+        the pause, as for ``switch_to``.
+        """
+        with self.storage.lock():
+            now = self._now()
+            day = self.storage.load_day(now.strftime("%Y-%m-%d"))
+            if at is not None:
+                now = self._clamp_to_day(day, at)
+
+            result = self._pause(day, now)
+            if result.success:
+                self._save(result.day)
+        return result
+
+    def _pause(self, day: Day | None, now: datetime) -> TrackerResult:
+        """Apply a pause at ``now`` to the stored day, without persisting it."""
+        if not day or not day.is_active:
+            return TrackerResult(success=False, message="Day not started")
+        if day.current_task is None:
+            return TrackerResult(success=False, message="No task to pause", day=day)
+
+        task = day.current_task
+        for span in day.spans:
+            if span.end is None:
+                span.end = now
+        day.current_task = None
+
+        time_str = now.strftime("%H:%M")
+        return TrackerResult(
+            success=True,
+            message=f"Paused '{task}' at {time_str}",
+            day=day,
+        )
+
+    def _save(self, day: Day) -> None:
+        """Persist a changed day and refresh the prompt status and budget ledger."""
+        before = self.storage.fingerprint() if self.budgets is not None else None
+        self.storage.save_day(day)
+        self.storage.save_status(day)
+        if self.budgets is not None:
+            self.budgets.record(day, before)
+
+    def _check_budgets(self, result: TrackerResult) -> TrackerResult:
+        """Attach warnings for exceeded budgets to a successful result."""
+        if self.budgets is not None and result.success:
+            result.warnings = self.budgets.check(result.day, self._now())
+        return result
+
+    def _clamp_to_day(self, day: Day | None, at: datetime) -> datetime:
+        """Keep a backdated time from preceding the day's latest recorded event."""
+        if not day or not day.is_active:
+            return at
+        floor = max([day.start_time] + [span.start for span in day.spans])
+        return max(at, floor)
+
     def get_current_day(self) -> Day | None:
         """Get the current active day, if any."""
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
+        now = self._now()
+        day = self.storage.load_day(now.strftime("%Y-%m-%d"))
+        return self._current_day(day)
 
-        day = self.storage.load_day(date_str)
+    def _current_day(self, day: Day | None) -> Day | None:
+        """Return the day if it is active."""
         if day and day.is_active:
             return day
         return None
@@ -87,10 +197,16 @@ class Tracker:
         Returns aggregated task times including any open span up to now.
         Works for both active and stopped days.
         """
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-
-        day = self.storage.load_day(date_str)
+        now = self._now()
+        date = now.strftime("%Y-%m-%d")
+        if self.cache is not None:
+            result = self.cache.get_report(self.storage, date, now, self._report)
+        else:
+            result = self._report(self.storage.load_day(date), now)
+        return self._check_budgets(result)
+
+    def _report(self, day: Day | None, now: datetime) -> TrackerResult:
+        """Build report data for the stored day as of ``now``."""
         if not day or day.start_time is None:
             return TrackerResult(success=False, message="Day not started")
 
@@ -104,6 +220,26 @@ class Tracker:
             task_totals=task_totals,
         )
 
+    def get_status(self) -> TrackerResult:
+        """Get the current status: active task and task times so far."""
+        now = self._now()
+        day = self.storage.load_day(now.strftime("%Y-%m-%d"))
+        return self._check_budgets(self._status(day, now))
+
+    def _status(self, day: Day | None, now: datetime) -> TrackerResult:
+        """Build status for the stored day as of ``now``."""
+        result = self._report(day, now)
+        if not result.success:
+            return result
+
+        if not day.is_active:
+            result.message = f"Stopped tracking at {day.end_time.strftime('%H:%M')}"
+        elif day.current_task is not None:
+            result.message = f"Working on '{day.current_task}'"
+        else:
+            result.message = "Tracking, no task selected"
+        return result
+
     def _aggregate_task_times_with_open(
         self, spans: list, now: datetime
     ) -> dict[str, float]:
@@ -118,16 +254,34 @@ class Tracker:
                 totals[span.task] = duration
         return totals
 
-    def switch_to(self, task: str) -> TrackerResult:
-        """Switch to a new task, implicitly starting the day if needed."""
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-
-        day = self.storage.load_day(date_str)
+    def switch_to(self, task: str, at: datetime | None = None) -> TrackerResult:
+        """Switch to a new task, implicitly starting the day if needed.
 
+        ``at`` backdates the switch (e.g. to when the user went idle); it is
+        never placed before the start of the span being closed.
+        """
+        with self.storage.lock():
+            now = self._now()
+            day = self.storage.load_day(now.strftime("%Y-%m-%d"))
+            if at is not None:
+                now = self._clamp_to_day(day, at)
+
+            result, changed = self._switch_to(day, task, now)
+            if changed:
+                self._save(result.day)
+                self.storage.record_task_use(task, now)
+        return self._check_budgets(result)
+
+    def _switch_to(
+        self, day: Day | None, task: str, now: datetime
+    ) -> tuple[TrackerResult, bool]:
+        """Apply a switch at ``now`` to the stored day, without persisting it.
+
+        Returns the result and whether the day was changed and needs saving.
+        """
         # Implicitly start if not active
         if not day or not day.is_active:
-            day = Day(date=date_str, start_time=now)
+            day = self._restart(day, now)
 
         # No-op if same task
         if day.current_task == task:
@@ -135,7 +289,7 @@ class Tracker:
                 success=True,
                 message=f"Already working on '{task}'",
                 day=day,
-            )
+            ), False
 
         # Close current span if exists
         if day.current_task is not None:
@@ -149,11 +303,9 @@ class Tracker:
         day.spans.append(new_span)
         day.current_task = task
 
-        self.storage.save_day(day)
-
         time_str = now.strftime("%H:%M")
         return TrackerResult(
             success=True,
             message=f"Switched to '{task}' at {time_str}",
             day=day,
-        )
+        ), True
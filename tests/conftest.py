@@ -15,3 +15,19 @@ def temp_data_dir(tmp_path):
 def temp_data_file(temp_data_dir):
     """Provide a temporary data file path."""
     return temp_data_dir / "data.json"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the persistent report cache out of the user's home directory."""
+    cache_home = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home / "time-surfer"
+
+
+@pytest.fixture(autouse=True)
+def isolated_config_dir(tmp_path_factory, monkeypatch):
+    """Ignore any real user configuration; tests write their own config here."""
+    config_home = tmp_path_factory.mktemp("config")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(config_home))
+    return config_home / "time-surfer"
@@ -0,0 +1,181 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import fcntl
+import threading
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from time_surfer.aio import AsyncStorage, AsyncTracker
+from time_surfer.models import Day
+from time_surfer.storage import Storage
+from time_surfer.tracker import Tracker
+
+
+class TestAsyncStorage:
+    def test_save_and_load_day(self, temp_data_file):
+        async def scenario():
+            storage = AsyncStorage(Storage(temp_data_file))
+            await storage.save_day(Day(date="2026-01-30", start_time=datetime(2026, 1, 30, 9, 0)))
+            return await storage.load_day("2026-01-30")
+
+        loaded = asyncio.run(scenario())
+        assert loaded.start_time == datetime(2026, 1, 30, 9, 0)
+
+    def test_load_nonexistent_day_returns_none(self, temp_data_file):
+        loaded = asyncio.run(AsyncStorage(Storage(temp_data_file)).load_day("2026-01-30"))
+        assert loaded is None
+
+    def test_concurrent_loads_of_same_day_are_coalesced(self, temp_data_file):
+        sync_storage = Storage(temp_data_file)
+        sync_storage.save_day(Day(date="2026-01-30", start_time=datetime(2026, 1, 30, 9, 0)))
+
+        async def scenario():
+            storage = AsyncStorage(sync_storage)
+            with patch.object(sync_storage, "load_day", wraps=sync_storage.load_day) as spy:
+                days = await asyncio.gather(*(storage.load_day("2026-01-30") for _ in range(10)))
+            return spy.call_count, days
+
+        call_count, days = asyncio.run(scenario())
+        assert call_count == 1
+        assert all(day.date == "2026-01-30" for day in days)
+        # Each caller gets an independent copy
+        assert len({id(day) for day in days}) == 10
+
+    def test_load_after_save_is_not_served_stale(self, temp_data_file):
+        async def scenario():
+            storage = AsyncStorage(Storage(temp_data_file))
+            await storage.save_day(Day(date="2026-01-30", start_time=datetime(2026, 1, 30, 9, 0)))
+            await storage.load_day("2026-01-30")
+            await storage.save_day(
+                Day(
+                    date="2026-01-30",
+                    start_time=datetime(2026, 1, 30, 9, 0),
+                    end_time=datetime(2026, 1, 30, 17, 0),
+                )
+            )
+            return await storage.load_day("2026-01-30")
+
+        assert asyncio.run(scenario()).end_time == datetime(2026, 1, 30, 17, 0)
+
+
+class TestAsyncTracker:
+    def test_switch_to_report_and_stop(self, temp_data_file):
+        clock = Mock(return_value=datetime(2026, 1, 30, 9, 0, 0))
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(Storage(temp_data_file)), clock=clock)
+            switched = await tracker.switch_to("coding")
+            clock.return_value = datetime(2026, 1, 30, 10, 0, 0)
+            report = await tracker.get_report_data()
+            stopped = await tracker.stop()
+            return switched, report, stopped
+
+        switched, report, stopped = asyncio.run(scenario())
+
+        assert switched.message == "Switched to 'coding' at 09:00"
+        assert report.task_totals == {"coding": 3600.0}
+        assert stopped.task_totals == {"coding": 3600.0}
+
+    def test_start_fails_when_already_started(self, temp_data_file):
+        clock = Mock(return_value=datetime(2026, 1, 30, 9, 0, 0))
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(Storage(temp_data_file)), clock=clock)
+            await tracker.start()
+            return await tracker.start()
+
+        result = asyncio.run(scenario())
+
+        assert result.success is False
+        assert result.message == "Day already started"
+
+    def test_concurrent_switches_are_serialised(self, temp_data_file):
+        clock = Mock(return_value=datetime(2026, 1, 30, 9, 0, 0))
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(Storage(temp_data_file)), clock=clock)
+            await asyncio.gather(*(tracker.switch_to(f"task-{i}") for i in range(5)))
+            return await tracker.get_current_day()
+
+        day = asyncio.run(scenario())
+
+        assert len(day.spans) == 5
+        assert sum(1 for span in day.spans if span.end is None) == 1
+
+    def test_changes_hold_the_storage_lock_and_keep_other_writers(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        save_day = storage.save_day
+
+        def locked_save_day(day):
+            with open(storage.lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            save_day(day)
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(storage))
+            await tracker.switch_to("coding")
+            # Another process (e.g. a git hook) switches in between.
+            Tracker(Storage(temp_data_file)).switch_to("review")
+            await tracker.switch_to("email")
+            return await tracker.get_current_day()
+
+        with patch.object(storage, "save_day", side_effect=locked_save_day):
+            day = asyncio.run(scenario())
+
+        assert [span.task for span in day.spans] == ["coding", "review", "email"]
+
+    def test_concurrent_reads_share_one_load(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        clock = Mock(return_value=datetime(2026, 1, 30, 9, 0, 0))
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(storage), clock=clock)
+            await tracker.switch_to("coding")
+            with patch.object(storage, "load_day", wraps=storage.load_day) as load_day:
+                results = await asyncio.gather(
+                    tracker.get_status(), tracker.get_report_data(), tracker.get_current_day()
+                )
+            return results, load_day.call_count
+
+        (status, report, day), loads = asyncio.run(scenario())
+
+        assert loads == 1
+        assert status.message == "Working on 'coding'"
+        assert report.success and day.current_task == "coding"
+
+    def test_reads_after_a_change_do_not_share_an_older_load(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        clock = Mock(return_value=datetime(2026, 1, 30, 9, 0, 0))
+        load_day, release, loads = storage.load_day, threading.Event(), []
+
+        def slow_first_load(date):
+            day = load_day(date)
+            loads.append(date)
+            if len(loads) == 1:
+                release.wait(timeout=5)
+            return day
+
+        async def scenario():
+            tracker = AsyncTracker(AsyncStorage(storage), clock=clock)
+            await tracker.switch_to("coding")
+            with patch.object(storage, "load_day", side_effect=slow_first_load):
+                before = asyncio.ensure_future(tracker.get_current_day())
+                await asyncio.sleep(0.05)  # Read "coding" and still in flight.
+                await tracker.switch_to("email")
+                after = asyncio.ensure_future(tracker.get_current_day())
+                await asyncio.sleep(0.05)
+                release.set()
+                return await before, await after
+
+        before, after = asyncio.run(scenario())
+
+        assert before.current_task == "coding"
+        assert after.current_task == "email"
+
+    def test_get_current_day_returns_none_when_not_started(self, temp_data_file):
+        tracker = AsyncTracker(AsyncStorage(Storage(temp_data_file)))
+        assert asyncio.run(tracker.get_current_day()) is None
@@ -0,0 +1,120 @@
+"""Tests for time budgets."""
+
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.budgets import BudgetChecker, BudgetLedger, week_start
+from time_surfer.config import Budget, Config
+from time_surfer.models import Day, Span
+from time_surfer.storage import Durability, Storage
+from time_surfer.tracker import Tracker
+
+CONFIG = Config(
+    budgets=[
+        Budget(name="email", daily=1800.0),
+        Budget(name="meetings", is_tag=True, weekly=3 * 3600.0),
+    ],
+    tags={"meetings": ["standup", "meeting*"]},
+)
+
+
+@pytest.fixture
+def mock_dt():
+    with patch("time_surfer.tracker.datetime") as mock_dt:
+        mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)  # a Friday
+        yield mock_dt
+
+
+@pytest.fixture
+def storage(temp_data_file):
+    return Storage(temp_data_file)
+
+
+def _tracker(storage, config=CONFIG):
+    return Tracker(storage, budgets=BudgetChecker(config, storage))
+
+
+def _closed_day(date, task, hours):
+    start = datetime.fromisoformat(f"{date}T09:00:00")
+    end = start.replace(hour=9 + hours)
+    return Day(date=date, start_time=start, end_time=end, spans=[Span(task, start, end)])
+
+
+class TestWeekStart:
+    def test_monday(self):
+        assert week_start("2026-01-30") == "2026-01-26"
+        assert week_start("2026-01-26") == "2026-01-26"
+        assert week_start("2026-02-01") == "2026-01-26"
+
+
+class TestBudgetChecker:
+    def test_daily_task_budget_counts_open_span(self, storage, mock_dt):
+        tracker = _tracker(storage)
+        assert tracker.switch_to("email").warnings == []
+
+        mock_dt.now.return_value = datetime(2026, 1, 30, 9, 45, 0)
+        result = tracker.get_status()
+
+        assert result.warnings == ["Budget exceeded for 'email': 0:45:00 of 0:30:00 today"]
+
+    def test_weekly_tag_budget_includes_earlier_days(self, storage, mock_dt):
+        storage.save_day(_closed_day("2026-01-27", "standup", 2))
+        storage.save_day(_closed_day("2026-01-19", "standup", 5))  # previous week
+        tracker = _tracker(storage)
+
+        tracker.switch_to("meeting: planning")
+        mock_dt.now.return_value = datetime(2026, 1, 30, 10, 30, 0)
+        result = tracker.switch_to("coding")
+
+        assert result.warnings == [
+            "Budget exceeded for tag 'meetings': 3:30:00 of 3:00:00 this week"
+        ]
+
+    def test_switches_update_ledger_incrementally(self, storage, mock_dt):
+        tracker = _tracker(storage)
+        tracker.switch_to("email")
+        mock_dt.now.return_value = datetime(2026, 1, 30, 9, 10, 0)
+        tracker.switch_to("coding")
+
+        with patch.object(storage, "iter_days", side_effect=AssertionError("re-aggregated")):
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 20, 0)
+            tracker.switch_to("email")
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 50, 0)
+            result = tracker.get_status()
+
+        assert result.warnings == ["Budget exceeded for 'email': 0:40:00 of 0:30:00 today"]
+        ledger = json.loads(storage.data_file.with_name("budgets.json").read_text())
+        assert ledger["week"] == "2026-01-26"
+        assert ledger["week_totals"] == {"email": 600.0, "coding": 600.0}
+
+    def test_out_of_band_changes_trigger_rebuild(self, storage, mock_dt):
+        tracker = _tracker(storage)
+        tracker.switch_to("coding")
+
+        # Another tool adds a day behind the tracker's back.
+        storage.save_day(_closed_day("2026-01-28", "standup", 4))
+
+        assert tracker.get_status().warnings == [
+            "Budget exceeded for tag 'meetings': 4:00:00 of 3:00:00 this week"
+        ]
+
+    def test_new_week_resets_totals(self, tmp_path):
+        ledger = BudgetLedger()
+        storage = Storage(tmp_path / "data.json", durability=Durability.MEMORY)
+        storage.save_day(_closed_day("2026-01-30", "email", 1))
+        ledger.rebuild(storage, "2026-01-30")
+        assert ledger.week_totals == {"email": 3600.0}
+
+        assert not ledger.is_current("2026-02-02", None)
+        ledger.rebuild(storage, "2026-02-02")
+        assert ledger.week_totals == {}
+
+    def test_no_budgets_means_no_ledger(self, storage, mock_dt):
+        tracker = _tracker(storage, Config())
+        tracker.switch_to("email")
+
+        assert tracker.get_status().warnings == []
+        assert not storage.data_file.with_name("budgets.json").exists()
@@ -0,0 +1,220 @@
+"""Tests for the persistent report cache."""
+
+import json
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.cache import ReportCache, default_cache_dir
+from time_surfer.models import Day, Span
+from time_surfer.storage import Durability, Storage
+from time_surfer.team import aggregate_data_file
+from time_surfer.tracker import Tracker
+
+NOW = datetime(2026, 1, 30, 12, 0, 0)
+
+
+@pytest.fixture
+def storage(temp_data_file):
+    return Storage(temp_data_file)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def mock_now():
+    with patch("time_surfer.tracker.datetime") as mock_dt:
+        mock_dt.now.return_value = NOW
+        yield mock_dt
+
+
+def _day(date, *spans):
+    return Day(date=date, start_time=spans[0].start, spans=list(spans))
+
+
+class TestDefaultCacheDir:
+    def test_honours_xdg_cache_home(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert default_cache_dir() == tmp_path / "time-surfer"
+
+
+class TestGetReport:
+    def _seed(self, storage):
+        storage.save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0),
+                current_task="review",
+                spans=[
+                    Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+                    Span("review", datetime(2026, 1, 30, 10, 0)),
+                ],
+            )
+        )
+
+    def test_matches_uncached_report(self, storage, cache, mock_now):
+        self._seed(storage)
+        expected = Tracker(storage).get_report_data()
+
+        first = Tracker(storage, cache=cache).get_report_data()
+        second = Tracker(storage, cache=cache).get_report_data()
+
+        for result in (first, second):
+            assert result.success
+            assert result.message == expected.message
+            assert result.task_totals == expected.task_totals
+            assert result.day == expected.day
+
+    def test_repeat_report_does_not_read_data_file(self, storage, cache, mock_now):
+        self._seed(storage)
+        tracker = Tracker(storage, cache=cache)
+        tracker.get_report_data()
+
+        with patch.object(storage, "iter_lines", side_effect=AssertionError("read")), \
+                patch.object(storage, "load_day", side_effect=AssertionError("read")):
+            result = tracker.get_report_data()
+
+        assert result.task_totals == {"coding": 3600.0, "review": 7200.0}
+
+    def test_open_span_advances_with_now(self, storage, cache, mock_now):
+        self._seed(storage)
+        tracker = Tracker(storage, cache=cache)
+        tracker.get_report_data()
+
+        mock_now.now.return_value = datetime(2026, 1, 30, 13, 0, 0)
+        assert tracker.get_report_data().task_totals["review"] == 3 * 3600.0
+
+    def test_write_invalidates(self, storage, cache, mock_now):
+        self._seed(storage)
+        tracker = Tracker(storage, cache=cache)
+        tracker.get_report_data()
+
+        tracker.switch_to("email")
+        mock_now.now.return_value = datetime(2026, 1, 30, 12, 30, 0)
+
+        assert tracker.get_report_data().task_totals == {
+            "coding": 3600.0,
+            "review": 7200.0,
+            "email": 1800.0,
+        }
+
+    def test_unchanged_content_survives_new_fingerprint(self, storage, cache, mock_now):
+        self._seed(storage)
+        tracker = Tracker(storage, cache=cache)
+        tracker.get_report_data()
+        os.utime(storage.data_file, ns=(0, 0))
+
+        with patch.object(storage, "_dict_to_day", wraps=storage._dict_to_day) as parse:
+            result = tracker.get_report_data()
+
+        assert result.task_totals["coding"] == 3600.0
+        assert parse.call_count == 1  # the cached record only; no aggregation
+
+    def test_missing_day(self, storage, cache, mock_now):
+        result = Tracker(storage, cache=cache).get_report_data()
+        result = Tracker(storage, cache=cache).get_report_data()
+
+        assert not result.success
+        assert result.message == "Day not started"
+
+    def test_memory_storage_bypasses_cache(self, temp_data_file, cache, mock_now):
+        storage = Storage(temp_data_file, durability=Durability.MEMORY)
+        self._seed(storage)
+
+        assert Tracker(storage, cache=cache).get_report_data().success
+        assert not (cache.cache_dir / "reports.json").exists()
+
+    def test_lru_cap(self, tmp_path, storage):
+        cache = ReportCache(tmp_path / "cache", max_reports=2)
+        tracker = Tracker(storage)
+        for date in ["2026-01-28", "2026-01-29", "2026-01-30"]:
+            cache.get_report(storage, date, NOW, tracker._report)
+
+        entries = json.loads((cache.cache_dir / "reports.json").read_text())
+        assert [key.rsplit("|", 1)[1] for key in entries] == ["2026-01-29", "2026-01-30"]
+
+    def test_corrupt_cache_is_rebuilt(self, storage, cache, mock_now):
+        self._seed(storage)
+        cache.cache_dir.mkdir(parents=True)
+        (cache.cache_dir / "reports.json").write_text("{not json")
+
+        assert Tracker(storage, cache=cache).get_report_data().success
+        assert json.loads((cache.cache_dir / "reports.json").read_text())
+
+
+class TestClosedTotals:
+    def test_rollups_skip_parsing_unchanged_days(self, storage, cache):
+        storage.save_day(
+            _day("2026-01-29", Span("coding", datetime(2026, 1, 29, 9), datetime(2026, 1, 29, 10)))
+        )
+        storage.save_day(
+            _day(
+                "2026-01-30",
+                Span("coding", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 9, 30)),
+                Span("email", datetime(2026, 1, 30, 9, 30)),
+            )
+        )
+        assert cache.closed_totals(storage) == {"coding": 5400.0}
+
+        with patch.object(storage, "_dict_to_day", side_effect=AssertionError("parsed")):
+            assert cache.closed_totals(storage, "2026-01-30") == {"coding": 1800.0}
+
+    def test_daily_totals_per_date(self, storage, cache):
+        storage.save_day(
+            _day("2026-01-29", Span("coding", datetime(2026, 1, 29, 9), datetime(2026, 1, 29, 10)))
+        )
+        storage.save_day(
+            _day("2026-01-30", Span("email", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 9, 6)))
+        )
+
+        assert cache.daily_totals(storage) == {
+            "2026-01-29": {"coding": 3600.0},
+            "2026-01-30": {"email": 360.0},
+        }
+        with patch.object(storage, "_dict_to_day", side_effect=AssertionError("parsed")):
+            assert cache.daily_totals(storage, "2026-01-30") == {"2026-01-30": {"email": 360.0}}
+
+    def test_team_aggregation_with_cache_matches(self, storage, tmp_path):
+        storage.save_day(
+            _day("2026-01-30", Span("coding", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 11)))
+        )
+        args = (storage.data_file, "2026-01-01", "2026-01-31")
+
+        assert aggregate_data_file(*args, cache_dir=tmp_path / "c") == aggregate_data_file(*args)
+        assert aggregate_data_file(*args, cache_dir=tmp_path / "c") == {"coding": 7200.0}
+
+
+class TestHeatmap:
+    def test_closed_days_are_binned_once(self, storage, cache):
+        # 2026-01-26 is a Monday.
+        storage.save_day(
+            _day("2026-01-26", Span("coding", datetime(2026, 1, 26, 9), datetime(2026, 1, 26, 10)))
+        )
+        storage.save_day(
+            _day(
+                "2026-01-27",
+                Span("coding", datetime(2026, 1, 27, 9), datetime(2026, 1, 27, 9, 30)),
+            )
+        )
+        first = cache.heatmap(storage, now=NOW)
+
+        with patch.object(storage, "_dict_to_day", side_effect=AssertionError("parsed")):
+            again = cache.heatmap(storage, now=NOW)
+
+        assert again == first
+        grid = again.grid("coding")
+        assert grid[36:40] == [900.0] * 4
+        assert grid[96 + 36:96 + 38] == [900.0] * 2
+        assert sum(grid) == 5400.0
+
+    def test_open_day_runs_to_now_and_is_not_cached(self, storage, cache):
+        storage.save_day(_day("2026-01-30", Span("email", datetime(2026, 1, 30, 11, 30))))
+
+        assert sum(cache.heatmap(storage, now=NOW).grid()) == 1800.0
+        later = datetime(2026, 1, 30, 12, 15)
+        assert sum(cache.heatmap(storage, now=later).grid()) == 2700.0
@@ -1,13 +1,16 @@
 """Tests for CLI commands."""
 
+import subprocess
 from datetime import datetime
 from unittest.mock import patch
 
 import pytest
 from typer.testing import CliRunner
 
-from time_surfer.cli import app
-from time_surfer.storage import Storage
+from time_surfer.cli import _complete_task, app
+from time_surfer.models import Day, Span
+from time_surfer.notes import span_id
+from time_surfer.storage import Durability, Storage
 
 
 runner = CliRunner()
@@ -195,3 +198,643 @@ class TestUntrackedTime:
 
         assert result.exit_code == 0
         assert "untracked" in result.output
+
+
+class TestCompactCommand:
+    def test_compact_dry_run_reports_savings(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            with patch("time_surfer.tracker.datetime") as mock_dt:
+                mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+                runner.invoke(app, ["switch-to", "coding"])
+                runner.invoke(app, ["switch-to", "email"])
+                mock_dt.now.return_value = datetime(2026, 1, 30, 10, 0, 0)
+                runner.invoke(app, ["switch-to", "coding"])
+            result = runner.invoke(app, ["compact", "--dry-run"])
+
+        assert result.exit_code == 0
+        assert "Would save 1 spans" in result.output
+
+    def test_compact_with_no_data(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["compact"])
+
+        assert result.exit_code == 0
+        assert "Nothing to compact" in result.output
+
+
+class TestTeamReportCommand:
+    def test_team_report_shows_totals_and_breakdown(self, tmp_path):
+        for user, task in [("alice", "coding"), ("bob", "review")]:
+            Storage(tmp_path / f"{user}.json").save_day(
+                Day(
+                    date="2026-01-30",
+                    start_time=datetime(2026, 1, 30, 9, 0, 0),
+                    end_time=datetime(2026, 1, 30, 10, 0, 0),
+                    spans=[Span(task, datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0))],
+                )
+            )
+
+        result = runner.invoke(
+            app, ["team-report", "--data-dir", str(tmp_path), "--from", "2026-01-30", "--workers", "1"]
+        )
+
+        assert result.exit_code == 0
+        assert "2 users" in result.output
+        assert "alice" in result.output
+        assert "review" in result.output
+        assert "2:00:00" in result.output
+
+    def test_team_report_skips_damaged_files(self, tmp_path):
+        (tmp_path / "carol.json").write_text('{"schema_version": 3}\n{"date":\n')
+        Storage(tmp_path / "alice.json").save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0, 0),
+                end_time=datetime(2026, 1, 30, 10, 0, 0),
+                spans=[Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0))],
+            )
+        )
+
+        result = runner.invoke(
+            app, ["team-report", "--data-dir", str(tmp_path), "--from", "2026-01-30"]
+        )
+
+        assert result.exit_code == 0
+        assert "skipped carol" in result.output
+        assert "1 users" in result.output
+
+    def test_team_report_fails_without_data_files(self, tmp_path):
+        result = runner.invoke(app, ["team-report", "--data-dir", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "No data files found" in result.output
+
+
+class TestShowCommand:
+    def test_show_displays_current_task_and_totals(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            with patch("time_surfer.tracker.datetime") as mock_dt:
+                with patch("time_surfer.cli.datetime") as mock_cli_dt:
+                    mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+                    runner.invoke(app, ["start"])
+                    mock_dt.now.return_value = datetime(2026, 1, 30, 9, 30, 0)
+                    runner.invoke(app, ["switch-to", "coding"])
+                    mock_dt.now.return_value = datetime(2026, 1, 30, 10, 0, 0)
+                    mock_cli_dt.now.return_value = datetime(2026, 1, 30, 10, 0, 0)
+                    result = runner.invoke(app, ["show"])
+
+        assert result.exit_code == 0
+        assert "Working on 'coding'" in result.output
+        assert "Time on current task: 0:30:00" in result.output
+        assert "Total time today: 1:00:00" in result.output
+
+    def test_show_fails_when_not_started(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["show"])
+
+        assert result.exit_code == 1
+        assert "Day not started" in result.output
+
+
+class TestStatsCommand:
+    def test_stats_shows_sessions_switches_and_distribution(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            with patch("time_surfer.tracker.datetime") as mock_dt:
+                mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+                runner.invoke(app, ["switch-to", "coding"])
+                mock_dt.now.return_value = datetime(2026, 1, 30, 10, 0, 0)
+                runner.invoke(app, ["switch-to", "email"])
+                mock_dt.now.return_value = datetime(2026, 1, 30, 10, 30, 0)
+                runner.invoke(app, ["stop"])
+            result = runner.invoke(app, ["stats", "--from", "2026-01-01", "--to", "2026-01-31"])
+
+        assert result.exit_code == 0
+        assert "coding" in result.output
+        assert "p50" in result.output
+        assert "Context switches: 1" in result.output
+        assert "Longest focus block: 1:00:00 on 'coding'" in result.output
+        assert "09:00" in result.output
+
+    def test_stats_without_data(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["stats"])
+
+        assert result.exit_code == 0
+        assert "No completed spans" in result.output
+
+
+class TestMigrateCommand:
+    def test_migrate_legacy_file(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text('{"2026-01-30": {"date": "2026-01-30", "start_time": null, "end_time": null}}')
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["migrate"])
+
+        assert result.exit_code == 0
+        assert "Migrated 1 days from schema version 1 to 3" in result.output
+
+    def test_migrate_current_file(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            MockStorage.return_value.save_day(Day(date="2026-01-30"))
+            result = runner.invoke(app, ["migrate"])
+
+        assert result.exit_code == 0
+        assert "already at schema version 3" in result.output
+
+
+class TestStorageConfig:
+    def test_configured_durability_is_used_for_writes(self, temp_data_file, isolated_config_dir):
+        isolated_config_dir.mkdir(parents=True, exist_ok=True)
+        config_file = isolated_config_dir / "config.yaml"
+        config_file.write_text("storage: {durability: strict, commit_max_events: 4}\n")
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["start"])
+
+        assert result.exit_code == 0
+        MockStorage.assert_any_call(
+            durability=Durability.STRICT, commit_interval_ms=1000, commit_max_events=4
+        )
+
+    def test_invalid_durability_is_an_error(self, isolated_config_dir):
+        isolated_config_dir.mkdir(parents=True, exist_ok=True)
+        config_file = isolated_config_dir / "config.yaml"
+        config_file.write_text("storage: {durability: sometimes}\n")
+
+        result = runner.invoke(app, ["start"])
+
+        assert result.exit_code == 1
+        assert "storage.durability" in result.output
+
+
+class TestFsckCommand:
+    def _storage(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(Day(date="2026-01-29", start_time=datetime(2026, 1, 29, 9, 0)))
+        storage.save_day(Day(date="2026-01-30", start_time=datetime(2026, 1, 30, 9, 0)))
+        return storage
+
+    def _damage_first_day(self, temp_data_file):
+        lines = temp_data_file.read_text().splitlines(keepends=True)
+        lines[1] = lines[1].replace("09:00:00", "09:30:00")
+        temp_data_file.write_text("".join(lines))
+
+    def test_clean_file(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = self._storage(temp_data_file)
+            result = runner.invoke(app, ["fsck", "--workers", "1"])
+
+        assert result.exit_code == 0
+        assert "Checked 2 days" in result.output
+        assert "No problems found" in result.output
+
+    def test_reports_damage_without_changing_file(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = self._storage(temp_data_file)
+            self._damage_first_day(temp_data_file)
+            damaged = temp_data_file.read_text()
+            result = runner.invoke(app, ["fsck"])
+
+        assert result.exit_code == 1
+        assert "(2026-01-29): Checksum mismatch" in result.output
+        assert temp_data_file.read_text() == damaged
+
+    def test_repair_restores_from_backup(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage = self._storage(temp_data_file)
+            self._damage_first_day(temp_data_file)
+            result = runner.invoke(app, ["fsck", "--repair"])
+
+        assert result.exit_code == 0
+        assert "Kept 1 days, restored 1" in result.output
+        assert storage.load_day("2026-01-29").start_time == datetime(2026, 1, 29, 9, 0)
+
+    def test_damaged_hot_segment_is_repaired_on_startup(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage = self._storage(temp_data_file)
+            self._damage_first_day(temp_data_file)
+            result = runner.invoke(app, ["show"])
+
+        assert "damaged record" in result.output
+        assert "Restored 2026-01-29" in result.output
+        assert "Traceback" not in result.output
+        assert storage.load_day("2026-01-29").start_time == datetime(2026, 1, 29, 9, 0)
+
+    def test_damaged_backup_is_not_used_for_repair(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage = self._storage(temp_data_file)
+            self._damage_first_day(temp_data_file)
+            backup = storage.backup_file.read_text()
+            storage.backup_file.write_text(backup.replace("09:00", "09:45"))
+            damaged = temp_data_file.read_text()
+            result = runner.invoke(app, ["prompt"])
+
+        assert result.exit_code == 0
+        assert "fsck --repair" in result.output
+        assert temp_data_file.read_text() == damaged
+        assert not temp_data_file.with_name("data.json.corrupt").exists()
+
+    @pytest.mark.parametrize(
+        "args", [["start"], ["stop"], ["switch-to", "coding"], ["show"], ["report"], ["annotate"]]
+    )
+    def test_tracker_commands_report_damage_without_traceback(self, temp_data_file, args):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage = self._storage(temp_data_file)
+            self._damage_first_day(temp_data_file)
+            storage.backup_file.unlink()
+            with patch("time_surfer.tracker.datetime") as mock_dt:
+                mock_dt.now.return_value = datetime(2026, 1, 29, 12, 0)
+                result = runner.invoke(app, args)
+
+        assert result.exit_code == 1
+        assert "Error:" in result.output and "Checksum mismatch" in result.output
+        assert "fsck --repair" in result.output
+        assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+class TestPromptCommand:
+    def test_prompt_prints_current_task(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            runner.invoke(app, ["switch-to", "coding"])
+            result = runner.invoke(app, ["prompt"])
+
+        assert result.exit_code == 0
+        assert result.output.startswith("coding 0:0")
+
+    def test_prompt_prints_nothing_when_idle(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["prompt"])
+
+        assert result.exit_code == 0
+        assert result.output == ""
+
+
+class TestHookGitCommand:
+    def test_installs_and_uninstalls_hook(self, tmp_path):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        hook = tmp_path / ".git" / "hooks" / "post-checkout"
+
+        result = runner.invoke(app, ["hook", "git", str(tmp_path)])
+        assert result.exit_code == 0
+        assert hook.exists()
+
+        result = runner.invoke(app, ["hook", "git", str(tmp_path), "--uninstall"])
+        assert result.exit_code == 0
+        assert not hook.exists()
+
+    def test_rejects_non_repository(self, tmp_path):
+        result = runner.invoke(app, ["hook", "git", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "not a git" in result.output
+
+
+class TestReportWhere:
+    def _seed(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date, task in [("2026-08-31", "code review"), ("2026-09-01", "code review"), ("2026-09-02", "email")]:
+            start = datetime.fromisoformat(f"{date}T09:00:00")
+            end = datetime.fromisoformat(f"{date}T10:00:00")
+            storage.save_day(
+                Day(date=date, start_time=start, end_time=end, spans=[Span(task=task, start=start, end=end)])
+            )
+        return storage
+
+    def test_reports_matching_spans_across_days(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = self._seed(temp_data_file)
+            result = runner.invoke(
+                app, ["report", "--where", "task ~ review and date >= 2026-09-01"]
+            )
+
+        assert result.exit_code == 0
+        assert "code review" in result.output
+        assert "1:00:00" in result.output
+        assert "email" not in result.output
+
+    def test_no_matches(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = self._seed(temp_data_file)
+            result = runner.invoke(app, ["report", "--where", "duration > 2h"])
+
+        assert result.exit_code == 0
+        assert "No spans match" in result.output
+
+    def test_invalid_expression(self, temp_data_file):
+        result = runner.invoke(app, ["report", "--where", "task >"])
+
+        assert result.exit_code == 1
+        assert "Error" in result.output
+
+
+class TestReportOverlaps:
+    def test_overlapping_spans_are_not_double_counted(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0),
+                end_time=datetime(2026, 1, 30, 12, 0),
+                spans=[
+                    Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 11, 0)),
+                    Span("meeting", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+                ],
+            )
+        )
+        with patch("time_surfer.cli.Storage") as MockStorage, \
+                patch("time_surfer.tracker.datetime") as mock_dt:
+            MockStorage.return_value = storage
+            mock_dt.now.return_value = datetime(2026, 1, 30, 13, 0, 0)
+            result = runner.invoke(app, ["report"])
+
+        assert result.exit_code == 0
+        assert "50.0%" in result.output  # coding: 1.5h attributed of 3h
+        assert "16.7%" in result.output  # meeting: 0.5h attributed
+        assert "33.3%" in result.output  # untracked 11:00-12:00
+        assert "Overlapping spans: 1:00:00" in result.output
+
+
+class TestSwitchToCompletion:
+    def test_completes_known_tasks(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            storage = Storage(temp_data_file)
+            MockStorage.return_value = storage
+            runner.invoke(app, ["switch-to", "code review"])
+            runner.invoke(app, ["switch-to", "email"])
+
+            assert _complete_task("co") == ["code review"]
+            assert sorted(_complete_task("")) == ["code review", "email"]
+
+
+class TestBudgetWarnings:
+    def test_switch_to_and_report_warn_over_budget(self, temp_data_file, isolated_config_dir):
+        isolated_config_dir.mkdir(parents=True)
+        (isolated_config_dir / "config.yaml").write_text(
+            "budgets:\n  - task: email\n    daily: 10m\n"
+        )
+        with patch("time_surfer.cli.Storage") as MockStorage, \
+                patch("time_surfer.tracker.datetime") as mock_dt:
+            MockStorage.return_value = Storage(temp_data_file)
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            runner.invoke(app, ["switch-to", "email"])
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 30, 0)
+            switched = runner.invoke(app, ["switch-to", "coding"])
+            reported = runner.invoke(app, ["report"])
+
+        assert "Warning: Budget exceeded for 'email': 0:30:00 of 0:10:00 today" in switched.output
+        assert "Budget exceeded for 'email'" in reported.output
+
+    def test_invalid_config_is_reported(self, isolated_config_dir):
+        isolated_config_dir.mkdir(parents=True)
+        (isolated_config_dir / "config.yaml").write_text("budgets: [{task: email}]\n")
+
+        result = runner.invoke(app, ["show"])
+
+        assert result.exit_code == 1
+        assert "needs 'daily' or 'weekly'" in result.output
+
+
+class TestMetricsCommand:
+    def test_commands_are_recorded_and_printed(self, temp_data_file, isolated_cache_dir):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            runner.invoke(app, ["switch-to", "coding"])
+            runner.invoke(app, ["report"])
+            result = runner.invoke(app, ["metrics"])
+
+        assert result.exit_code == 0
+        # Appended cheaply, not merged into the state file after every command.
+        assert (isolated_cache_dir / "metrics.json.pending").exists()
+        assert not (isolated_cache_dir / "metrics.json").exists()
+        count = "time_surfer_command_duration_seconds_count"
+        assert f'{count}{{command="switch-to",interface="cli"}} 1' in result.output
+        assert f'{count}{{command="report",interface="cli"}} 1' in result.output
+        assert "# TYPE time_surfer_storage_bytes gauge" in result.output
+
+    def test_prompt_is_not_recorded(self, temp_data_file, isolated_cache_dir):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            runner.invoke(app, ["prompt"])
+
+        assert not isolated_cache_dir.exists() or not any(isolated_cache_dir.iterdir())
+
+    def test_textfile_and_opt_out(
+        self, temp_data_file, isolated_cache_dir, isolated_config_dir, tmp_path
+    ):
+        textfile = tmp_path / "time_surfer.prom"
+        isolated_config_dir.mkdir(parents=True)
+        config = isolated_config_dir / "config.yaml"
+        config.write_text(f"metrics:\n  textfile: {textfile}\n")
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            runner.invoke(app, ["switch-to", "coding"])
+            assert 'command="switch-to"' in textfile.read_text()
+
+            config.write_text("metrics:\n  enabled: false\n")
+            runner.invoke(app, ["report"])
+
+        assert 'command="report"' not in (isolated_cache_dir / "metrics.json").read_text()
+
+
+class TestReportHeatmap:
+    def test_heatmap_over_a_range(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date in ("2026-01-26", "2026-02-02"):
+            start = datetime.fromisoformat(f"{date}T09:00:00")
+            storage.save_day(
+                Day(
+                    date=date,
+                    start_time=start,
+                    end_time=start.replace(hour=10),
+                    spans=[Span("coding", start, start.replace(hour=10))],
+                )
+            )
+
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage
+            result = runner.invoke(
+                app, ["report", "--heatmap", "--from", "2026-01-01", "--to", "2026-02-28"]
+            )
+            missing = runner.invoke(
+                app, ["report", "--heatmap", "--from", "2026-01-01", "--task", "email"]
+            )
+
+        assert result.exit_code == 0
+        assert "All tasks, 2026-01-01 to 2026-02-28 (2 days)" in result.output
+        assert "Mon " + "·" * 36 + "████" in result.output
+        assert "Busiest slot: Mon 09:00 (0:30:00)" in result.output
+        assert "No time recorded for 'email' in range." in missing.output
+
+
+class TestReportCompare:
+    def test_compare_with_explicit_ranges(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date, hours in (("2026-01-05", 2), ("2026-01-12", 3)):
+            start = datetime.fromisoformat(f"{date}T09:00:00")
+            end = start.replace(hour=9 + hours)
+            storage.save_day(
+                Day(date=date, start_time=start, end_time=end, spans=[Span("coding", start, end)])
+            )
+
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage
+            result = runner.invoke(
+                app,
+                [
+                    "report",
+                    "--compare",
+                    "2026-01-12..2026-01-18",
+                    "--against",
+                    "2026-01-05..2026-01-11",
+                    "--periods",
+                    "3",
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert "Current 2026-01-12..2026-01-18, baseline 2026-01-05..2026-01-11" in result.output
+        assert "coding    2:00:00   3:00:00   +1:00:00   +50%   ·▆█" in result.output
+
+    def test_compare_unknown_period(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["report", "--compare", "fortnight"])
+
+        assert result.exit_code == 1
+        assert "Unknown period 'fortnight'" in result.output
+
+    def test_compare_without_data(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["report", "--compare", "last-week"])
+
+        assert result.exit_code == 0
+        assert "No time recorded in these periods." in result.output
+
+
+class TestSyncCommand:
+    def test_sync_with_directory(self, temp_data_file, tmp_path):
+        other = tmp_path / "laptop"
+        Storage(other / "data.json").save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0),
+                spans=[Span("email", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 9, 30))],
+            )
+        )
+
+        def storage(data_file=None, **options):
+            return Storage(data_file or temp_data_file, **options)
+
+        with patch("time_surfer.cli.Storage", side_effect=storage):
+            result = runner.invoke(app, ["sync", str(other)])
+
+        assert result.exit_code == 0
+        assert "Synced 1 days: 1 pulled, 0 pushed, 0 merged, 0 unchanged" in result.output
+        assert Storage(temp_data_file).load_day("2026-01-30").spans[0].task == "email"
+
+
+class TestCalendarCommands:
+    def test_import_then_export(self, temp_data_file, tmp_path):
+        ics = tmp_path / "meetings.ics"
+        ics.write_text(
+            "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Standup\r\n"
+            "DTSTART:20260130T090000\r\nDTEND:20260130T091500\r\nEND:VEVENT\r\n"
+            "BEGIN:VEVENT\r\nSUMMARY:Offsite\r\nDTSTART;VALUE=DATE:20260131\r\nEND:VEVENT\r\n"
+            "END:VCALENDAR\r\n",
+            newline="",
+        )
+        exported = tmp_path / "out.ics"
+
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            imported = runner.invoke(app, ["calendar", "import", str(ics)])
+            export = runner.invoke(app, ["calendar", "export", "-o", str(exported)])
+            stdout = runner.invoke(app, ["calendar", "export", "--from", "2026-01-30"])
+
+        assert imported.exit_code == 0
+        assert "Imported 1 events, changing 1 days (1 skipped" in imported.output
+        assert Storage(temp_data_file).load_day("2026-01-30").spans[0].task == "meeting: Standup"
+        assert "Exported 1 spans" in export.output
+        assert "SUMMARY:meeting: Standup" in exported.read_text()
+        assert stdout.output.startswith("BEGIN:VCALENDAR")
+
+    def test_import_reports_malformed_files(self, tmp_path):
+        ics = tmp_path / "bad.ics"
+        ics.write_text("BEGIN:VEVENT\nnot a content line\nEND:VEVENT\n")
+
+        result = runner.invoke(app, ["calendar", "import", str(ics)])
+
+        assert result.exit_code == 1
+        assert "Malformed content line" in result.output
+
+
+class TestAnnotateCommand:
+    def test_switch_to_attaches_note_to_new_span(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage
+            with patch("time_surfer.tracker.datetime") as mock_dt:
+                mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+                args = ["--note", "pairing", "--ticket", "OPS-12", "--meta", "pr=481"]
+                result = runner.invoke(app, ["switch-to", "coding", *args])
+            listing = runner.invoke(app, ["annotate", "--date", "2026-01-30"])
+
+        assert result.exit_code == 0
+        assert "09:00-...  coding  OPS-12 pr=481: pairing" in listing.output
+        # Span records themselves stay unchanged.
+        assert '"note"' not in temp_data_file.read_text()
+
+    def test_switch_to_rejects_bad_metadata(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["switch-to", "coding", "--meta", "oops"])
+
+        assert result.exit_code != 0
+        assert not temp_data_file.exists()
+
+    def test_annotate_span_by_id(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        spans = [
+            Span("email", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 9, 30)),
+            Span("coding", datetime(2026, 1, 30, 9, 30)),
+        ]
+        storage.save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0),
+                current_task="coding",
+                spans=spans,
+            )
+        )
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = storage
+            result = runner.invoke(
+                app, ["annotate", span_id(spans[0])[:6], "--date", "2026-01-30", "--note", "inbox"]
+            )
+            default = runner.invoke(app, ["annotate", "--date", "2026-01-30", "--ticket", "OPS-7"])
+            listing = runner.invoke(app, ["annotate", "--date", "2026-01-30"])
+
+        assert result.exit_code == 0
+        assert "Annotated 'email' (09:00-09:30)" in result.output
+        assert "Annotated 'coding'" in default.output
+        assert "09:00-09:30  email  inbox" in listing.output
+        assert "09:30-...  coding  OPS-7" in listing.output
+
+    def test_annotate_unknown_span(self, temp_data_file):
+        with patch("time_surfer.cli.Storage") as MockStorage:
+            MockStorage.return_value = Storage(temp_data_file)
+            result = runner.invoke(app, ["annotate", "abc", "--date", "2026-01-30", "--note", "x"])
+
+        assert result.exit_code == 1
+        assert "No span abc on 2026-01-30" in result.output
@@ -0,0 +1,157 @@
+"""Tests for storage compaction."""
+
+import fcntl
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.compaction import compact_day, compact_spans, compact_storage
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage
+
+
+def _span(task, start, end):
+    return Span(task=task, start=start, end=end)
+
+
+class TestCompactSpans:
+    def test_merges_adjacent_spans_of_same_task(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("coding", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+        ]
+        result = compact_spans(spans)
+
+        assert len(result) == 1
+        assert result[0].start == datetime(2026, 1, 30, 9, 0)
+        assert result[0].end == datetime(2026, 1, 30, 11, 0)
+
+    def test_drops_sub_second_spans_and_merges_around_them(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("email", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 10, 0, 0, 400000)),
+            _span("coding", datetime(2026, 1, 30, 10, 0, 0, 400000), datetime(2026, 1, 30, 11, 0)),
+        ]
+        result = compact_spans(spans)
+
+        assert [s.task for s in result] == ["coding"]
+        assert result[0].end == datetime(2026, 1, 30, 11, 0)
+
+    def test_drops_zero_length_spans(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 9, 0)),
+            _span("email", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 9, 30)),
+        ]
+        assert [s.task for s in compact_spans(spans)] == ["email"]
+
+    def test_dedupes_repeated_entries(self):
+        span = _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0))
+        other = _span("email", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 10, 30))
+        result = compact_spans([span, _span(span.task, span.start, span.end), other])
+
+        assert len(result) == 2
+
+    def test_keeps_open_span_and_extends_merge_to_open(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("coding", datetime(2026, 1, 30, 10, 0), None),
+        ]
+        result = compact_spans(spans)
+
+        assert len(result) == 1
+        assert result[0].end is None
+
+    def test_does_not_merge_different_tasks(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("email", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+        ]
+        assert len(compact_spans(spans)) == 2
+
+    def test_does_not_modify_input(self):
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("coding", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+        ]
+        compact_spans(spans)
+        assert spans[0].end == datetime(2026, 1, 30, 10, 0)
+
+    def test_compact_day_preserves_day_fields(self):
+        day = Day(
+            date="2026-01-30",
+            start_time=datetime(2026, 1, 30, 9, 0),
+            current_task="coding",
+            spans=[_span("coding", datetime(2026, 1, 30, 9, 0), None)],
+        )
+        result = compact_day(day)
+        assert result.current_task == "coding"
+        assert result.start_time == day.start_time
+
+
+class TestCompactStorage:
+    @pytest.fixture
+    def storage(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        spans = [
+            _span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("email", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 10, 0)),
+            _span("coding", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+        ]
+        storage.save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 9, 0),
+                end_time=datetime(2026, 1, 30, 11, 0),
+                spans=spans,
+            )
+        )
+        return storage
+
+    def test_dry_run_reports_savings_without_writing(self, storage, temp_data_file):
+        before = temp_data_file.read_text()
+        report = compact_storage(storage, dry_run=True)
+
+        assert report.dry_run is True
+        assert report.spans_before == 3
+        assert report.spans_after == 1
+        assert report.spans_saved == 2
+        assert report.bytes_saved > 0
+        assert temp_data_file.read_text() == before
+
+    def test_rewrites_storage(self, storage, temp_data_file):
+        report = compact_storage(storage)
+
+        assert temp_data_file.stat().st_size == report.bytes_after
+        loaded = storage.load_day("2026-01-30")
+        assert len(loaded.spans) == 1
+        assert loaded.spans[0].end == datetime(2026, 1, 30, 11, 0)
+
+    def test_notes_on_merged_and_pruned_spans_still_resolve(self, storage):
+        notes = NoteStore(storage.notes_file)
+        _, pruned, merged = storage.load_day("2026-01-30").spans
+        notes.add(merged, note="second half")
+        notes.add(pruned, ticket="OPS-7")
+
+        compact_storage(storage)
+
+        (span,) = storage.load_day("2026-01-30").spans
+        note = notes.get(span)
+        assert note is not None
+        assert (note.notes, note.tickets) == (["second half"], ["OPS-7"])
+        assert notes.get(merged) is None
+
+    def test_holds_the_storage_lock_from_load_to_replace(self, storage):
+        def replace_all_days(days):
+            with open(storage.lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with patch.object(storage, "replace_all_days", side_effect=replace_all_days):
+            compact_storage(storage)
+
+    def test_empty_storage(self, temp_data_file):
+        report = compact_storage(Storage(temp_data_file))
+        assert report.days == 0
+        assert not temp_data_file.exists()
@@ -0,0 +1,120 @@
+"""Tests for period-over-period comparisons."""
+
+from datetime import date
+
+import pytest
+
+from time_surfer.compare import (
+    CompareError,
+    Comparison,
+    Period,
+    TaskDelta,
+    compare,
+    date_span,
+    parse_range,
+    period_totals,
+    resolve,
+)
+
+TODAY = date(2026, 3, 18)  # A Wednesday.
+
+
+class TestResolve:
+    @pytest.mark.parametrize(
+        "spec, current, baseline",
+        [
+            ("today", ("2026-03-18", "2026-03-18"), ("2026-03-17", "2026-03-17")),
+            ("yesterday", ("2026-03-17", "2026-03-17"), ("2026-03-16", "2026-03-16")),
+            ("this-week", ("2026-03-16", "2026-03-22"), ("2026-03-09", "2026-03-15")),
+            ("last-week", ("2026-03-09", "2026-03-15"), ("2026-03-02", "2026-03-08")),
+            ("this-month", ("2026-03-01", "2026-03-31"), ("2026-02-01", "2026-02-28")),
+            ("last-month", ("2026-02-01", "2026-02-28"), ("2026-01-01", "2026-01-31")),
+            (
+                "2026-03-01..2026-03-10",
+                ("2026-03-01", "2026-03-10"),
+                ("2026-02-19", "2026-02-28"),
+            ),
+        ],
+    )
+    def test_periods(self, spec, current, baseline):
+        comparison = resolve(spec, TODAY)
+
+        assert comparison.current == Period(*map(date.fromisoformat, current))
+        assert comparison.baseline == Period(*map(date.fromisoformat, baseline))
+
+    def test_explicit_baseline(self):
+        comparison = resolve("last-week", TODAY, against="2025-03-10..2025-03-16")
+
+        assert comparison.baseline == Period(date(2025, 3, 10), date(2025, 3, 16))
+        assert comparison.unit == "week"
+
+    @pytest.mark.parametrize(
+        "spec, message",
+        [
+            ("fortnight", "Unknown period"),
+            ("2026-03-10..2026-03-01", "ends before it starts"),
+            ("2026-13-01", "Invalid range"),
+        ],
+    )
+    def test_rejects_bad_specs(self, spec, message):
+        with pytest.raises(CompareError, match=message):
+            resolve(spec, TODAY)
+
+    def test_single_date_range(self):
+        assert parse_range("2026-03-01") == Period(date(2026, 3, 1), date(2026, 3, 1))
+
+
+class TestTrendPeriods:
+    def test_months_step_back_by_calendar_month(self):
+        comparison = resolve("this-month", TODAY)
+
+        assert [p.label for p in comparison.trend_periods(3)] == [
+            "2026-01-01..2026-01-31",
+            "2026-02-01..2026-02-28",
+            "2026-03-01..2026-03-31",
+        ]
+
+    def test_date_span_covers_baseline_and_trend(self):
+        comparison = resolve("last-week", TODAY, against="2026-01-05..2026-01-11")
+
+        assert date_span(comparison, 2) == ("2026-01-05", "2026-03-15")
+
+
+class TestCompare:
+    DAILY = {
+        "2026-03-02": {"coding": 3600.0},
+        "2026-03-03": {"coding": 1800.0, "email": 600.0},
+        "2026-03-10": {"coding": 7200.0, "review": 900.0},
+        "2026-03-16": {"email": 300.0},
+    }
+
+    def test_period_totals(self):
+        period = Period(date(2026, 3, 2), date(2026, 3, 8))
+
+        assert period_totals(self.DAILY, period) == {"coding": 5400.0, "email": 600.0}
+
+    def test_deltas_and_trends(self):
+        comparison = resolve("last-week", TODAY)
+
+        deltas = compare(self.DAILY, comparison, trend_periods=3)
+
+        assert deltas == [
+            TaskDelta("coding", 5400.0, 7200.0, [0.0, 5400.0, 7200.0]),
+            TaskDelta("review", 0.0, 900.0, [0.0, 0.0, 900.0]),
+            TaskDelta("email", 600.0, 0.0, [0.0, 600.0, 0.0]),
+        ]
+        assert deltas[0].delta == 1800.0
+        assert deltas[0].percent == pytest.approx(33.333, rel=1e-3)
+        assert deltas[1].percent is None
+        assert deltas[2].percent == -100.0
+
+    def test_tasks_only_in_the_trend_are_listed(self):
+        comparison = Comparison(
+            current=Period(date(2026, 3, 16), date(2026, 3, 22)),
+            baseline=Period(date(2026, 3, 9), date(2026, 3, 15)),
+            unit="week",
+        )
+
+        tasks = [d.task for d in compare(self.DAILY, comparison, trend_periods=3)]
+
+        assert tasks == ["email", "coding", "review"]
@@ -0,0 +1,223 @@
+"""Tests for task-name completion."""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+import time_surfer
+from time_surfer.completion import (
+    MAX_TASKS,
+    complete,
+    completing_task,
+    decode_index,
+    encode_index,
+    index_from_history,
+    read_index,
+    record_use,
+)
+from time_surfer.models import Day, Span
+from time_surfer.storage import Durability, Storage
+from time_surfer.tracker import Tracker
+
+DAY = 86400.0
+NOW = 1_800_000_000.0
+
+
+class TestIndexFormat:
+    def test_round_trip_is_sorted_case_insensitively(self):
+        entries = [("beta", 2, NOW), ("Alpha", 1, NOW), ("alpine", 3, NOW)]
+
+        text = encode_index(entries)
+
+        assert [task for task, _, _ in decode_index(text)] == ["Alpha", "alpine", "beta"]
+
+    def test_skips_malformed_lines(self):
+        assert decode_index("ok\t1\t5\nbroken\nbad\tx\t1\n") == [("ok", 1, 5.0)]
+
+    def test_missing_file(self, tmp_path):
+        assert read_index(str(tmp_path / "tasks")) == []
+
+
+class TestRecordUse:
+    def test_increments_and_refreshes(self):
+        entries = record_use([("coding", 4, NOW - DAY)], "coding", NOW)
+
+        assert entries == [("coding", 5, NOW)]
+
+    def test_rejects_unindexable_names(self):
+        assert record_use([], "a\tb", NOW) is None
+        assert record_use([], "", NOW) is None
+
+    def test_drops_lowest_ranked_when_full(self):
+        entries = [(f"task{i}", 1, NOW - DAY * 30) for i in range(MAX_TASKS)]
+        entries[0] = ("task0", 50, NOW)
+
+        updated = record_use(entries, "new", NOW)
+
+        assert len(updated) == MAX_TASKS
+        tasks = {task for task, _, _ in updated}
+        assert {"task0", "new"} <= tasks
+
+
+class TestIndexFromHistory:
+    def test_counts_uses_and_keeps_the_latest(self):
+        uses = [("coding", NOW - DAY), ("email", NOW - DAY), ("coding", NOW), ("a\tb", NOW)]
+
+        assert sorted(index_from_history(uses)) == [("coding", 2, NOW), ("email", 1, NOW - DAY)]
+
+    def test_keeps_the_highest_ranked_when_too_many(self):
+        uses = [(f"task{i}", NOW - DAY * 30) for i in range(MAX_TASKS)] + [("new", NOW)]
+
+        tasks = {task for task, _, _ in index_from_history(uses)}
+        assert len(tasks) == MAX_TASKS and "new" in tasks
+
+
+class TestCompletingTask:
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "time-surfer switch-to ",
+            "time-surfer switch-to co",
+            "time-surfer switch-to --note 'paged by on-call' co",
+            "time-surfer switch-to --meta sev=2 --ticket OPS-1 ",
+            "time-surfer switch-to 'code re",
+        ],
+    )
+    def test_task_argument(self, line):
+        assert completing_task(line)
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "time-surfer report ",
+            "time-surfer switch-to --note ",
+            "time-surfer switch-to --note co",
+            "time-surfer switch-to --note 'two wo",
+            "time-surfer switch-to --meta ",
+            "time-surfer switch-to coding ",
+            "time-surfer switch-to --",
+            "time-surfer",
+        ],
+    )
+    def test_not_the_task_argument(self, line):
+        assert not completing_task(line)
+
+
+class TestComplete:
+    def test_prefix_match_ranked_by_frecency(self):
+        entries = decode_index(
+            encode_index(
+                [
+                    ("code review", 10, NOW - 60 * DAY),  # frequent but stale
+                    ("coding", 3, NOW - DAY),
+                    ("Codegen", 1, NOW),
+                    ("email", 50, NOW),
+                ]
+            )
+        )
+
+        assert complete(entries, "co", now=NOW) == ["coding", "Codegen", "code review"]
+        assert complete(entries, "CODE", now=NOW, limit=1) == ["Codegen"]
+        assert complete(entries, "x", now=NOW) == []
+        assert len(complete(entries, "", now=NOW)) == 4
+
+
+class TestTrackerUpdatesIndex:
+    def test_switch_to_records_each_change(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        tracker = Tracker(storage)
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.switch_to("coding")
+            tracker.switch_to("coding")  # no-op, not counted
+            tracker.switch_to("email")
+            tracker.switch_to("coding")
+
+        index = read_index(str(storage.task_index_file))
+        assert [(task, count) for task, count, _ in index] == [("coding", 2), ("email", 1)]
+
+    def test_missing_index_is_seeded_from_history(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        start = datetime(2026, 1, 29, 9, 0)
+        spans = [
+            Span("email", start, start.replace(hour=10)),
+            Span("coding", start.replace(hour=10), start.replace(hour=11)),
+            Span("email", start.replace(hour=11), start.replace(hour=12)),
+        ]
+        storage.save_day(
+            Day(date="2026-01-29", start_time=start, end_time=start.replace(hour=12), spans=spans)
+        )
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            Tracker(storage).switch_to("coding")
+
+        index = read_index(str(storage.task_index_file))
+        assert [(task, count) for task, count, _ in index] == [("coding", 2), ("email", 2)]
+        assert index[0][2] == datetime(2026, 1, 30, 9, 0).timestamp()
+
+    def test_memory_storage_keeps_no_index(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.MEMORY)
+        Tracker(storage).switch_to("coding")
+
+        assert not storage.task_index_file.exists()
+
+
+class TestMain:
+    def _run(self, tmp_path, args, comp_line=None):
+        index = tmp_path / "tasks"
+        index.write_text(encode_index([("coding", 1, NOW), ("code review", 1, NOW), ("email", 1, NOW)]))
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.path.dirname(os.path.dirname(time_surfer.__file__)),
+            "TIME_SURFER_TASK_INDEX": str(index),
+        }
+        env.pop("COMP_LINE", None)
+        if comp_line is not None:
+            env["COMP_LINE"] = comp_line
+        return subprocess.run(
+            [sys.executable, "-m", "time_surfer.completion", *args],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        ).stdout.splitlines()
+
+    def test_missing_index_is_seeded_once(self, tmp_path):
+        start = datetime(2026, 1, 29, 9, 0)
+        span = Span("design review", start, start.replace(hour=10))
+        day = Day(date="2026-01-29", start_time=start, end_time=span.end, spans=[span])
+        Storage(tmp_path / "data.json").save_day(day)
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.path.dirname(os.path.dirname(time_surfer.__file__)),
+            "TIME_SURFER_TASK_INDEX": str(tmp_path / "tasks"),
+        }
+        env.pop("COMP_LINE", None)
+        output = subprocess.run(
+            [sys.executable, "-m", "time_surfer.completion", "des"],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        ).stdout
+
+        assert output == "design review\n"
+        assert [task for task, _, _ in read_index(str(tmp_path / "tasks"))] == ["design review"]
+
+    def test_standalone_prefix(self, tmp_path):
+        assert sorted(self._run(tmp_path, ["cod"])) == ["code review", "coding"]
+
+    def test_bash_complete_command(self, tmp_path):
+        line = "time-surfer switch-to em"
+        assert self._run(tmp_path, ["time-surfer", "em", "switch-to"], comp_line=line) == ["email"]
+        assert self._run(tmp_path, ["time-surfer", "em", "report"], comp_line="time-surfer report em") == []
+
+    def test_option_values_are_not_completed(self, tmp_path):
+        line = "time-surfer switch-to --note em"
+        assert self._run(tmp_path, ["time-surfer", "em", "--note"], comp_line=line) == []
+        line = "time-surfer switch-to --note x em"
+        assert self._run(tmp_path, ["time-surfer", "em", "x"], comp_line=line) == ["email"]
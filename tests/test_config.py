@@ -0,0 +1,117 @@
+"""Tests for configuration loading."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.config import (
+    Budget,
+    Config,
+    ConfigError,
+    _parse_file,
+    default_config_path,
+    load_config,
+)
+from time_surfer.storage import Durability
+
+
+class TestLoadConfig:
+    def test_missing_or_empty_file_gives_defaults(self, tmp_path):
+        assert load_config(tmp_path / "missing.yaml") == Config()
+        (tmp_path / "empty.yaml").write_text("")
+        assert load_config(tmp_path / "empty.yaml") == Config()
+
+    def test_default_path_honours_xdg(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+        assert default_config_path() == tmp_path / "time-surfer" / "config.yaml"
+
+    def test_parses_budgets_and_tags(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            "day_boundary: '04:00'\n"
+            "tags:\n"
+            "  meetings: [standup, 'meeting*']\n"
+            "  admin: email\n"
+            "budgets:\n"
+            "  - task: email\n"
+            "    daily: 30m\n"
+            "  - tag: meetings\n"
+            "    daily: 2h\n"
+            "    weekly: 8h\n"
+        )
+
+        config = load_config(path)
+
+        assert config.budgets == [
+            Budget(name="email", daily=1800.0),
+            Budget(name="meetings", is_tag=True, daily=7200.0, weekly=28800.0),
+        ]
+        assert config.tags == {"meetings": ["standup", "meeting*"], "admin": ["email"]}
+        assert config.tags_for("meeting: planning") == ["meetings"]
+        assert config.tags_for("coding") == []
+
+    def test_parses_metrics(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("metrics:\n  textfile: ~/node/time_surfer.prom\n")
+
+        config = load_config(path)
+
+        assert config.metrics_enabled is True
+        assert config.metrics_textfile == Path("~/node/time_surfer.prom").expanduser()
+
+        path.write_text("metrics: {enabled: false}\n")
+        assert load_config(path).metrics_enabled is False
+
+    def test_unchanged_file_is_parsed_once(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("metrics: {enabled: false}\n")
+
+        with patch("time_surfer.config._parse_file", wraps=_parse_file) as parse:
+            first = load_config(path)
+            assert load_config(path) is first
+            path.write_text("metrics: {enabled: true}\n")
+            assert load_config(path).metrics_enabled is True
+
+        assert parse.call_count == 2
+
+    def test_parses_storage(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        assert load_config(path).durability is Durability.RELAXED
+
+        path.write_text(
+            "storage:\n  durability: strict\n  commit_max_events: 8\n  commit_interval: 2s\n"
+        )
+        config = load_config(path)
+
+        assert config.durability is Durability.STRICT
+        assert (config.commit_max_events, config.commit_interval_ms) == (8, 2000)
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "storage: strict",
+            "storage: {durability: memory}",
+            "storage: {durability: fast}",
+            "storage: {commit_max_events: 0}",
+            "storage: {commit_max_events: many}",
+            "storage: {commit_interval: soon}",
+            "metrics: [textfile]",
+            "metrics: {enabled: maybe}",
+            "metrics: {textfile: 3}",
+            "budgets: [{task: email}]",
+            "budgets: [{task: email, tag: admin, daily: 1h}]",
+            "budgets: [{daily: 1h}]",
+            "budgets: [{task: email, daily: soon}]",
+            "tags: [meetings]",
+            "tags: {meetings: [1, 2]}",
+            "- just a list",
+            "budgets: [",
+        ],
+    )
+    def test_invalid(self, tmp_path, content):
+        path = tmp_path / "config.yaml"
+        path.write_text(content)
+
+        with pytest.raises(ConfigError):
+            load_config(path)
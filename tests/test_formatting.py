@@ -2,7 +2,19 @@
 
 import pytest
 
-from time_surfer.formatting import format_duration, create_task_table
+from rich.console import Console
+
+from time_surfer.compare import TaskDelta
+from time_surfer.formatting import (
+    create_compare_table,
+    create_task_table,
+    format_delta,
+    format_duration,
+    format_heatmap,
+    parse_duration,
+    sparkline,
+)
+from time_surfer.heatmap import SLOTS
 
 
 class TestFormatDuration:
@@ -165,3 +177,98 @@ class TestCreateTaskTable:
         assert "untracked" not in output
         # Percentages still work (coding is 66.7%, meetings is 33.3%)
         assert "66.7%" in output
+
+    def test_create_task_table_uses_exact_untracked_and_attributed_shares(self):
+        """Overlapping spans: durations stay raw, percentages use attributed shares."""
+        from io import StringIO
+        from rich.console import Console
+
+        # coding 9-11 and a meeting 10-11 overlapping it, in a 9-12 window
+        task_totals = {"coding": 7200.0, "meeting": 3600.0}
+        table = create_task_table(
+            task_totals,
+            total_duration=10800.0,
+            untracked=3600.0,
+            attributed={"coding": 5400.0, "meeting": 1800.0},
+        )
+
+        console = Console(file=StringIO(), force_terminal=True, width=80)
+        console.print(table)
+        output = console.file.getvalue()
+
+        assert "2:00:00" in output
+        assert "50.0%" in output  # coding: 1.5h of 3h
+        assert "16.7%" in output  # meeting: 0.5h of 3h
+        assert "untracked" in output
+        assert "33.3%" in output
+
+
+class TestParseDuration:
+    def test_bare_number_is_seconds(self):
+        assert parse_duration("90") == 90.0
+
+    def test_units(self):
+        assert parse_duration("45s") == 45.0
+        assert parse_duration("10m") == 600.0
+        assert parse_duration("2h") == 7200.0
+
+    def test_combined_units(self):
+        assert parse_duration("1h30m") == 5400.0
+
+    def test_fractional(self):
+        assert parse_duration("1.5h") == 5400.0
+
+    def test_zero(self):
+        assert parse_duration("0") == 0.0
+        assert parse_duration("0m") == 0.0
+
+    @pytest.mark.parametrize(
+        "text",
+        ["", "abc", "10x", "m10", "1h 30m", "-5", "nan", "inf", "-inf", "1e400", "9" * 400 + "h"],
+    )
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_duration(text)
+
+
+class TestFormatHeatmap:
+    def test_shades_relative_to_busiest_slot(self):
+        grid = [0.0] * SLOTS
+        grid[36] = 900.0
+        grid[37] = 300.0
+
+        lines = format_heatmap(grid).splitlines()
+
+        assert len(lines) == 8
+        assert lines[0].startswith("    0   1   2")
+        assert lines[1].startswith("Mon " + "·" * 36 + "█▒·")
+        assert lines[2] == "Tue " + "·" * 96
+
+
+class TestSparkline:
+    def test_scales_to_largest_value(self):
+        assert sparkline([0.0, 1.0, 4.0, 8.0]) == "·▂▅█"
+
+    def test_empty_and_all_zero(self):
+        assert sparkline([]) == ""
+        assert sparkline([0.0, 0.0]) == "··"
+
+
+class TestCompareTable:
+    def test_format_delta(self):
+        assert format_delta(5400) == "+1:30:00"
+        assert format_delta(-900) == "-0:15:00"
+
+    def test_rows_and_total(self):
+        deltas = [
+            TaskDelta("coding", 3600.0, 5400.0, [3600.0, 5400.0]),
+            TaskDelta("review", 0.0, 900.0, [0.0, 900.0]),
+        ]
+        console = Console(width=100, record=True)
+
+        console.print(create_compare_table(deltas))
+        text = console.export_text()
+
+        assert "coding    1:00:00   1:30:00   +0:30:00   +50%   ▆█" in text
+        assert "review    0:00:00   0:15:00   +0:15:00    new   ·█" in text
+        assert "Total     1:00:00   1:45:00   +0:45:00   +75%   ▅█" in text
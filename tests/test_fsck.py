@@ -0,0 +1,175 @@
+"""Tests for data file verification and repair."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from time_surfer.fsck import check_file, check_tail, repair
+from time_surfer.models import Day, Span
+from time_surfer.storage import SCHEMA_VERSION, Storage, UnsupportedSchemaError, seal
+
+DATES = [f"2026-01-{day:02d}" for day in range(1, 21)]
+
+
+def _day(date: str) -> Day:
+    start = datetime.fromisoformat(f"{date}T09:00:00")
+    end = datetime.fromisoformat(f"{date}T10:00:00")
+    return Day(date=date, start_time=start, end_time=end, spans=[Span("coding", start, end)])
+
+
+@pytest.fixture
+def storage(temp_data_file):
+    storage = Storage(temp_data_file)
+    storage.save_days(_day(date) for date in DATES[:-1])
+    storage.save_day(_day(DATES[-1]))  # Keeps the first 19 days as the backup.
+    return storage
+
+
+def _lines(storage):
+    return storage.data_file.read_text().splitlines(keepends=True)
+
+
+def _rewrite(storage, lines):
+    storage.data_file.write_text("".join(lines))
+
+
+def _damage(storage, *indexes, garble=False):
+    lines = _lines(storage)
+    for index in indexes:
+        lines[index] = "\x00garbage\n" if garble else lines[index].replace("coding", "codinG")
+    _rewrite(storage, lines)
+
+
+class TestCheckFile:
+    def test_clean_file(self, storage):
+        result = check_file(storage.data_file)
+
+        assert result.ok
+        assert (result.schema_version, result.records) == (SCHEMA_VERSION, len(DATES))
+
+    def test_missing_file(self, temp_data_file):
+        result = check_file(temp_data_file)
+        assert result.ok and result.schema_version is None
+
+    def test_reports_damaged_records(self, storage):
+        _damage(storage, 3)
+        _damage(storage, 7, garble=True)
+        result = check_file(storage.data_file, max_workers=1)
+
+        assert [p.date for p in result.problems] == [DATES[2], None]
+        assert "Checksum mismatch" in result.problems[0].message
+        assert result.records == len(DATES) - 2
+
+    @pytest.mark.parametrize("workers", [1, 2, 4, 7])
+    def test_segments_agree_with_a_single_pass(self, storage, workers):
+        _damage(storage, 3, 11)
+        lines = _lines(storage)
+        lines[15], lines[16] = lines[16], lines[15]
+        _rewrite(storage, lines)
+
+        single = check_file(storage.data_file, max_workers=1)
+        split = check_file(storage.data_file, max_workers=workers, min_segment_bytes=100)
+
+        assert split.segments == workers
+        assert split.problems == single.problems
+        assert split.records == single.records
+        assert [p.message for p in single.problems][-1] == "out of order"
+
+    def test_duplicate_dates(self, storage):
+        lines = _lines(storage)
+        _rewrite(storage, lines[:5] + lines[4:])
+        result = check_file(storage.data_file)
+
+        assert [(p.date, p.message) for p in result.problems] == [(DATES[3], "duplicate date")]
+
+    def test_invalid_day_with_valid_checksum(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_lines({"2026-01-30": seal('{"date":"2026-01-30"}')})
+        result = check_file(temp_data_file)
+
+        assert "invalid day record" in result.problems[0].message
+
+    def test_version_2_file_without_checksums(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        record = json.dumps({"date": "2026-01-30", "start_time": None, "end_time": None})
+        temp_data_file.write_text(json.dumps({"schema_version": 2}) + "\n" + record + "\n{\n")
+        result = check_file(temp_data_file)
+
+        assert result.schema_version == 2
+        assert result.records == 1
+        assert len(result.problems) == 1
+
+    def test_damaged_legacy_file(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text('{"2026-01-30": ')
+
+        assert not check_file(temp_data_file).ok
+
+    def test_newer_schema_is_rejected(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text(json.dumps({"schema_version": SCHEMA_VERSION + 1}) + "\n")
+
+        with pytest.raises(UnsupportedSchemaError):
+            check_file(temp_data_file)
+
+
+class TestCheckTail:
+    def test_only_reads_the_hot_segment(self, storage):
+        _damage(storage, 1, len(DATES))
+
+        problems = check_tail(storage.data_file, nbytes=300)
+        assert [p.date for p in problems] == [DATES[-1]]
+
+    def test_small_file_is_checked_whole(self, storage):
+        _damage(storage, 1)
+        assert [p.date for p in check_tail(storage.data_file)] == [DATES[0]]
+
+    def test_clean_and_missing_files(self, storage, tmp_path):
+        assert check_tail(storage.data_file) == []
+        assert check_tail(tmp_path / "missing.json") == []
+
+
+class TestRepair:
+    def test_restores_damaged_records_from_backup(self, storage):
+        _damage(storage, 3)
+        _damage(storage, 8, garble=True)
+        result = repair(storage)
+
+        assert result.restored == [DATES[2], DATES[7]]
+        assert result.lost == []
+        assert result.kept == len(DATES) - 2
+        assert check_file(storage.data_file).ok
+        assert storage.load_all_days() == [_day(date) for date in DATES]
+
+    def test_quarantines_damaged_lines(self, storage):
+        _damage(storage, 3)
+        damaged = _lines(storage)[3]
+        result = repair(storage)
+
+        assert result.quarantine_file.read_text() == damaged
+
+    def test_reports_records_missing_from_backup(self, storage):
+        _damage(storage, len(DATES))  # The last day was saved after the backup.
+        result = repair(storage)
+
+        assert result.restored == []
+        assert [p.date for p in result.lost] == [DATES[-1]]
+        assert [d.date for d in storage.load_all_days()] == DATES[:-1]
+
+    def test_drops_duplicates_and_restores_order(self, storage):
+        lines = _lines(storage)
+        lines[2], lines[3] = lines[3], lines[2]
+        _rewrite(storage, lines + lines[5:6])
+        result = repair(storage)
+
+        assert result.lost == []
+        assert len(result.quarantine_file.read_text().splitlines()) == 1
+        assert storage.load_all_days() == [_day(date) for date in DATES]
+
+    def test_leaves_clean_file_and_backup_alone(self, storage):
+        before = storage.data_file.read_text(), storage.backup_file.read_text()
+        result = repair(storage)
+
+        assert result.quarantine_file is None
+        assert (storage.data_file.read_text(), storage.backup_file.read_text()) == before
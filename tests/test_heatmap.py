@@ -0,0 +1,60 @@
+"""Tests for time-of-day heatmaps."""
+
+from datetime import datetime
+
+from time_surfer.heatmap import BINS_PER_DAY, SLOTS, Heatmap, add_span_bins, day_bins, slot_of
+from time_surfer.models import Day, Span
+
+# 2026-01-26 is a Monday.
+MONDAY = datetime(2026, 1, 26)
+
+
+class TestSlots:
+    def test_slot_of(self):
+        assert slot_of(MONDAY) == 0
+        assert slot_of(datetime(2026, 1, 26, 9, 14)) == 36
+        assert slot_of(datetime(2026, 2, 1, 23, 59)) == SLOTS - 1
+
+    def test_span_is_split_at_bin_boundaries(self):
+        bins = {}
+        add_span_bins(datetime(2026, 1, 26, 9, 10), datetime(2026, 1, 26, 9, 40), bins)
+
+        assert bins == {36: 300.0, 37: 900.0, 38: 600.0}
+
+    def test_span_crossing_midnight_lands_on_the_next_weekday(self):
+        bins = {}
+        add_span_bins(datetime(2026, 2, 1, 23, 50), datetime(2026, 2, 2, 0, 5), bins)
+
+        assert bins == {SLOTS - 1: 600.0, 0: 300.0}
+
+
+class TestDayBins:
+    def test_open_spans_need_now(self):
+        day = Day(
+            date="2026-01-26",
+            start_time=datetime(2026, 1, 26, 9),
+            spans=[
+                Span("coding", datetime(2026, 1, 26, 9), datetime(2026, 1, 26, 9, 15)),
+                Span("email", datetime(2026, 1, 26, 9, 15)),
+            ],
+        )
+
+        assert day_bins(day) == {"coding": {36: 900.0}}
+        assert day_bins(day, now=datetime(2026, 1, 26, 9, 20)) == {
+            "coding": {36: 900.0},
+            "email": {37: 300.0},
+        }
+
+
+class TestHeatmap:
+    def test_sums_days_per_task_and_overall(self):
+        heatmap = Heatmap()
+        heatmap.add({"coding": {36: 900.0}, "email": {37: 300.0}})
+        heatmap.add({"coding": {36: 600.0, BINS_PER_DAY: 60.0}})
+
+        assert heatmap.days == 2
+        assert heatmap.grid("coding")[36] == 1500.0
+        assert heatmap.grid()[36:38] == [1500.0, 300.0]
+        assert heatmap.grid()[BINS_PER_DAY] == 60.0
+        assert heatmap.grid("missing") == [0.0] * SLOTS
+        assert Heatmap().grid() == [0.0] * SLOTS
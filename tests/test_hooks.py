@@ -0,0 +1,135 @@
+"""Tests for git checkout hooks."""
+
+import subprocess
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.hooks import (
+    HOOK_BEGIN,
+    CheckoutDebouncer,
+    HookInstallError,
+    install_git_hook,
+    task_from_branch,
+    uninstall_git_hook,
+)
+from time_surfer.storage import Storage
+from time_surfer.tracker import Tracker
+
+T0 = datetime(2026, 1, 30, 9, 0, 0)
+
+
+@pytest.fixture
+def tracker(temp_data_file):
+    with patch("time_surfer.tracker.datetime") as mock_dt:
+        mock_dt.now.return_value = datetime(2026, 1, 30, 12, 0, 0)
+        yield Tracker(Storage(temp_data_file))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    return path
+
+
+class TestTaskFromBranch:
+    def test_strips_type_prefixes(self):
+        assert task_from_branch("feature/login-page") == "login-page"
+        assert task_from_branch("refs/heads/fix/crash") == "crash"
+
+    def test_keeps_other_branches(self):
+        assert task_from_branch("main") == "main"
+        assert task_from_branch("alice/experiment") == "alice/experiment"
+        assert task_from_branch("feature/") == "feature/"
+
+
+class TestCheckoutDebouncer:
+    def test_settled_checkout_switches_at_checkout_time(self, tracker):
+        debouncer = CheckoutDebouncer(tracker, clock=lambda: T0.timestamp(), sleep=lambda s: None)
+
+        result = debouncer.checkout("feature/login-page")
+
+        assert result.success
+        day = tracker.get_current_day()
+        assert day.current_task == "login-page"
+        assert day.spans[0].start == T0
+
+    def test_superseded_checkout_does_nothing(self, tracker):
+        debouncer = CheckoutDebouncer(tracker, clock=lambda: T0.timestamp(), sleep=lambda s: None)
+
+        first = debouncer.record("main")
+        second = debouncer.record("feature/x")
+
+        assert debouncer.settle(first) is None
+        assert tracker.get_current_day() is None
+        assert debouncer.settle(second).success
+        assert tracker.get_current_day().current_task == "x"
+
+    def test_burst_writes_once(self, tracker):
+        recorded = threading.Semaphore(0)
+        gate = threading.Event()
+
+        def sleep(seconds):
+            recorded.release()
+            gate.wait(5)
+
+        debouncer = CheckoutDebouncer(tracker, clock=lambda: T0.timestamp(), sleep=sleep)
+        results = []
+
+        with patch.object(tracker.storage, "save_day", wraps=tracker.storage.save_day) as save:
+            threads = []
+            for branch in ["main", "feature/a", "main", "feature/b"]:
+                thread = threading.Thread(target=lambda b=branch: results.append(debouncer.checkout(b)))
+                thread.start()
+                recorded.acquire(timeout=5)  # each checkout is recorded before the next
+                threads.append(thread)
+            gate.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert save.call_count == 1
+        assert [r.day.current_task for r in results if r is not None] == ["b"]
+
+
+class TestInstallGitHook:
+    def test_install_is_idempotent(self, repo):
+        hook = install_git_hook(repo)
+        install_git_hook(repo)
+
+        content = hook.read_text()
+        assert content.startswith("#!/bin/sh\n")
+        assert content.count(HOOK_BEGIN) == 1
+        assert hook.stat().st_mode & 0o111
+
+    def test_appends_to_existing_hook_and_uninstalls_cleanly(self, repo):
+        hook = repo / ".git" / "hooks" / "post-checkout"
+        hook.write_text("#!/bin/sh\necho existing\n")
+
+        install_git_hook(repo)
+        assert "echo existing" in hook.read_text()
+        assert HOOK_BEGIN in hook.read_text()
+
+        uninstall_git_hook(repo)
+        assert hook.read_text() == "#!/bin/sh\necho existing\n"
+
+    def test_uninstall_removes_hook_we_created(self, repo):
+        hook = install_git_hook(repo)
+
+        assert uninstall_git_hook(repo) == hook
+        assert not hook.exists()
+        assert uninstall_git_hook(repo) is None
+
+    def test_hook_exits_zero_on_detached_head(self, repo):
+        hook = install_git_hook(repo)
+
+        result = subprocess.run(["sh", str(hook), "a", "b", "0"], cwd=repo)
+
+        assert result.returncode == 0
+
+    def test_rejects_non_git_directory(self, tmp_path):
+        with pytest.raises(HookInstallError):
+            install_git_hook(tmp_path)
@@ -0,0 +1,237 @@
+"""Tests for iCalendar import and export."""
+
+import fcntl
+import io
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.ics import (
+    CalendarError,
+    CalendarEvent,
+    escape_text,
+    import_events,
+    iter_events,
+    parse_duration,
+    unescape_text,
+    unfold,
+    write_calendar,
+)
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage
+from time_surfer.tracker import Tracker
+
+NOW = datetime(2026, 2, 1, 12, 0)
+
+CALENDAR = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:standup-1\r
+SUMMARY:Standup\\, team A\r
+DTSTART:20260130T090000\r
+DTEND:20260130T091500\r
+BEGIN:VALARM\r
+TRIGGER:-PT10M\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Planning with a very long title that is folded over more than one content li\r
+ ne\r
+DTSTART;TZID="Europe/Berlin":20260130T140000\r
+DURATION:PT1H30M\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Holiday\r
+DTSTART;VALUE=DATE:20260129\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Cancelled sync\r
+STATUS:CANCELLED\r
+DTSTART:20260129T100000\r
+DTEND:20260129T110000\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+def _local(utc: datetime) -> datetime:
+    return utc.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+class TestParsing:
+    def test_unfold(self):
+        assert list(unfold(["A:b\r\n", " c\r\n", "\td\r\n", "E:f\r\n"])) == ["A:bcd", "E:f"]
+
+    def test_text_escapes_round_trip(self):
+        text = "a, b; c\\d\nnext"
+        assert unescape_text(escape_text(text)) == text
+
+    def test_duration(self):
+        assert parse_duration("PT1H30M").total_seconds() == 5400
+        assert parse_duration("P1DT2S").total_seconds() == 86402
+        with pytest.raises(CalendarError):
+            parse_duration("1 hour")
+
+    def test_iter_events(self):
+        events = list(iter_events(io.StringIO(CALENDAR, newline="")))
+
+        assert len(events) == 4
+        assert events[0] == CalendarEvent(
+            "Standup, team A", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 9, 15), "standup-1"
+        )
+        assert events[1].summary.endswith("content line")
+        assert events[1].start == _local(datetime(2026, 1, 30, 13))
+        assert (events[1].end - events[1].start).total_seconds() == 5400
+        assert events[2] is None and events[3] is None
+
+    def test_utc_times_become_local(self):
+        lines = ["BEGIN:VEVENT", "DTSTART:20260130T090000Z", "DTEND:20260130T100000Z", "END:VEVENT"]
+
+        (event,) = iter_events(lines)
+
+        assert event.start == _local(datetime(2026, 1, 30, 9))
+        assert event.summary == "(no title)"
+
+    def test_malformed_line(self):
+        with pytest.raises(CalendarError):
+            list(iter_events(["BEGIN:VEVENT", "garbage", "END:VEVENT"]))
+
+
+class TestImport:
+    def test_batched_import_merges_into_stored_days(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(
+            Day(
+                date="2026-01-30",
+                start_time=datetime(2026, 1, 30, 8),
+                end_time=datetime(2026, 1, 30, 12),
+                current_task="coding",
+                spans=[Span("coding", datetime(2026, 1, 30, 8), datetime(2026, 1, 30, 12))],
+            )
+        )
+        events = [
+            CalendarEvent("Standup", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 9, 15)),
+            CalendarEvent("Review", datetime(2026, 1, 29, 15), datetime(2026, 1, 29, 16)),
+            None,
+        ]
+
+        with patch.object(Storage, "save_day", side_effect=AssertionError("per-day save")):
+            result = import_events(storage, events, now=NOW)
+
+        assert (result.events, result.skipped, result.days) == (2, 1, 2)
+        day = storage.load_day("2026-01-30")
+        assert [(s.task, s.start.strftime("%H:%M")) for s in day.spans] == [
+            ("coding", "08:00"),
+            ("meeting: Standup", "09:00"),
+            ("coding", "09:15"),
+        ]
+        assert day.end_time == datetime(2026, 1, 30, 12)
+        assert storage.load_day("2026-01-29").spans[0].task == "meeting: Review"
+
+        again = import_events(storage, events, now=NOW)
+        assert again.days == 0
+
+    def test_holds_the_storage_lock_from_read_to_save(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        events = [CalendarEvent("Standup", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10))]
+
+        def save_days(days):
+            with open(storage.lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with patch.object(storage, "save_days", side_effect=save_days) as save:
+            import_events(storage, events, now=NOW)
+        assert save.called
+
+    @pytest.mark.parametrize("command", ["switch_to", "start"])
+    def test_tracking_later_that_day_keeps_imported_meetings(self, temp_data_file, command):
+        storage = Storage(temp_data_file)
+        events = [CalendarEvent("Standup", datetime(2026, 2, 1, 9), datetime(2026, 2, 1, 9, 15))]
+        import_events(storage, events, now=NOW)
+
+        tracker = Tracker(storage, clock=lambda: NOW)
+        result = tracker.switch_to("coding") if command == "switch_to" else tracker.start()
+
+        assert result.success
+        day = storage.load_day("2026-02-01")
+        assert day.is_active
+        standup = Span("meeting: Standup", datetime(2026, 2, 1, 9), datetime(2026, 2, 1, 9, 15))
+        assert day.spans[0] == standup
+        assert day.start_time == datetime(2026, 2, 1, 9)
+
+    def test_notes_follow_a_meeting_joined_with_a_reimport(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        standup = Span(
+            "meeting: Standup", datetime(2026, 1, 30, 9, 5), datetime(2026, 1, 30, 9, 20)
+        )
+        storage.save_day(Day(date="2026-01-30", start_time=standup.start, spans=[standup]))
+        notes = NoteStore(storage.notes_file)
+        notes.add(standup, note="demoed the importer")
+        events = [CalendarEvent("Standup", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 9, 15))]
+
+        import_events(storage, events, now=NOW)
+
+        (joined,) = storage.load_day("2026-01-30").spans
+        assert joined.start == datetime(2026, 1, 30, 9)
+        assert notes.get(joined).notes == ["demoed the importer"]
+
+    def test_unfinished_events_and_range(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        events = [
+            CalendarEvent("Later", datetime(2026, 2, 1, 11), datetime(2026, 2, 1, 13)),
+            CalendarEvent("Old", datetime(2025, 1, 1, 9), datetime(2025, 1, 1, 10)),
+            CalendarEvent("Kept", datetime(2026, 1, 5, 9), datetime(2026, 1, 5, 10)),
+        ]
+
+        result = import_events(storage, events, start_date="2026-01-01", now=NOW)
+
+        assert (result.events, result.skipped) == (1, 1)
+        assert [day.date for day in storage.iter_days()] == ["2026-01-05"]
+
+    def test_dry_run(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        events = [CalendarEvent("Standup", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10))]
+
+        assert import_events(storage, events, dry_run=True, now=NOW).days == 1
+        assert storage.load_day("2026-01-30") is None
+
+
+class TestExport:
+    def test_round_trip(self):
+        day = Day(
+            date="2026-01-30",
+            start_time=datetime(2026, 1, 30, 9),
+            spans=[
+                Span("coding, mostly", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10)),
+                Span("x" * 100, datetime(2026, 1, 30, 10), datetime(2026, 1, 30, 11)),
+                Span("email", datetime(2026, 1, 30, 11)),
+            ],
+        )
+        out = io.StringIO(newline="")
+
+        count = write_calendar([day], out, now=NOW)
+
+        text = out.getvalue()
+        assert count == 2
+        assert all(len(line.encode()) <= 75 for line in text.split("\r\n"))
+        events = list(iter_events(io.StringIO(text, newline="")))
+        assert [(e.summary, e.start, e.end) for e in events] == [
+            ("coding, mostly", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10)),
+            ("x" * 100, datetime(2026, 1, 30, 10), datetime(2026, 1, 30, 11)),
+        ]
+        assert events[0].uid.endswith("@time-surfer")
+
+    def test_folding_keeps_multibyte_characters_whole(self):
+        day = Day(
+            date="2026-01-30",
+            spans=[Span("é" * 60, datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10))],
+        )
+        out = io.StringIO(newline="")
+
+        write_calendar([day], out, now=NOW)
+
+        (event,) = iter_events(io.StringIO(out.getvalue(), newline=""))
+        assert event.summary == "é" * 60
@@ -0,0 +1,213 @@
+"""Tests for idle detection."""
+
+import os
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.idle import (
+    FakeActivitySource,
+    IdleDaemon,
+    ProcInterruptsSource,
+    TerminalActivitySource,
+)
+from time_surfer.storage import Durability, Storage
+from time_surfer.tracker import Tracker
+
+
+class FakeClock:
+    def __init__(self, start: float):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+T0 = datetime(2026, 1, 30, 9, 0, 0).timestamp()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(T0)
+
+
+@pytest.fixture
+def tracker(temp_data_file):
+    with patch("time_surfer.tracker.datetime") as mock_dt:
+        mock_dt.now.return_value = datetime(2026, 1, 30, 12, 0, 0)
+        yield Tracker(Storage(temp_data_file, durability=Durability.MEMORY))
+
+
+class TestProcInterruptsSource:
+    def _write(self, path, keyboard, mouse):
+        path.write_text(
+            "           CPU0       CPU1\n"
+            f"  1:    {keyboard}    0   IO-APIC   1-edge      i8042\n"
+            f" 12:    {mouse}    3   IO-APIC  12-edge      i8042\n"
+            "  9:    999    0   IO-APIC   9-fasteoi   acpi\n"
+        )
+
+    def test_reports_activity_when_counters_change(self, tmp_path, clock):
+        path = tmp_path / "interrupts"
+        self._write(path, 10, 20)
+        source = ProcInterruptsSource(path, clock=clock)
+
+        assert source.last_activity() is None  # baseline
+        clock.now += 30
+        assert source.last_activity() is None  # unchanged
+
+        self._write(path, 11, 20)
+        clock.now += 30
+        assert source.last_activity() == T0 + 30  # dated at the previous sample
+        clock.now += 30
+        assert source.last_activity() == T0 + 30
+
+    def test_ignores_non_input_interrupts(self, tmp_path, clock):
+        path = tmp_path / "interrupts"
+        self._write(path, 10, 20)
+        source = ProcInterruptsSource(path, clock=clock)
+        source.last_activity()
+
+        path.write_text(path.read_text().replace("999", "1000"))
+        assert source.last_activity() is None
+
+    def test_missing_file(self, tmp_path):
+        assert ProcInterruptsSource(tmp_path / "missing").last_activity() is None
+
+
+class TestTerminalActivitySource:
+    def test_reports_latest_tty_access_time(self, tmp_path):
+        for name, atime in [("0", 100.0), ("1", 200.0)]:
+            (tmp_path / name).touch()
+            os.utime(tmp_path / name, (atime, atime))
+
+        source = TerminalActivitySource((str(tmp_path / "[0-9]*"),))
+        assert source.last_activity() == 200.0
+
+    def test_no_ttys(self, tmp_path):
+        assert TerminalActivitySource((str(tmp_path / "none*"),)).last_activity() is None
+
+
+class TestIdleDaemon:
+    def _daemon(self, tracker, source, clock, **kwargs):
+        return IdleDaemon(tracker, [source], threshold=300, clock=clock, **kwargs)
+
+    def test_sleeps_until_threshold_deadline(self, tracker, clock):
+        source = FakeActivitySource(clock)
+        daemon = self._daemon(tracker, source, clock)
+
+        clock.now += 100
+        assert daemon.step() == 200
+        source.touch()
+        assert daemon.step() == 300
+
+    def test_sampled_source_bounds_sleep(self, tracker, clock, tmp_path):
+        path = tmp_path / "interrupts"
+        path.write_text("           CPU0\n  1:    10   IO-APIC   1-edge      i8042\n")
+        source = ProcInterruptsSource(path, clock=clock, resolution=10)
+
+        assert self._daemon(tracker, source, clock).step() == 10
+        assert IdleDaemon(tracker, [source], threshold=8, clock=clock).step() == 4
+
+    def test_sampled_input_pauses_within_resolution(self, tracker, clock, tmp_path):
+        tracker.switch_to("coding", at=datetime.fromtimestamp(T0))
+        path = tmp_path / "interrupts"
+        source = ProcInterruptsSource(path, clock=clock, resolution=10)
+        daemon = self._daemon(tracker, source, clock)
+
+        # Typing between every two samples until the one at T0 + 90: never idle
+        # while typing, and closed at the sample before the last keystroke.
+        for count in range(11):
+            clock.now = T0 + 10 * count
+            if count < 10:
+                path.write_text(f"           CPU0\n  1:    {count}   IO-APIC   1-edge      i8042\n")
+            daemon.step()
+            assert not daemon.is_idle
+        while not daemon.is_idle:
+            clock.now += daemon.step()
+
+        assert tracker.get_current_day().spans[0].end == datetime.fromtimestamp(T0 + 80)
+
+    def test_pauses_at_last_activity_then_resumes(self, tracker, clock):
+        tracker.switch_to("coding", at=datetime.fromtimestamp(T0))
+        source = FakeActivitySource(clock)
+        daemon = self._daemon(tracker, source, clock)
+        source.touch(T0 + 60)
+
+        clock.now = T0 + 60 + 300
+        daemon.step()
+
+        assert daemon.is_idle
+        day = tracker.get_current_day()
+        assert day.current_task is None
+        assert day.spans[0].end == datetime.fromtimestamp(T0 + 60)
+
+        source.touch(clock.now)
+        daemon.step()
+
+        assert not daemon.is_idle
+        assert tracker.get_current_day().current_task == "coding"
+
+    def test_switches_to_idle_task(self, tracker, clock):
+        tracker.switch_to("coding", at=datetime.fromtimestamp(T0))
+        source = FakeActivitySource(clock)
+        daemon = self._daemon(tracker, source, clock, idle_task="idle")
+
+        clock.now = T0 + 301
+        daemon.step()
+        assert tracker.get_current_day().current_task == "idle"
+
+        source.touch()
+        daemon.step()
+        assert tracker.get_current_day().current_task == "coding"
+
+    def test_does_not_override_manual_switch_during_idle(self, tracker, clock):
+        tracker.switch_to("coding", at=datetime.fromtimestamp(T0))
+        source = FakeActivitySource(clock)
+        daemon = self._daemon(tracker, source, clock, idle_task="idle")
+
+        clock.now = T0 + 301
+        daemon.step()
+        tracker.switch_to("lunch")
+
+        source.touch()
+        daemon.step()
+        assert tracker.get_current_day().current_task == "lunch"
+
+    def test_idle_without_running_day_does_not_spin(self, tracker, clock):
+        daemon = self._daemon(tracker, FakeActivitySource(clock), clock, idle_poll_interval=5)
+
+        clock.now = T0 + 301
+        assert daemon.step() == 5
+        assert tracker.get_current_day() is None
+
+    def test_run_wakes_on_source_activity_and_stops(self, tracker):
+        source = FakeActivitySource()
+        daemon = IdleDaemon(tracker, [source], threshold=3600)
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+
+        source.touch()
+        daemon.stop()
+        thread.join(timeout=2)
+
+        assert not thread.is_alive()
+        daemon.close()
+
+
+class TestTrackerPause:
+    def test_pause_fails_without_task(self, tracker):
+        tracker.start()
+        result = tracker.pause()
+        assert result.success is False
+        assert result.message == "No task to pause"
+
+    def test_backdated_pause_is_clamped_to_span_start(self, tracker):
+        tracker.switch_to("coding", at=datetime.fromtimestamp(T0))
+        day = tracker.get_current_day()
+        span_start = day.spans[0].start
+
+        tracker.pause(at=datetime.fromtimestamp(T0 - 3600))
+        assert tracker.get_current_day().spans[0].end == span_start
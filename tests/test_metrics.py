@@ -0,0 +1,172 @@
+"""Tests for operational metrics."""
+
+import threading
+from unittest.mock import patch
+
+from time_surfer.metrics import (
+    Metrics,
+    TimedLock,
+    empty_state,
+    load_state,
+    merge_state,
+    persist,
+    record,
+    render,
+    series_key,
+)
+
+
+class TestMetrics:
+    def test_histogram_buckets(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            metrics.observe("time_surfer_command_duration_seconds", value, command="report")
+
+        hist = metrics.snapshot()["histograms"][
+            'time_surfer_command_duration_seconds{command="report"}'
+        ]
+        assert hist["counts"] == [2, 1, 1]
+        assert hist["sum"] == 3.65
+
+    def test_counters_gauges_and_drain(self):
+        metrics = Metrics()
+        metrics.inc("time_surfer_days_parsed_total")
+        metrics.inc("time_surfer_days_parsed_total", 2)
+        metrics.set("time_surfer_storage_bytes", 10)
+        metrics.set("time_surfer_storage_bytes", 20)
+
+        state = metrics.drain()
+
+        assert state["counters"] == {"time_surfer_days_parsed_total": 3.0}
+        assert state["gauges"] == {"time_surfer_storage_bytes": 20}
+        assert metrics.snapshot() == empty_state()
+
+    def test_series_key_escapes_label_values(self):
+        assert series_key("m", {"b": "2", "a": 'say "hi"'}) == 'm{a="say \\"hi\\"",b="2"}'
+
+    def test_merge_adds_histograms_and_counters_and_replaces_gauges(self):
+        first, second = Metrics(), Metrics()
+        for metrics, value in ((first, 0.001), (second, 0.2)):
+            metrics.observe("time_surfer_storage_write_seconds", value)
+            metrics.inc("time_surfer_days_parsed_total")
+            metrics.set("time_surfer_day_spans", value)
+
+        merged = merge_state(first.snapshot(), second.snapshot())
+
+        hist = merged["histograms"]["time_surfer_storage_write_seconds"]
+        assert sum(hist["counts"]) == 2
+        assert merged["counters"]["time_surfer_days_parsed_total"] == 2
+        assert merged["gauges"]["time_surfer_day_spans"] == 0.2
+
+
+class TestRender:
+    def test_prometheus_text_format(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.observe("time_surfer_command_duration_seconds", 0.5, command="stop")
+        metrics.set("time_surfer_storage_bytes", 2048)
+
+        text = render(metrics.snapshot(), buckets=(0.1, 1.0))
+
+        assert text.splitlines() == [
+            "# HELP time_surfer_command_duration_seconds Wall time of a command.",
+            "# TYPE time_surfer_command_duration_seconds histogram",
+            'time_surfer_command_duration_seconds_bucket{command="stop",le="0.1"} 0',
+            'time_surfer_command_duration_seconds_bucket{command="stop",le="1"} 1',
+            'time_surfer_command_duration_seconds_bucket{command="stop",le="+Inf"} 1',
+            'time_surfer_command_duration_seconds_sum{command="stop"} 0.5',
+            'time_surfer_command_duration_seconds_count{command="stop"} 1',
+            "# HELP time_surfer_storage_bytes Size of the data file.",
+            "# TYPE time_surfer_storage_bytes gauge",
+            "time_surfer_storage_bytes 2048",
+        ]
+
+
+class TestPersist:
+    def test_accumulates_across_processes_and_writes_textfile(self, tmp_path):
+        path = tmp_path / "cache" / "metrics.json"
+        textfile = tmp_path / "node" / "time_surfer.prom"
+        for _ in range(2):
+            metrics = Metrics()
+            metrics.inc("time_surfer_days_parsed_total", 5)
+            persist(path, metrics, textfile=textfile)
+
+        assert load_state(path)["counters"] == {"time_surfer_days_parsed_total": 10.0}
+        assert "time_surfer_days_parsed_total 10\n" in textfile.read_text()
+        assert metrics.snapshot() == empty_state()
+
+    def test_unreadable_state_starts_afresh(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        path.write_text("not json")
+
+        assert load_state(path) == empty_state()
+        metrics = Metrics()
+        metrics.inc("time_surfer_days_parsed_total")
+        assert persist(path, metrics)["counters"] == {"time_surfer_days_parsed_total": 1.0}
+
+    def test_write_failure_is_ignored(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        metrics = Metrics()
+        metrics.inc("time_surfer_days_parsed_total")
+
+        assert persist(blocker / "metrics.json", metrics) is None
+
+
+class TestRecord:
+    def test_appends_pending_samples_that_readers_include(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        for _ in range(3):
+            metrics = Metrics()
+            metrics.inc("time_surfer_days_parsed_total", 2)
+            record(path, metrics)
+
+        assert not path.exists()
+        assert load_state(path)["counters"] == {"time_surfer_days_parsed_total": 6.0}
+
+    def test_pending_samples_are_folded_once_large(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        with patch("time_surfer.metrics.PENDING_MAX_BYTES", 100):
+            for _ in range(5):
+                metrics = Metrics()
+                metrics.inc("time_surfer_days_parsed_total")
+                record(path, metrics)
+
+        assert path.exists()
+        assert load_state(path)["counters"] == {"time_surfer_days_parsed_total": 5.0}
+
+    def test_persist_folds_pending_samples_once(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        metrics = Metrics()
+        metrics.inc("time_surfer_days_parsed_total")
+        record(path, metrics)
+        persist(path, Metrics())
+
+        assert load_state(path)["counters"] == {"time_surfer_days_parsed_total": 1.0}
+        assert [p.name for p in tmp_path.glob("metrics.json.pending*")] == []
+
+
+class TestTimedLock:
+    def test_uncontended_acquire_records_nothing(self):
+        metrics = Metrics()
+        lock = TimedLock("storage", metrics=metrics)
+        with lock:
+            with lock:
+                pass
+
+        assert metrics.snapshot() == empty_state()
+
+    def test_counts_waits(self):
+        metrics = Metrics()
+        lock = TimedLock("storage", threading.Lock(), metrics=metrics)
+        lock.acquire()
+        assert lock.acquire(blocking=False) is False
+
+        waiter = threading.Thread(target=lambda: (lock.acquire(), lock.release()))
+        waiter.start()
+        threading.Event().wait(0.05)
+        lock.release()
+        waiter.join(5)
+
+        counters = metrics.snapshot()["counters"]
+        assert counters['time_surfer_lock_contended_total{lock="storage"}'] == 1
+        assert counters['time_surfer_lock_wait_seconds_total{lock="storage"}'] > 0
@@ -0,0 +1,162 @@
+"""Tests for schema migration."""
+
+import fcntl
+import io
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.migrate import iter_legacy_records, migrate_file
+from time_surfer.storage import (
+    SCHEMA_VERSION,
+    CorruptDataError,
+    Storage,
+    UnsupportedSchemaError,
+    decode_record,
+)
+
+
+LEGACY = {
+    "2026-01-30": {
+        "date": "2026-01-30",
+        "start_time": "2026-01-30T09:00:00",
+        "end_time": "2026-01-30T17:00:00",
+        "current_task": None,
+        "spans": [
+            {"task": "coding", "start": "2026-01-30T09:00:00", "end": "2026-01-30T17:00:00"}
+        ],
+    },
+    "2026-01-31": {
+        "date": "2026-01-31",
+        "start_time": "2026-01-31T09:00:00",
+        "end_time": None,
+        "spans": [{"task": "review {\"quoted\"}", "start": "2026-01-31T09:00:00", "end": None}],
+    },
+}
+
+
+@pytest.fixture
+def legacy_file(temp_data_file):
+    temp_data_file.parent.mkdir(parents=True)
+    temp_data_file.write_text(json.dumps(LEGACY, indent=2))
+    return temp_data_file
+
+
+class TestIterLegacyRecords:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def test_streams_records_regardless_of_chunk_size(self, chunk_size):
+        text = json.dumps(LEGACY, indent=2)
+        records = list(iter_legacy_records(io.StringIO(text), chunk_size=chunk_size))
+
+        assert [r["date"] for r in records] == ["2026-01-30", "2026-01-31"]
+        assert records[1]["spans"][0]["task"] == 'review {"quoted"}'
+
+    def test_empty_object(self):
+        assert list(iter_legacy_records(io.StringIO(" { } "))) == []
+
+    def test_truncated_file_raises(self):
+        text = json.dumps(LEGACY)[:-20]
+        with pytest.raises(ValueError):
+            list(iter_legacy_records(io.StringIO(text), chunk_size=16))
+
+
+class TestMigrateFile:
+    def test_migrates_legacy_file(self, legacy_file):
+        result = migrate_file(legacy_file)
+
+        assert result.migrated
+        assert result.from_version == 1
+        assert result.to_version == SCHEMA_VERSION
+        assert result.days == 2
+
+        first_line = legacy_file.read_text().splitlines()[0]
+        assert json.loads(first_line) == {"schema_version": SCHEMA_VERSION}
+
+        day = Storage(legacy_file).load_day("2026-01-31")
+        assert day.current_task is None
+        assert day.spans[0].end is None
+
+    def test_keeps_backup_of_original(self, legacy_file):
+        original = legacy_file.read_text()
+        result = migrate_file(legacy_file)
+
+        assert result.backup_file.read_text() == original
+
+    def test_no_backup(self, legacy_file):
+        result = migrate_file(legacy_file, backup=False)
+
+        assert result.backup_file is None
+        assert [p.name for p in legacy_file.parent.glob("*.bak")] == []
+
+    def test_dry_run_does_not_rewrite(self, legacy_file):
+        original = legacy_file.read_text()
+        result = migrate_file(legacy_file, dry_run=True)
+
+        assert result.days == 2
+        assert legacy_file.read_text() == original
+
+    def test_adds_checksums_to_version_2_file(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        lines = [json.dumps({"schema_version": 2})]
+        lines += [json.dumps(LEGACY[date], separators=(",", ":")) for date in sorted(LEGACY)]
+        temp_data_file.write_text("\n".join(lines) + "\n")
+        result = migrate_file(temp_data_file)
+
+        assert (result.from_version, result.days) == (2, 2)
+        records = temp_data_file.read_text().splitlines()[1:]
+        assert [decode_record(line) for line in records] == [LEGACY[d] for d in sorted(LEGACY)]
+
+    def test_sorts_legacy_records_by_date(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        unsorted = {date: LEGACY[date] for date in sorted(LEGACY, reverse=True)}
+        temp_data_file.write_text(json.dumps(unsorted))
+        migrate_file(temp_data_file)
+
+        records = temp_data_file.read_text().splitlines()[1:]
+        assert [decode_record(line)["date"] for line in records] == sorted(LEGACY)
+        assert Storage(temp_data_file).load_day("2026-01-30") is not None
+
+    def test_out_of_order_version_2_file_is_rejected(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        lines = [json.dumps({"schema_version": 2})]
+        lines += [json.dumps(LEGACY[d]) for d in sorted(LEGACY, reverse=True)]
+        temp_data_file.write_text("\n".join(lines) + "\n")
+        before = temp_data_file.read_text()
+
+        with pytest.raises(CorruptDataError, match="out of date order"):
+            migrate_file(temp_data_file)
+        assert temp_data_file.read_text() == before
+
+    def test_holds_the_storage_lock_while_rewriting(self, legacy_file):
+        def write(path, write, fsync=False):
+            with open(Storage(legacy_file).lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with patch("time_surfer.migrate.atomic_write", side_effect=write) as atomic_write:
+            migrate_file(legacy_file)
+        assert atomic_write.called
+
+    def test_current_file_is_left_alone(self, temp_data_file):
+        Storage(temp_data_file).save_day(
+            Storage(temp_data_file)._dict_to_day(LEGACY["2026-01-30"])
+        )
+        before = temp_data_file.read_text()
+        result = migrate_file(temp_data_file)
+
+        assert not result.migrated
+        assert temp_data_file.read_text() == before
+
+    def test_missing_file(self, temp_data_file):
+        result = migrate_file(temp_data_file)
+        assert result.from_version is None
+        assert not result.migrated
+
+    def test_newer_schema_is_rejected(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text(json.dumps({"schema_version": SCHEMA_VERSION + 1}) + "\n")
+
+        with pytest.raises(UnsupportedSchemaError):
+            migrate_file(temp_data_file)
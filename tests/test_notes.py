@@ -0,0 +1,156 @@
+"""Tests for span annotations."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.notes import (
+    NoteStore,
+    SpanNote,
+    describe,
+    find_span,
+    parse_metadata,
+    rekey_spans,
+    span_id,
+    span_label,
+)
+
+
+def make_span(task="coding", hour=9, minute=0, end=True):
+    start = datetime(2026, 1, 30, hour, minute)
+    return Span(task, start, datetime(2026, 1, 30, hour + 1, 0) if end else None)
+
+
+class TestSpanId:
+    def test_depends_on_task_and_start_only(self):
+        closed = make_span()
+        open_span = make_span(end=False)
+
+        assert span_id(closed) == span_id(open_span)
+        assert len(span_id(closed)) == 10
+        assert span_id(closed) != span_id(make_span("email"))
+        assert span_id(closed) != span_id(make_span(minute=1))
+
+
+class TestParseMetadata:
+    def test_parses_pairs(self):
+        assert parse_metadata(["pr=481", " env = a=b"]) == {"pr": "481", "env": " a=b"}
+
+    @pytest.mark.parametrize("item", ["nokey", "=value"])
+    def test_rejects_malformed_items(self, item):
+        with pytest.raises(ValueError, match="KEY=VALUE"):
+            parse_metadata([item])
+
+
+class TestNoteStore:
+    def test_add_and_load(self, tmp_path):
+        store = NoteStore(tmp_path / "notes.jsonl")
+        span = make_span()
+
+        store.add(span, note="pairing", ticket="OPS-12", metadata={"pr": "481"})
+        store.add(span, note="review", ticket="OPS-12", metadata={"pr": "482"})
+
+        assert store.get(span) == SpanNote(
+            span_id(span), "2026-01-30", ["pairing", "review"], ["OPS-12"], {"pr": "482"}
+        )
+
+    def test_changes_are_appended(self, tmp_path):
+        store = NoteStore(tmp_path / "notes.jsonl")
+        store.add(make_span(), note="one")
+        store.add(make_span("email"), ticket="T-1")
+
+        lines = store.path.read_text().splitlines()
+
+        assert [json.loads(line) for line in lines] == [
+            {"id": span_id(make_span()), "date": "2026-01-30", "note": "one"},
+            {"id": span_id(make_span("email")), "date": "2026-01-30", "ticket": "T-1"},
+        ]
+
+    def test_clear_drops_earlier_annotations(self, tmp_path):
+        store = NoteStore(tmp_path / "notes.jsonl")
+        span = make_span()
+        store.add(span, note="old")
+        store.add(span, clear=True)
+
+        assert store.get(span) is None
+
+        store.add(span, clear=True, note="new")
+        assert store.get(span).notes == ["new"]
+
+    def test_load_filters_by_date_and_skips_torn_lines(self, tmp_path):
+        store = NoteStore(tmp_path / "notes.jsonl")
+        today = make_span()
+        other = Span("coding", datetime(2026, 1, 31, 9, 0))
+        store.add(today, note="a")
+        store.add(other, note="b")
+        with open(store.path, "a") as f:
+            f.write('{"id": "trunc')
+
+        assert list(store.load("2026-01-30")) == [span_id(today)]
+        assert set(store.load()) == {span_id(today), span_id(other)}
+
+    def test_missing_file_loads_empty(self, tmp_path):
+        assert NoteStore(tmp_path / "notes.jsonl").load() == {}
+
+    def test_carry_over_moves_annotations_to_the_replacing_span(self, tmp_path):
+        store = NoteStore(tmp_path / "notes.jsonl")
+        first, second = make_span(hour=9), make_span(hour=10)
+        store.add(first, note="start", metadata={"pr": "1"})
+        store.add(second, note="finish", ticket="OPS-12", metadata={"pr": "2"})
+        joined = Span("coding", first.start, second.end)
+        before = Day(date="2026-01-30", spans=[first, second])
+        after = Day(date="2026-01-30", spans=[joined])
+
+        assert store.carry_over([(before, after)]) == 1
+
+        assert store.get(joined) == SpanNote(
+            span_id(joined), "2026-01-30", ["start", "finish"], ["OPS-12"], {"pr": "2"}
+        )
+        assert store.get(second) is None
+        assert store.carry_over([(before, after)]) == 0
+
+
+class TestRekeySpans:
+    def test_unchanged_spans_keep_their_ids(self):
+        spans = [make_span(hour=9), make_span("email", hour=10)]
+        assert rekey_spans(spans, spans) == {}
+
+    def test_moves_to_the_span_covering_its_start(self):
+        coding = make_span(hour=9)
+        moved = Span("coding", datetime(2026, 1, 30, 9, 30), datetime(2026, 1, 30, 10, 0))
+        meeting = Span("meeting", datetime(2026, 1, 30, 9, 15), datetime(2026, 1, 30, 10, 30))
+        resumed = Span("coding", coding.start, meeting.start)
+
+        # A cut span keeps its task and start, and so its id.
+        assert rekey_spans([coding, moved], [resumed, meeting]) == {
+            span_id(moved): span_id(meeting)
+        }
+
+    def test_dropped_span_goes_to_the_one_before_it(self):
+        kept = make_span(hour=9)
+        blip = Span("email", kept.end, kept.end)
+
+        assert rekey_spans([kept, blip], [kept]) == {span_id(blip): span_id(kept)}
+        assert rekey_spans([blip], []) == {}
+
+
+class TestHelpers:
+    def test_find_span_by_prefix(self):
+        spans = [make_span(), make_span("email", hour=10)]
+
+        assert find_span(spans, span_id(spans[1])[:6]) is spans[1]
+        assert find_span(spans, "zzzz") is None
+        with pytest.raises(ValueError, match="ambiguous"):
+            find_span(spans, "")
+
+    def test_describe(self):
+        note = SpanNote("id", "2026-01-30", ["pairing", "review"], ["OPS-12"], {"pr": "481"})
+
+        assert describe(note) == "OPS-12 pr=481: pairing; review"
+        assert describe(SpanNote("id", "2026-01-30", notes=["only"])) == "only"
+
+    def test_span_label(self):
+        assert span_label(make_span()) == "09:00-10:00"
+        assert span_label(make_span(end=False)) == "09:00-..."
@@ -0,0 +1,84 @@
+"""Tests for the shell prompt segment."""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+from unittest.mock import patch
+
+import time_surfer
+from time_surfer.prompt import encode_status, read_status, render
+from time_surfer.storage import Durability, Storage
+from time_surfer.tracker import Tracker
+
+
+class TestStatusFile:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "status"
+        path.write_text(encode_status("code review", 1769763600.0))
+
+        assert read_status(str(path)) == ("code review", 1769763600.0)
+
+    def test_empty_status_means_nothing_running(self, tmp_path):
+        path = tmp_path / "status"
+        path.write_text(encode_status(None, None))
+
+        assert read_status(str(path)) is None
+
+    def test_missing_or_garbled_file(self, tmp_path):
+        assert read_status(str(tmp_path / "missing")) is None
+        (tmp_path / "bad").write_text("not-a-number\ttask\n")
+        assert read_status(str(tmp_path / "bad")) is None
+
+
+class TestRender:
+    def test_renders_task_and_elapsed(self, tmp_path):
+        path = tmp_path / "status"
+        path.write_text(encode_status("coding", 1000.0))
+
+        assert render(str(path), now=1000.0 + 3900) == "coding 1:05"
+
+    def test_renders_nothing_when_idle(self, tmp_path):
+        assert render(str(tmp_path / "status")) == ""
+
+    def test_does_not_import_heavy_modules(self):
+        code = (
+            "import sys, time_surfer.prompt; "
+            "print(sorted(m for m in ('typer', 'rich', 'json') if m in sys.modules))"
+        )
+        src = os.path.dirname(os.path.dirname(time_surfer.__file__))
+        env = {**os.environ, "PYTHONPATH": src}
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+        ).stdout
+        assert output.strip() == "[]"
+
+
+class TestTrackerUpdatesStatus:
+    def test_switch_pause_and_stop_update_status(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        tracker = Tracker(storage)
+        status = str(storage.status_file)
+
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.switch_to("coding")
+            assert read_status(status) == ("coding", datetime(2026, 1, 30, 9, 0).timestamp())
+
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 30, 0)
+            tracker.switch_to("email")
+            assert read_status(status) == ("email", datetime(2026, 1, 30, 9, 30).timestamp())
+
+            tracker.pause()
+            assert read_status(status) is None
+
+            tracker.switch_to("coding")
+            mock_dt.now.return_value = datetime(2026, 1, 30, 17, 0, 0)
+            tracker.stop()
+            assert read_status(status) is None
+
+    def test_memory_storage_writes_no_status(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.MEMORY)
+        Tracker(storage).switch_to("coding")
+
+        assert not storage.status_file.exists()
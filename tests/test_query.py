@@ -0,0 +1,108 @@
+"""Tests for report filter expressions."""
+
+from datetime import datetime
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.query import QueryError, compile_query, tokenize
+
+
+class TestTokenize:
+    def test_tokens(self):
+        tokens = tokenize('task ~ "code review" and duration>=10m')
+
+        assert [(t.kind, t.text) for t in tokens] == [
+            ("word", "task"),
+            ("op", "~"),
+            ("string", "code review"),
+            ("word", "and"),
+            ("word", "duration"),
+            ("op", ">="),
+            ("word", "10m"),
+        ]
+
+    def test_unterminated_string(self):
+        with pytest.raises(QueryError):
+            tokenize('task = "oops')
+
+
+class TestCompileQuery:
+    def test_task_comparisons(self):
+        assert compile_query('task = "email"').matches("email", 60, "2026-09-01")
+        assert not compile_query("task != email").matches("email", 60, "2026-09-01")
+        assert compile_query("task ~ REVIEW").matches("code review", 60, "2026-09-01")
+        assert compile_query("task !~ ^code").matches("email", 60, "2026-09-01")
+
+    def test_duration_and_date(self):
+        query = compile_query("duration > 10m and date >= 2026-09-01")
+
+        assert query.matches("x", 601, "2026-09-01")
+        assert not query.matches("x", 600, "2026-09-01")
+        assert not query.matches("x", 3600, "2026-08-31")
+
+    def test_precedence_and_parentheses(self):
+        loose = compile_query("task = a or task = b and duration > 1h")
+        grouped = compile_query("(task = a or task = b) and duration > 1h")
+
+        assert loose.matches("a", 60, "2026-09-01")
+        assert not grouped.matches("a", 60, "2026-09-01")
+        assert compile_query("not task = a").matches("b", 60, "2026-09-01")
+
+    def test_keywords_are_case_insensitive(self):
+        assert compile_query("TASK = a AND NOT duration < 1m").matches("a", 60, "2026-09-01")
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "task",
+            "task =",
+            "project = x",
+            "task > x",
+            "duration > soon",
+            "date = yesterday",
+            "task ~ (",
+            "(task = a",
+            "task = a b",
+            "task ~ '['",
+        ],
+    )
+    def test_invalid_expressions(self, text):
+        with pytest.raises(QueryError):
+            compile_query(text)
+
+
+class TestDateBounds:
+    def test_conjunction_narrows_range(self):
+        query = compile_query("date >= 2026-09-01 and date < 2026-10-01 and task = a")
+
+        assert (query.start_date, query.end_date) == ("2026-09-01", "2026-09-30")
+
+    def test_strict_lower_bound(self):
+        assert compile_query("date > 2026-09-30").start_date == "2026-10-01"
+
+    def test_disjunction_widens_range(self):
+        query = compile_query("date = 2026-09-01 or date = 2026-09-05")
+
+        assert (query.start_date, query.end_date) == ("2026-09-01", "2026-09-05")
+
+    def test_unbounded_branch_or_negation_disables_range(self):
+        assert compile_query("date = 2026-09-01 or task = a").start_date is None
+        assert compile_query("not date < 2026-09-01").start_date is None
+
+
+class TestTaskTotals:
+    def test_filters_spans_before_aggregating(self):
+        day = Day(date="2026-09-01", start_time=datetime(2026, 9, 1, 9, 0))
+        day.spans = [
+            Span(task="code review", start=datetime(2026, 9, 1, 9, 0), end=datetime(2026, 9, 1, 9, 5)),
+            Span(task="email", start=datetime(2026, 9, 1, 9, 5), end=datetime(2026, 9, 1, 10, 0)),
+            Span(task="code review", start=datetime(2026, 9, 1, 10, 0), end=datetime(2026, 9, 1, 10, 30)),
+            Span(task="code review", start=datetime(2026, 9, 1, 11, 0)),
+        ]
+        query = compile_query('task ~ "review" and duration > 10m')
+
+        totals = query.task_totals([day], now=datetime(2026, 9, 1, 11, 20))
+
+        assert totals == {"code review": 1800 + 1200}
@@ -0,0 +1,177 @@
+"""Tests for the HTTP JSON API server."""
+
+import http.client
+import json
+import threading
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from time_surfer.server import MAX_BODY_BYTES, TrackerServer
+from time_surfer.storage import Storage
+from time_surfer.threadsafe import CachingStorage, ThreadSafeTracker
+
+
+@pytest.fixture
+def server(temp_data_file):
+    server = TrackerServer(("127.0.0.1", 0), ThreadSafeTracker(CachingStorage(temp_data_file)))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def conn(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    yield conn
+    conn.close()
+
+
+def _request(conn, method, path, body=None, headers=None):
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+class TestTrackerServer:
+    def test_switch_show_report_stop(self, conn):
+        status, body = _request(conn, "POST", "/switch-to", {"task": "coding"})
+        assert status == 200
+        assert body["message"].startswith("Switched to 'coding'")
+
+        status, body = _request(conn, "GET", "/show")
+        assert status == 200
+        assert body["message"] == "Working on 'coding'"
+        assert body["day"]["current_task"] == "coding"
+        assert "current_task_seconds" in body
+
+        status, body = _request(conn, "GET", "/report")
+        assert status == 200
+        assert "coding" in body["task_totals"]
+
+        status, body = _request(conn, "POST", "/stop")
+        assert status == 200
+        assert body["day"]["end_time"] is not None
+
+    def test_connection_is_kept_alive(self, conn):
+        _request(conn, "POST", "/start")
+        sock = conn.sock
+        _request(conn, "GET", "/show")
+        assert conn.sock is sock
+
+    def test_failed_operation_returns_conflict(self, conn):
+        status, body = _request(conn, "POST", "/stop")
+        assert status == 409
+        assert body == {"success": False, "message": "Day not started", "day": None, "task_totals": None}
+
+    def test_switch_to_requires_task(self, conn):
+        status, body = _request(conn, "POST", "/switch-to", {})
+        assert status == 400
+        assert "task" in body["message"]
+
+    def test_invalid_json_is_rejected(self, conn):
+        headers = {"Content-Type": "application/json"}
+        conn.request("POST", "/start", body=b"not json", headers=headers)
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+
+    @pytest.mark.parametrize(
+        "content_type", [None, "text/plain", "application/x-www-form-urlencoded"]
+    )
+    def test_post_requires_json_content_type(self, conn, temp_data_file, content_type):
+        headers = {"Content-Type": content_type} if content_type else {}
+        conn.request("POST", "/switch-to", body=b'{"task": "coding"}', headers=headers)
+        response = conn.getresponse()
+        response.read()
+
+        assert response.status == 415
+        assert not temp_data_file.exists()
+
+    @pytest.mark.parametrize(
+        "origin", ["https://evil.example", "http://localhost:1", "null", "http://[::1"]
+    )
+    def test_foreign_origin_is_rejected(self, conn, temp_data_file, origin):
+        status, body = _request(conn, "POST", "/start", headers={"Origin": origin})
+
+        assert status == 403
+        assert body["message"] == "Origin not allowed"
+        assert not temp_data_file.exists()
+
+    def test_own_and_allowed_origins_are_accepted(self, server, conn):
+        port = server.server_address[1]
+        server.allowed_origins = {"chrome-extension://abc"}
+
+        own = {"Origin": f"http://localhost:{port}"}
+        assert _request(conn, "POST", "/start", headers=own)[0] == 200
+        extension = {"Origin": "chrome-extension://abc"}
+        assert _request(conn, "GET", "/show", headers=extension)[0] == 200
+
+    @pytest.mark.parametrize("host", ["evil.example", "evil.example:8765", "127.0.0.1.nip.io"])
+    def test_non_local_host_is_rejected(self, conn, host):
+        conn.putrequest("GET", "/show", skip_host=True)
+        conn.putheader("Host", host)
+        conn.endheaders()
+        response = conn.getresponse()
+
+        assert response.status == 403
+        assert json.loads(response.read())["message"] == "Host not allowed"
+
+    def test_unexpected_error_returns_json_500(self, server, conn):
+        server.tracker.start = Mock(side_effect=RuntimeError("boom"))
+
+        status, body = _request(conn, "POST", "/start")
+
+        assert status == 500
+        assert body == {"success": False, "message": "Internal server error"}
+
+    @pytest.mark.parametrize("length", ["abc", "-1", "1.5", "+5"])
+    def test_invalid_content_length_is_rejected(self, conn, temp_data_file, length):
+        conn.putrequest("POST", "/start")
+        conn.putheader("Content-Type", "application/json")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        response = conn.getresponse()
+
+        assert response.status == 400
+        assert json.loads(response.read())["message"] == "Invalid Content-Length"
+        assert not temp_data_file.exists()
+
+    def test_oversized_body_is_rejected(self, conn, temp_data_file):
+        body = json.dumps({"task": "x" * (MAX_BODY_BYTES + 1)}).encode()
+        conn.request("POST", "/switch-to", body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+
+        assert response.status == 413
+        assert response.getheader("Connection") == "close"
+        assert not temp_data_file.exists()
+
+    def test_unknown_path_returns_not_found(self, conn):
+        status, _ = _request(conn, "GET", "/nope")
+        assert status == 404
+
+    def test_writes_through_to_storage(self, conn, temp_data_file):
+        _request(conn, "POST", "/switch-to", {"task": "coding"})
+
+        date = datetime.now().strftime("%Y-%m-%d")
+        assert Storage(temp_data_file).load_day(date).current_task == "coding"
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_latencies(self, conn):
+        _request(conn, "POST", "/switch-to", {"task": "coding"})
+
+        conn.request("GET", "/metrics")
+        response = conn.getresponse()
+        text = response.read().decode()
+
+        assert response.status == 200
+        assert response.getheader("Content-Type").startswith("text/plain")
+        count = "time_surfer_command_duration_seconds_count"
+        assert f'{count}{{command="switch-to",interface="server"}}' in text
+        assert "time_surfer_storage_bytes " in text
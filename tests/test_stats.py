@@ -0,0 +1,113 @@
+"""Tests for streaming work-pattern statistics."""
+
+import random
+import statistics
+from datetime import datetime
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.stats import P2Quantile, RunningStats, compute_stats
+
+
+def _day(date, spans):
+    return Day(date=date, start_time=spans[0].start if spans else None, spans=spans)
+
+
+class TestRunningStats:
+    def test_matches_batch_statistics(self):
+        values = [random.Random(i).uniform(0, 100) for i in range(200)]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+
+        assert stats.count == 200
+        assert stats.mean == pytest.approx(statistics.mean(values))
+        assert stats.stddev == pytest.approx(statistics.stdev(values))
+        assert stats.minimum == min(values)
+        assert stats.maximum == max(values)
+
+    def test_empty(self):
+        assert RunningStats().variance == 0.0
+
+
+class TestP2Quantile:
+    def test_exact_for_small_samples(self):
+        estimator = P2Quantile(0.5)
+        for value in [5, 1, 3]:
+            estimator.add(value)
+        assert estimator.value == 3
+
+    def test_empty(self):
+        assert P2Quantile(0.5).value is None
+
+    @pytest.mark.parametrize("p", [0.5, 0.9])
+    def test_approximates_quantile_of_large_stream(self, p):
+        rng = random.Random(42)
+        values = [rng.expovariate(1 / 1800) for _ in range(5000)]
+        estimator = P2Quantile(p)
+        for value in values:
+            estimator.add(value)
+
+        exact = statistics.quantiles(values, n=100)[round(p * 100) - 1]
+        assert estimator.value == pytest.approx(exact, rel=0.05)
+
+
+class TestComputeStats:
+    def test_sessions_merge_contiguous_spans_of_same_task(self):
+        spans = [
+            Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            Span("coding", datetime(2026, 1, 30, 10, 0), datetime(2026, 1, 30, 11, 0)),
+            Span("email", datetime(2026, 1, 30, 11, 0), datetime(2026, 1, 30, 11, 30)),
+            Span("coding", datetime(2026, 1, 30, 11, 30), datetime(2026, 1, 30, 12, 0)),
+        ]
+        result = compute_stats([_day("2026-01-30", spans)])
+
+        assert result.tasks["coding"].sessions.count == 2
+        assert result.tasks["coding"].sessions.total == 9000.0
+        assert result.context_switches == 2
+        assert result.switches_per_hour == pytest.approx(2 / 3)
+        assert result.longest_focus.task == "coding"
+        assert result.longest_focus.seconds == 7200.0
+
+    def test_gap_splits_session_without_counting_switch(self):
+        spans = [
+            Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0)),
+            Span("coding", datetime(2026, 1, 30, 10, 30), datetime(2026, 1, 30, 11, 0)),
+        ]
+        result = compute_stats([_day("2026-01-30", spans)])
+
+        assert result.tasks["coding"].sessions.count == 2
+        assert result.context_switches == 0
+
+    def test_switches_are_not_counted_across_days(self):
+        days = [
+            _day("2026-01-30", [Span("a", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10))]),
+            _day("2026-01-31", [Span("b", datetime(2026, 1, 31, 9), datetime(2026, 1, 31, 10))]),
+        ]
+        result = compute_stats(days)
+
+        assert result.context_switches == 0
+        assert result.days == 2
+
+    def test_hour_of_day_splits_spans_across_hours(self):
+        spans = [Span("coding", datetime(2026, 1, 30, 9, 30), datetime(2026, 1, 30, 11, 15))]
+        result = compute_stats([_day("2026-01-30", spans)])
+
+        assert result.hour_of_day[9] == 1800.0
+        assert result.hour_of_day[10] == 3600.0
+        assert result.hour_of_day[11] == 900.0
+        assert sum(result.hour_of_day) == 6300.0
+
+    def test_open_spans_are_ignored(self):
+        spans = [Span("coding", datetime(2026, 1, 30, 9, 0), None)]
+        result = compute_stats([_day("2026-01-30", spans)])
+
+        assert result.tasks == {}
+        assert result.longest_focus is None
+
+    def test_consumes_days_lazily(self):
+        def days():
+            yield _day("2026-01-30", [Span("a", datetime(2026, 1, 30, 9), datetime(2026, 1, 30, 10))])
+
+        assert compute_stats(days()).days == 1
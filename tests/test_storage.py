@@ -1,13 +1,26 @@
 """Tests for storage layer."""
 
+import fcntl
 import json
+import os
+import stat
+import time
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from time_surfer.models import Day, Span
-from time_surfer.storage import Storage
+from time_surfer.storage import (
+    SCHEMA_VERSION,
+    CorruptDataError,
+    Durability,
+    Storage,
+    UnsupportedSchemaError,
+    decode_record,
+    encode_record,
+)
 
 
 class TestStorage:
@@ -92,3 +105,332 @@ class TestStorage:
         storage = Storage()
         expected = Path.home() / ".local" / "share" / "time-surfer" / "data.json"
         assert storage.data_file == expected
+
+
+class TestDurability:
+    def _day(self, date="2026-01-30"):
+        return Day(date=date, start_time=datetime(2026, 1, 30, 9, 0, 0))
+
+    def test_default_is_relaxed_write_through(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(self._day())
+
+        assert storage.durability is Durability.RELAXED
+        assert Storage(temp_data_file).load_day("2026-01-30") is not None
+
+    def test_strict_fsyncs_file_and_directory(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.STRICT)
+        with patch("time_surfer.storage.os.fsync") as mock_fsync:
+            storage.save_day(self._day())
+
+        assert mock_fsync.call_count == 2
+        assert storage.load_day("2026-01-30") is not None
+
+    def test_relaxed_does_not_fsync(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        with patch("time_surfer.storage.os.fsync") as mock_fsync:
+            storage.save_day(self._day())
+
+        mock_fsync.assert_not_called()
+
+    def test_relaxed_group_commits_after_max_events(self, temp_data_file):
+        storage = Storage(temp_data_file, commit_max_events=3, commit_interval_ms=60_000)
+        storage.save_day(self._day("2026-01-30"))
+        storage.save_day(self._day("2026-01-31"))
+
+        assert not temp_data_file.exists()
+        assert storage.load_day("2026-01-31") is not None
+
+        storage.save_day(self._day("2026-02-01"))
+        assert len(Storage(temp_data_file).load_all_days()) == 3
+
+    def test_relaxed_flushes_after_interval(self, temp_data_file):
+        storage = Storage(temp_data_file, commit_max_events=100, commit_interval_ms=10)
+        storage.save_day(self._day())
+
+        deadline = time.monotonic() + 2
+        while not temp_data_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert temp_data_file.exists()
+        storage.close()
+
+    def test_close_flushes_pending_writes(self, temp_data_file):
+        with Storage(temp_data_file, commit_max_events=100, commit_interval_ms=60_000) as storage:
+            storage.save_day(self._day())
+            assert not temp_data_file.exists()
+
+        assert Storage(temp_data_file).load_day("2026-01-30") is not None
+
+    def test_memory_never_touches_disk(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.MEMORY)
+        storage.save_day(self._day())
+        storage.close()
+
+        assert storage.load_day("2026-01-30") is not None
+        assert not temp_data_file.parent.exists()
+
+    def test_write_leaves_no_temporary_files(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.STRICT)
+        storage.save_day(self._day())
+
+        names = sorted(p.name for p in temp_data_file.parent.iterdir())
+        assert names == ["data.json", "data.json.lock"]
+
+    def test_new_file_gets_the_umask_default_mode(self, temp_data_file):
+        Storage(temp_data_file).save_day(self._day())
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        assert stat.S_IMODE(temp_data_file.stat().st_mode) == 0o666 & ~umask
+
+    def test_rewrite_keeps_the_file_mode(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(self._day())
+        temp_data_file.chmod(0o640)
+        storage.save_day(self._day())
+
+        assert stat.S_IMODE(temp_data_file.stat().st_mode) == 0o640
+        assert stat.S_IMODE(storage.backup_file.stat().st_mode) == 0o640
+
+
+class TestIterDays:
+    def test_yields_days_in_range_in_date_order(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date in ["2026-01-31", "2026-01-29", "2026-01-30"]:
+            storage.save_day(Day(date=date))
+
+        assert [d.date for d in storage.iter_days()] == ["2026-01-29", "2026-01-30", "2026-01-31"]
+        assert [d.date for d in storage.iter_days("2026-01-30")] == ["2026-01-30", "2026-01-31"]
+        assert [d.date for d in storage.iter_days(end_date="2026-01-29")] == ["2026-01-29"]
+
+
+class TestSchema:
+    def test_writes_versioned_json_lines(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(Day(date="2026-01-31"))
+        storage.save_day(Day(date="2026-01-30"))
+
+        lines = temp_data_file.read_text().splitlines()
+        assert json.loads(lines[0]) == {"schema_version": SCHEMA_VERSION}
+        assert [decode_record(line)["date"] for line in lines[1:]] == ["2026-01-30", "2026-01-31"]
+        assert storage.schema_version() == SCHEMA_VERSION
+
+    def test_reads_legacy_file(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        day = {"date": "2026-01-30", "start_time": "2026-01-30T09:00:00", "end_time": None}
+        temp_data_file.write_text(json.dumps({"2026-01-30": day}, indent=2))
+        storage = Storage(temp_data_file)
+
+        assert storage.schema_version() == 1
+        assert storage.load_day("2026-01-30").start_time == datetime(2026, 1, 30, 9, 0, 0)
+
+    def test_saving_upgrades_legacy_file(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        day = {"date": "2026-01-30", "start_time": None, "end_time": None}
+        temp_data_file.write_text(json.dumps({"2026-01-30": day}))
+        storage = Storage(temp_data_file)
+        storage.save_day(Day(date="2026-01-31"))
+
+        assert storage.schema_version() == SCHEMA_VERSION
+        assert [d.date for d in storage.iter_days()] == ["2026-01-30", "2026-01-31"]
+
+    def test_newer_schema_is_rejected(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text(json.dumps({"schema_version": SCHEMA_VERSION + 1}) + "\n")
+
+        with pytest.raises(UnsupportedSchemaError):
+            Storage(temp_data_file).load_day("2026-01-30")
+
+    def test_load_day_only_parses_matching_line(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date in ["2026-01-29", "2026-01-30", "2026-01-31"]:
+            storage.save_day(Day(date=date))
+
+        with patch("time_surfer.storage.json.loads", wraps=json.loads) as spy:
+            storage.load_day("2026-01-30")
+        assert spy.call_count == 2  # header + the one matching day
+
+
+class TestChecksums:
+    def _save_days(self, storage, dates):
+        for date in dates:
+            storage.save_day(Day(date=date, start_time=datetime(2026, 1, 30, 9, 0, 0)))
+
+    def _damage(self, data_file, index):
+        lines = data_file.read_text().splitlines(keepends=True)
+        lines[index] = lines[index].replace("09:00:00", "09:00:01", 1)
+        data_file.write_text("".join(lines))
+
+    def test_records_round_trip(self):
+        record = {"date": "2026-01-30", "spans": []}
+        assert decode_record(encode_record(record)) == record
+
+    def test_damaged_record_raises(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        self._save_days(storage, ["2026-01-29", "2026-01-30"])
+        self._damage(temp_data_file, 1)
+
+        with pytest.raises(CorruptDataError, match="line 2"):
+            storage.load_all_days()
+
+    def test_save_refuses_to_overwrite_damaged_file(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        self._save_days(storage, ["2026-01-29", "2026-01-30"])
+        self._damage(temp_data_file, 1)
+        damaged = temp_data_file.read_text()
+
+        with pytest.raises(CorruptDataError):
+            storage.save_day(Day(date="2026-01-31"))
+        assert temp_data_file.read_text() == damaged
+
+    def test_save_keeps_last_good_copy(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        self._save_days(storage, ["2026-01-29"])
+        before = temp_data_file.read_text()
+        self._save_days(storage, ["2026-01-30"])
+
+        assert storage.backup_file.read_text() == before
+        assert not list(temp_data_file.parent.glob(".*.tmp"))
+
+    def test_version_2_records_are_checksummed_on_read(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        record = json.dumps({"date": "2026-01-30", "start_time": None, "end_time": None})
+        temp_data_file.write_text(json.dumps({"schema_version": 2}) + "\n" + record + "\n")
+        storage = Storage(temp_data_file)
+
+        assert storage.load_day("2026-01-30") is not None
+        storage.save_day(Day(date="2026-01-31"))
+        assert storage.schema_version() == SCHEMA_VERSION
+        assert decode_record(temp_data_file.read_text().splitlines()[1])["date"] == "2026-01-30"
+
+    def test_damaged_legacy_file_raises(self, temp_data_file):
+        temp_data_file.parent.mkdir(parents=True)
+        temp_data_file.write_text('{"2026-01-30": {"date": ')
+
+        with pytest.raises(CorruptDataError):
+            Storage(temp_data_file).load_all_days()
+
+
+class TestSnapshot:
+    def _day(self, date: str, task: str = "coding") -> Day:
+        start = datetime.fromisoformat(f"{date}T09:00:00")
+        return Day(date=date, start_time=start, current_task=task, spans=[Span(task, start)])
+
+    def test_snapshot_ignores_later_saves(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(self._day("2026-01-29"))
+
+        with storage.snapshot() as snapshot:
+            storage.save_day(self._day("2026-01-30"))
+            Storage(temp_data_file).save_day(self._day("2026-01-29", task="email"))
+
+            assert [day.date for day in snapshot.iter_days()] == ["2026-01-29"]
+            assert snapshot.load_day("2026-01-29").current_task == "coding"
+            assert snapshot.load_day("2026-01-30") is None
+
+        assert storage.load_day("2026-01-29").current_task == "email"
+        assert storage.load_day("2026-01-30") is not None
+
+    def test_iteration_is_consistent_across_interleaved_writes(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        for date in ["2026-01-28", "2026-01-29", "2026-01-30"]:
+            storage.save_day(self._day(date))
+
+        with storage.snapshot() as snapshot:
+            lines = snapshot.iter_lines()
+            first = next(lines)
+            storage.replace_all_days([self._day("2026-01-30", task="email")])
+            rest = list(lines)
+            again = list(snapshot.iter_lines())
+
+        assert [date for date, _ in [first, *rest]] == ["2026-01-28", "2026-01-29", "2026-01-30"]
+        assert [first, *rest] == again
+
+    def test_fingerprint_is_that_of_the_pinned_file(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        storage.save_day(self._day("2026-01-29"))
+        before = storage.fingerprint()
+
+        with storage.snapshot() as snapshot:
+            storage.save_day(self._day("2026-01-30"))
+            assert snapshot.fingerprint() == before
+            assert storage.fingerprint() != before
+
+    def test_missing_file(self, temp_data_file):
+        with Storage(temp_data_file).snapshot() as snapshot:
+            assert snapshot.load_all_days() == []
+            assert snapshot.fingerprint() == (0, 0, 0)
+
+    def test_includes_pending_writes(self, temp_data_file):
+        storage = Storage(temp_data_file, commit_max_events=10, commit_interval_ms=60000)
+        storage.save_day(self._day("2026-01-30"))
+
+        with storage.snapshot() as snapshot:
+            storage.close()
+            assert snapshot.load_day("2026-01-30") is not None
+            assert snapshot.fingerprint() is None
+
+    def test_memory_mode(self):
+        storage = Storage(Path("unused.json"), durability=Durability.MEMORY)
+        storage.save_day(self._day("2026-01-29"))
+
+        with storage.snapshot() as snapshot:
+            storage.save_day(self._day("2026-01-30"))
+            assert [day.date for day in snapshot.iter_days()] == ["2026-01-29"]
+
+    def test_reads_legacy_files(self, temp_data_file):
+        record = Storage(temp_data_file)._day_to_dict(self._day("2026-01-30"))
+        temp_data_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_data_file.write_text(json.dumps({"2026-01-30": record}))
+
+        with Storage(temp_data_file).snapshot() as snapshot:
+            assert snapshot.load_day("2026-01-30").current_task == "coding"
+
+
+class TestLock:
+    def test_lock_is_reentrant_and_releases_the_file_lock(self, temp_data_file):
+        storage = Storage(temp_data_file)
+
+        with storage.lock():
+            with storage.lock():
+                assert storage.lock_file.exists()
+            with open(storage.lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with open(storage.lock_file) as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def test_every_write_takes_the_file_lock(self, temp_data_file):
+        storage = Storage(temp_data_file)
+        rewrite = storage._rewrite
+
+        def locked_rewrite(updates):
+            with open(storage.lock_file) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            rewrite(updates)
+
+        with patch.object(storage, "_rewrite", side_effect=locked_rewrite) as spy:
+            storage.save_day(Day(date="2026-01-30"))
+            storage.save_days([Day(date="2026-01-31")])
+        assert spy.call_count == 2
+
+    def test_timer_flush_waits_for_a_transaction(self, temp_data_file):
+        storage = Storage(temp_data_file, commit_interval_ms=10, commit_max_events=100)
+
+        with storage.lock():
+            storage.save_day(Day(date="2026-01-30"))
+            time.sleep(0.1)  # The commit timer fires while the lock is held.
+            assert not temp_data_file.exists()
+        storage.flush()
+
+        assert storage.load_day("2026-01-30") is not None
+
+    def test_memory_mode_creates_no_lock_file(self, temp_data_file):
+        storage = Storage(temp_data_file, durability=Durability.MEMORY)
+
+        with storage.lock():
+            pass
+
+        assert not storage.lock_file.exists()
@@ -0,0 +1,149 @@
+"""Tests for the multi-process stress harness."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.storage import Storage
+from time_surfer.stress import (
+    AcceleratedClock,
+    Event,
+    StressReport,
+    check_day,
+    events_from_days,
+    expected_days,
+    format_report,
+    read_events,
+    run,
+    synthetic_events,
+    verify,
+)
+
+
+class TestAcceleratedClock:
+    def test_runs_faster_than_wall_time(self):
+        clock = AcceleratedClock(base=datetime(2024, 1, 1, 8, 0), speed=3600, origin=100.0)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("time_surfer.stress.time.time", lambda: 102.5)
+            assert clock() == datetime(2024, 1, 1, 10, 30)
+
+
+class TestEvents:
+    def test_synthetic_events_are_reproducible(self):
+        assert synthetic_events(50, seed=7) == synthetic_events(50, seed=7)
+        assert {e.action for e in synthetic_events(500, seed=1, stop_ratio=0.1)} == {
+            "start",
+            "switch_to",
+            "stop",
+        }
+
+    def test_read_events(self):
+        lines = ['{"action": "switch_to", "task": "email"}', "", '{"action": "stop"}']
+
+        assert list(read_events(lines)) == [Event("switch_to", "email"), Event("stop")]
+
+    def test_read_events_rejects_switch_without_task(self):
+        with pytest.raises(ValueError, match="Invalid event"):
+            list(read_events(['{"action": "switch_to"}']))
+
+    def test_events_from_days(self):
+        day = Day(
+            date="2024-01-01",
+            start_time=datetime(2024, 1, 1, 9, 0),
+            end_time=datetime(2024, 1, 1, 10, 0),
+            spans=[
+                Span("email", datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 9, 30)),
+                Span("coding", datetime(2024, 1, 1, 9, 30), datetime(2024, 1, 1, 10, 0)),
+            ],
+        )
+
+        assert list(events_from_days([day])) == [
+            Event("switch_to", "email"),
+            Event("switch_to", "coding"),
+            Event("stop"),
+        ]
+
+
+class TestVerify:
+    def applied(self):
+        at = datetime(2024, 1, 1, 9, 0)
+        return [
+            (at, 0, 0, "switch_to", "email"),
+            (at + timedelta(minutes=20), 1, 0, "switch_to", "coding"),
+            (at + timedelta(minutes=50), 0, 1, "switch_to", "review"),
+        ]
+
+    def test_expected_days_replays_in_clock_order(self):
+        day = expected_days(list(reversed(self.applied())))["2024-01-01"]
+
+        assert [span.task for span in day.spans] == ["email", "coding", "review"]
+        assert day.current_task == "review"
+
+    def test_matching_storage_passes(self, temp_data_file):
+        expected = expected_days(self.applied())
+        storage = Storage(temp_data_file)
+        storage.save_days(expected.values())
+        report = StressReport()
+
+        verify(report, storage, expected)
+
+        assert report.ok
+        assert (report.days, report.spans) == (1, 3)
+
+    def test_reports_lost_and_overlapping_spans(self, temp_data_file):
+        expected = expected_days(self.applied())
+        day = expected_days(self.applied())["2024-01-01"]
+        # Lost update: a concurrent write dropped "coding" and extended "email".
+        del day.spans[1]
+        day.spans[0].end = datetime(2024, 1, 1, 10, 0)
+        storage = Storage(temp_data_file)
+        storage.save_day(day)
+        report = StressReport()
+
+        verify(report, storage, expected)
+
+        assert not report.ok
+        assert len(report.lost) == 2
+        assert report.unexpected == ["'email' 2024-01-01T09:00:00 - 2024-01-01T10:00:00"]
+        assert report.corrupted == ["2024-01-01: 'review' overlaps 'email'"]
+        assert "lost spans: 2" in format_report(report)
+
+    def test_check_day_flags_open_span_in_the_middle(self):
+        day = Day(
+            date="2024-01-01",
+            start_time=datetime(2024, 1, 1, 9, 0),
+            current_task="coding",
+            spans=[
+                Span("email", datetime(2024, 1, 1, 9, 0)),
+                Span("coding", datetime(2024, 1, 1, 9, 30)),
+            ],
+        )
+
+        assert check_day(day) == ["2024-01-01: open span 'email' is not the last"]
+
+
+class TestRun:
+    def test_concurrent_processes_lose_nothing(self, temp_data_file):
+        streams = [synthetic_events(25, tasks=4, seed=i, stop_ratio=0.05) for i in range(3)]
+
+        report = run(temp_data_file, streams, AcceleratedClock(speed=36000))
+
+        assert report.errors == []
+        assert report.lost == []
+        assert report.unexpected == []
+        assert report.corrupted == []
+        assert report.operations == 75
+        assert report.spans > 0
+
+    def test_batch_writer_alongside_trackers_loses_nothing(self, temp_data_file):
+        streams = [synthetic_events(25, tasks=4, seed=i, stop_ratio=0.05) for i in range(2)]
+
+        report = run(temp_data_file, streams, AcceleratedClock(speed=36000), batch_writers=1)
+
+        assert report.batch_runs > 0
+        assert report.errors == []
+        assert report.lost == []
+        assert report.unexpected == []
+        assert report.corrupted == []
@@ -0,0 +1,175 @@
+"""Tests for syncing data files between machines."""
+
+import fcntl
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.notes import NoteStore
+from time_surfer.storage import Storage
+from time_surfer.sync import STATE_FILENAME, SyncError, merge_days, sync
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, 30, hour, minute)
+
+
+def _day(*spans: Span, date: str = "2026-01-30", end_time: datetime | None = None) -> Day:
+    open_span = spans[-1] if spans and spans[-1].end is None else None
+    return Day(
+        date=date,
+        start_time=min(span.start for span in spans),
+        end_time=end_time,
+        current_task=open_span.task if open_span else None,
+        spans=list(spans),
+    )
+
+
+@pytest.fixture
+def local(tmp_path):
+    return Storage(tmp_path / "desktop" / "data.json")
+
+
+@pytest.fixture
+def remote(tmp_path):
+    return Storage(tmp_path / "laptop" / "data.json")
+
+
+class TestMergeDays:
+    def test_disjoint_and_duplicate_spans(self):
+        coding = Span("coding", _at(9), _at(10))
+        a = _day(coding, Span("email", _at(11), _at(12)), end_time=_at(12))
+        b = _day(coding, Span("review", _at(13), _at(14)), end_time=_at(14))
+
+        merged = merge_days(a, b)
+
+        assert [(s.task, s.start.hour, s.end.hour) for s in merged.spans] == [
+            ("coding", 9, 10),
+            ("email", 11, 12),
+            ("review", 13, 14),
+        ]
+        assert merged.end_time == _at(14)
+        assert merged.current_task == "review"
+
+    def test_same_task_overlaps_are_joined(self):
+        a = _day(Span("coding", _at(9), _at(10, 30)))
+        b = _day(Span("coding", _at(10), _at(11)))
+
+        merged = merge_days(a, b)
+
+        assert [(s.task, s.start, s.end) for s in merged.spans] == [("coding", _at(9), _at(11))]
+
+    def test_later_start_wins_and_earlier_task_resumes(self):
+        a = _day(Span("coding", _at(9), _at(12)))
+        b = _day(Span("meeting", _at(10), _at(11)))
+
+        merged = merge_days(a, b)
+
+        assert [(s.task, s.start.hour, s.end.hour) for s in merged.spans] == [
+            ("coding", 9, 10),
+            ("meeting", 10, 11),
+            ("coding", 11, 12),
+        ]
+
+    def test_only_the_latest_open_span_stays_open(self):
+        a = _day(Span("coding", _at(9)))
+        b = _day(Span("coding", _at(9), _at(10)), Span("email", _at(10, 30)))
+
+        merged = merge_days(a, b)
+
+        assert [(s.task, s.end) for s in merged.spans] == [("coding", _at(10, 30)), ("email", None)]
+        assert merged.current_task == "email"
+        assert merged.is_active
+
+    def test_independent_of_argument_order(self):
+        a = _day(Span("coding", _at(9), _at(12)), Span("email", _at(12, 30)))
+        b = _day(Span("meeting", _at(10), _at(11)), Span("coding", _at(11, 30), _at(13)))
+
+        assert merge_days(a, b) == merge_days(b, a)
+
+
+class TestSync:
+    def test_first_sync_copies_missing_days_both_ways(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(10)), date="2026-01-29"))
+        remote.save_day(_day(Span("email", _at(9), _at(10))))
+
+        result = sync(local, remote)
+
+        assert (result.days, result.pulled, result.pushed, result.merged) == (2, 1, 1, 0)
+        assert local.data_file.read_text() == remote.data_file.read_text()
+        assert local.data_file.with_name(STATE_FILENAME).exists()
+
+    def test_second_sync_is_a_no_op_without_parsing(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(10))))
+        sync(local, remote)
+
+        with patch.object(Storage, "_dict_to_day", side_effect=AssertionError("parsed")):
+            result = sync(local, remote)
+
+        assert result.unchanged == 1
+        assert result.pulled == result.pushed == result.merged == 0
+
+    def test_one_sided_change_is_copied_not_merged(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(12))))
+        sync(local, remote)
+        # Compaction or an edit on the laptop shortens the span.
+        remote.save_day(_day(Span("coding", _at(9), _at(11))))
+
+        result = sync(local, remote)
+
+        assert (result.pulled, result.merged) == (1, 0)
+        assert local.load_day("2026-01-30").spans[0].end == _at(11)
+
+    def test_changes_on_both_sides_are_merged(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(10))))
+        sync(local, remote)
+        local.save_day(_day(Span("coding", _at(9), _at(10)), Span("email", _at(10), _at(11))))
+        remote.save_day(_day(Span("coding", _at(9), _at(10)), Span("review", _at(12), _at(13))))
+
+        result = sync(local, remote)
+
+        assert result.merged == 1
+        assert [s.task for s in local.load_day("2026-01-30").spans] == ["coding", "email", "review"]
+        assert local.data_file.read_text() == remote.data_file.read_text()
+
+    def test_notes_follow_spans_the_merge_joins(self, local, remote):
+        ours, theirs = Span("coding", _at(9, 30), _at(11)), Span("coding", _at(9), _at(10))
+        local.save_day(_day(ours))
+        remote.save_day(_day(theirs))
+        NoteStore(local.notes_file).add(ours, note="local note")
+        NoteStore(remote.notes_file).add(theirs, note="remote note")
+
+        sync(local, remote)
+
+        (joined,) = local.load_day("2026-01-30").spans
+        assert joined == Span("coding", _at(9), _at(11))
+        assert NoteStore(local.notes_file).get(joined).notes == ["local note"]
+        assert NoteStore(remote.notes_file).get(joined).notes == ["remote note"]
+
+    def test_holds_both_storage_locks_until_saved(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(10)), date="2026-01-29"))
+        remote.save_day(_day(Span("email", _at(9), _at(10))))
+
+        def save_lines(lines):
+            for storage in (local, remote):
+                with open(storage.lock_file) as f:
+                    with pytest.raises(BlockingIOError):
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with patch.object(local, "save_lines", side_effect=save_lines):
+            sync(local, remote)
+
+    def test_dry_run_writes_nothing(self, local, remote):
+        local.save_day(_day(Span("coding", _at(9), _at(10))))
+
+        result = sync(local, remote, dry_run=True)
+
+        assert result.pushed == 1
+        assert not remote.data_file.exists()
+        assert not local.data_file.with_name(STATE_FILENAME).exists()
+
+    def test_refuses_to_sync_with_itself(self, local):
+        with pytest.raises(SyncError):
+            sync(local, Storage(local.data_file))
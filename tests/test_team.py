@@ -0,0 +1,123 @@
+"""Tests for team rollups."""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.storage import Storage
+from time_surfer.team import (
+    aggregate_data_file,
+    build_team_report,
+    discover_data_files,
+    merge_task_totals,
+)
+
+
+def _save(path, date, spans):
+    Storage(path).save_day(
+        Day(date=date, start_time=spans[0].start, end_time=spans[-1].end, spans=spans)
+    )
+
+
+@pytest.fixture
+def team_dir(tmp_path):
+    team = tmp_path / "team"
+    team.mkdir()
+    _save(
+        team / "alice.json",
+        "2026-01-30",
+        [
+            Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 11, 0)),
+            Span("review", datetime(2026, 1, 30, 11, 0), datetime(2026, 1, 30, 12, 0)),
+        ],
+    )
+    _save(
+        team / "bob" / "data.json",
+        "2026-01-30",
+        [Span("coding", datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 10, 0))],
+    )
+    _save(
+        team / "bob" / "data.json",
+        "2026-01-31",
+        [Span("meetings", datetime(2026, 1, 31, 9, 0), datetime(2026, 1, 31, 10, 0))],
+    )
+    (team / "notes.txt").write_text("not a data file")
+    return team
+
+
+class TestDiscoverDataFiles:
+    def test_finds_both_layouts(self, team_dir):
+        files = discover_data_files(team_dir)
+
+        assert list(files) == ["alice", "bob"]
+        assert files["bob"] == team_dir / "bob" / "data.json"
+
+
+class TestAggregateDataFile:
+    def test_aggregates_within_date_range(self, team_dir):
+        totals = aggregate_data_file(team_dir / "bob" / "data.json", "2026-01-30", "2026-01-30")
+        assert totals == {"coding": 3600.0}
+
+    def test_aggregates_across_days(self, team_dir):
+        totals = aggregate_data_file(team_dir / "bob" / "data.json", "2026-01-01", "2026-01-31")
+        assert totals == {"coding": 3600.0, "meetings": 3600.0}
+
+
+class TestMergeTaskTotals:
+    def test_merges_partials(self):
+        merged = merge_task_totals([{"a": 1.0, "b": 2.0}, {"a": 3.0}])
+        assert merged == {"a": 4.0, "b": 2.0}
+
+
+class TestBuildTeamReport:
+    def test_inline_and_parallel_agree(self, team_dir):
+        inline = build_team_report(team_dir, "2026-01-30", "2026-01-31", max_workers=1)
+        parallel = build_team_report(team_dir, "2026-01-30", "2026-01-31", max_workers=2)
+
+        assert inline.user_totals == parallel.user_totals
+        assert parallel.task_totals == {"coding": 3.0 * 3600, "review": 3600.0, "meetings": 3600.0}
+        assert parallel.user_totals["alice"] == {"coding": 7200.0, "review": 3600.0}
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_damaged_file_fails_only_its_user(self, team_dir, workers):
+        damaged = team_dir / "alice.json"
+        damaged.write_text(damaged.read_text().replace("review", "reviEw"))
+
+        report = build_team_report(team_dir, "2026-01-30", "2026-01-31", max_workers=workers)
+
+        assert list(report.user_totals) == ["bob"]
+        assert list(report.failed_users) == ["alice"]
+        assert "Checksum mismatch" in report.failed_users["alice"]
+        assert report.task_totals == {"coding": 3600.0, "meetings": 3600.0}
+
+    @pytest.mark.parametrize(
+        "content, message",
+        [
+            (b'{"schema_version": 3}\n\xff\xfe\n', "cannot read"),
+            (b'{"schema_version": 2}\n{"date": "2026-01-30", "spans": []}\n', "'start_time'"),
+            (b'{"schema_version": 2}\n{"date": "2026-01-30", "start_time": 5}\n', "invalid"),
+        ],
+    )
+    def test_unreadable_or_invalid_file_fails_only_its_user(self, team_dir, content, message):
+        (team_dir / "alice.json").write_bytes(content)
+
+        report = build_team_report(team_dir, "2026-01-30", "2026-01-31", max_workers=1)
+
+        assert list(report.user_totals) == ["bob"]
+        assert message in report.failed_users["alice"]
+
+    def test_permission_denied_is_a_failed_user(self, team_dir):
+        denied = PermissionError(13, "Permission denied")
+        with patch("time_surfer.team.aggregate_data_file", side_effect=denied):
+            report = build_team_report(team_dir, "2026-01-30", "2026-01-31", max_workers=1)
+
+        assert report.user_totals == {}
+        assert list(report.failed_users) == ["alice", "bob"]
+        assert "Permission denied" in report.failed_users["alice"]
+
+    def test_empty_directory(self, tmp_path):
+        report = build_team_report(tmp_path, "2026-01-30", "2026-01-30")
+        assert report.user_totals == {}
+        assert report.task_totals == {}
@@ -0,0 +1,107 @@
+"""Tests for the thread-safe tracker and caching storage."""
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+from time_surfer.models import Day, Span
+from time_surfer.storage import Storage
+from time_surfer.threadsafe import CachingStorage, ThreadSafeTracker
+from time_surfer.tracker import Tracker
+
+
+def _started(date: str) -> Day:
+    return Tracker()._start(None, datetime.fromisoformat(f"{date}T09:00:00")).day
+
+
+class TestCachingStorage:
+    def test_serves_repeated_loads_from_memory(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        Storage(temp_data_file).save_day(_started("2026-01-30"))
+        storage.load_day("2026-01-30")
+
+        with patch.object(Storage, "_iter_file_records") as mock_read:
+            storage.load_day("2026-01-30")
+        mock_read.assert_not_called()
+
+    def test_caches_missing_days_too(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        assert storage.load_day("2026-01-30") is None
+
+        with patch.object(Storage, "_iter_file_records") as mock_read:
+            assert storage.load_day("2026-01-30") is None
+        mock_read.assert_not_called()
+
+    def test_reloads_when_file_changes(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        assert storage.load_day("2026-01-30") is None
+
+        Storage(temp_data_file).save_day(_started("2026-01-30"))
+        assert storage.load_day("2026-01-30") is not None
+
+    def test_writes_go_through_and_keep_other_days_cached(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        storage.save_day(_started("2026-01-29"))
+        storage.load_day("2026-01-29")
+        storage.save_day(_started("2026-01-30"))
+
+        with patch.object(Storage, "_iter_file_records") as mock_read:
+            assert storage.load_day("2026-01-29") is not None
+            assert storage.load_day("2026-01-30") is not None
+        mock_read.assert_not_called()
+        assert Storage(temp_data_file).load_day("2026-01-30") is not None
+
+    def test_returns_copies(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        day = _started("2026-01-30")
+        day.spans.append(Span("coding", day.start_time))
+        storage.save_day(day)
+
+        loaded = storage.load_day("2026-01-30")
+        loaded.spans[0].end = datetime(2026, 1, 30, 10, 0)
+        loaded.spans.append(Span("email", datetime(2026, 1, 30, 10, 0)))
+
+        again = storage.load_day("2026-01-30")
+        assert len(again.spans) == 1
+        assert again.spans[0].end is None
+
+    def test_lru_bound(self, temp_data_file):
+        storage = CachingStorage(temp_data_file, max_cached_days=2)
+        for date in ["2026-01-28", "2026-01-29", "2026-01-30"]:
+            storage.save_day(_started(date))
+
+        assert list(storage._days) == ["2026-01-29", "2026-01-30"]
+
+
+class TestThreadSafeTracker:
+    def test_concurrent_switches_lose_no_updates(self, temp_data_file):
+        tracker = ThreadSafeTracker(CachingStorage(temp_data_file))
+        tasks = [f"task-{i}" for i in range(40)]
+
+        def worker(names):
+            for name in names:
+                tracker.switch_to(name)
+
+        threads = [threading.Thread(target=worker, args=(tasks[i::4],)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        day = Storage(temp_data_file).load_day(datetime.now().strftime("%Y-%m-%d"))
+        assert sorted(span.task for span in day.spans) == sorted(tasks)
+        assert sum(span.end is None for span in day.spans) == 1
+
+    def test_reads_for_other_days_do_not_wait_for_a_locked_day(self, temp_data_file):
+        storage = CachingStorage(temp_data_file)
+        storage.save_day(_started("2026-01-29"))
+        lock = storage.day_lock("2026-01-30")
+        lock.acquire()
+        try:
+            result = []
+            reader = threading.Thread(target=lambda: result.append(storage.load_day("2026-01-29")))
+            reader.start()
+            reader.join(5)
+            assert result and result[0].date == "2026-01-29"
+        finally:
+            lock.release()
@@ -0,0 +1,79 @@
+"""Tests for the sweep-line timeline."""
+
+from datetime import datetime
+
+import pytest
+
+from time_surfer.models import Day, Span
+from time_surfer.timeline import build_timeline, day_timeline
+
+
+def t(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, 30, hour, minute)
+
+
+class TestBuildTimeline:
+    def test_sequential_spans(self):
+        spans = [Span("coding", t(9), t(10)), Span("email", t(10), t(10, 30))]
+
+        timeline = build_timeline(spans, t(9), t(11))
+
+        assert timeline.tracked_seconds == 5400
+        assert timeline.overlapped_seconds == 0
+        assert timeline.gaps == [(t(10, 30), t(11))]
+        assert timeline.untracked_seconds == 1800
+        assert timeline.attributed == {"coding": 3600, "email": 1800}
+
+    def test_overlap_is_counted_once_and_shared(self):
+        spans = [Span("coding", t(9), t(11)), Span("meeting", t(10), t(11))]
+
+        timeline = build_timeline(spans, t(9), t(12))
+
+        assert timeline.tracked_seconds == 7200
+        assert timeline.overlapped_seconds == 3600
+        assert timeline.untracked_seconds == 3600
+        assert timeline.attributed == {"coding": 5400, "meeting": 1800}
+
+    def test_shares_and_gaps_add_up_to_window(self):
+        spans = [
+            Span("a", t(9), t(12)),
+            Span("b", t(9, 30), t(10, 30)),
+            Span("c", t(10), t(11)),
+            Span("a", t(11, 30), t(13)),  # the same task overlapping itself
+            Span("d", t(14), t(15)),
+        ]
+
+        timeline = build_timeline(spans, t(8), t(16))
+
+        assert sum(timeline.attributed.values()) + timeline.untracked_seconds == pytest.approx(
+            timeline.window_seconds
+        )
+        assert timeline.tracked_seconds == 5 * 3600
+        assert timeline.gaps == [(t(8), t(9)), (t(13), t(14)), (t(15), t(16))]
+
+    def test_open_spans_end_at_now_and_spans_are_clipped(self):
+        spans = [Span("early", t(7), t(9, 30)), Span("coding", t(10))]
+
+        timeline = build_timeline(spans, t(9), t(12), now=t(11))
+
+        assert timeline.attributed == {"early": 1800, "coding": 3600}
+        assert timeline.gaps == [(t(9, 30), t(10)), (t(11), t(12))]
+
+    def test_unsorted_input_and_empty_window(self):
+        spans = [Span("b", t(10), t(11)), Span("a", t(9), t(10))]
+
+        assert build_timeline(spans, t(9), t(11)).untracked_seconds == 0
+        assert build_timeline([], t(9), t(10)).gaps == [(t(9), t(10))]
+
+
+class TestDayTimeline:
+    def test_active_day_runs_until_now(self):
+        day = Day(date="2026-01-30", start_time=t(9), spans=[Span("coding", t(9, 30))])
+
+        timeline = day_timeline(day, now=t(10))
+
+        assert timeline.window_seconds == 3600
+        assert timeline.untracked_seconds == 1800
+
+    def test_unstarted_day(self):
+        assert day_timeline(Day(date="2026-01-30"), now=t(10)) is None
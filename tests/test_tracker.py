@@ -69,6 +69,22 @@ class TestTrackerStart:
         assert result.success is True
 
 
+    def test_restart_after_stop_keeps_the_days_spans(self, temp_data_file):
+        tracker = Tracker(Storage(temp_data_file))
+
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.switch_to("coding")
+            mock_dt.now.return_value = datetime(2026, 1, 30, 12, 0, 0)
+            tracker.stop()
+            mock_dt.now.return_value = datetime(2026, 1, 30, 13, 0, 0)
+            tracker.switch_to("email")
+            day = tracker.get_current_day()
+
+        assert [span.task for span in day.spans] == ["coding", "email"]
+        assert day.start_time == datetime(2026, 1, 30, 9, 0, 0)
+
+
 class TestTrackerStop:
     def test_stop_sets_end_time(self, temp_data_file):
         storage = Storage(temp_data_file)
@@ -368,3 +384,62 @@ class TestTrackerSwitchTo:
         assert result.day.spans[1].task == "meetings"
         assert result.day.spans[2].task == "review"
         assert result.day.current_task == "review"
+
+
+class TestTrackerGetStatus:
+    def test_status_reports_current_task(self, temp_data_file):
+        tracker = Tracker(Storage(temp_data_file))
+
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.switch_to("coding")
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 45, 0)
+            result = tracker.get_status()
+
+        assert result.success is True
+        assert result.message == "Working on 'coding'"
+        assert result.task_totals == {"coding": 2700.0}
+        assert result.day.open_span.task == "coding"
+
+    def test_status_without_task(self, temp_data_file):
+        tracker = Tracker(Storage(temp_data_file))
+
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.start()
+            result = tracker.get_status()
+
+        assert result.message == "Tracking, no task selected"
+
+    def test_status_after_stop(self, temp_data_file):
+        tracker = Tracker(Storage(temp_data_file))
+
+        with patch("time_surfer.tracker.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 30, 9, 0, 0)
+            tracker.switch_to("coding")
+            mock_dt.now.return_value = datetime(2026, 1, 30, 17, 0, 0)
+            tracker.stop()
+            result = tracker.get_status()
+
+        assert result.message == "Stopped tracking at 17:00"
+        assert result.day.open_span is None
+
+    def test_status_fails_when_not_started(self, temp_data_file):
+        result = Tracker(Storage(temp_data_file)).get_status()
+
+        assert result.success is False
+        assert result.message == "Day not started"
+
+
+class TestTrackerClock:
+    def test_clock_replaces_datetime_now(self, temp_data_file):
+        times = iter([datetime(2026, 1, 30, 9, 0), datetime(2026, 1, 30, 9, 30)])
+        tracker = Tracker(Storage(temp_data_file), clock=lambda: next(times))
+
+        tracker.switch_to("email")
+        result = tracker.switch_to("coding")
+
+        assert [(s.task, s.start) for s in result.day.spans] == [
+            ("email", datetime(2026, 1, 30, 9, 0)),
+            ("coding", datetime(2026, 1, 30, 9, 30)),
+        ]